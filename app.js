@@ -1,5 +1,11 @@
 const API_BASE = "https://meatkonnex-backend.onrender.com";
 
+// Inventory writes need an admin token from POST /login
+function authHeaders() {
+  const token = localStorage.getItem("access_token");
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
 async function fetchAnimals() {
   try {
     const res = await fetch(`${API_BASE}/animals`);
@@ -40,23 +46,33 @@ async function fetchMeatParts(animalId) {
   }
 }
 
+// Rows currently shown, by inventory_id, so pushed changes can be merged in place
+const inventoryRows = new Map();
+
+function renderInventoryRow(tr, item) {
+  tr.dataset.id = item.inventory_id;
+  tr.innerHTML = `
+    <td>${item.inventory_id}</td>
+    <td>${item.meat_part}</td>
+    <td>${item.animal}</td>
+    <td>${item.stock_lb}</td>
+    <td>${item.seasoned ? "Yes" : "No"}</td>
+    <td>${item.location}</td>
+  `;
+}
+
 async function fetchInventory() {
   try {
     const res = await fetch(`${API_BASE}/inventory`);
     const data = await res.json();
     const tbody = document.querySelector("#inventory-table tbody");
     tbody.innerHTML = "";
+    inventoryRows.clear();
 
     data.forEach(item => {
       const tr = document.createElement("tr");
-      tr.innerHTML = `
-        <td>${item.inventory_id}</td>
-        <td>${item.meat_part}</td>
-        <td>${item.animal}</td>
-        <td>${item.stock_lb}</td>
-        <td>${item.seasoned ? "Yes" : "No"}</td>
-        <td>${item.location}</td>
-      `;
+      renderInventoryRow(tr, item);
+      inventoryRows.set(item.inventory_id, item);
       tbody.appendChild(tr);
     });
   } catch (err) {
@@ -65,6 +81,40 @@ async function fetchInventory() {
   }
 }
 
+// Server-sent stock changes: each item has inventory_id plus only the fields that changed
+function applyInventoryChanges(items) {
+  const tbody = document.querySelector("#inventory-table tbody");
+  for (const change of items) {
+    const current = inventoryRows.get(change.inventory_id);
+    if (!current && !change.meat_part) {
+      // A row we have never seen, without enough detail to draw it
+      fetchInventory();
+      return;
+    }
+    const item = { ...current, ...change };
+    inventoryRows.set(item.inventory_id, item);
+    let tr = tbody.querySelector(`tr[data-id="${item.inventory_id}"]`);
+    if (!tr) {
+      tr = document.createElement("tr");
+      tbody.appendChild(tr);
+    }
+    renderInventoryRow(tr, item);
+  }
+}
+
+function listenForInventory() {
+  if (!window.EventSource) return;
+  const source = new EventSource(`${API_BASE}/events?topics=inventory`);
+  let connected = false;
+  source.addEventListener("inventory", (e) => applyInventoryChanges(JSON.parse(e.data).items));
+  // Sent when we fell too far behind; also reload after a reconnect, since changes may have been missed
+  source.addEventListener("resync", fetchInventory);
+  source.addEventListener("open", () => {
+    if (connected) fetchInventory();
+    connected = true;
+  });
+}
+
 async function addInventory(event) {
   event.preventDefault();
 
@@ -81,9 +131,10 @@ async function addInventory(event) {
   try {
     const res = await fetch(`${API_BASE}/inventory`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: { "Content-Type": "application/json", ...authHeaders() },
       body: JSON.stringify({ meat_part_id, current_stock_lb, is_seasoned, location })
     });
+    if (res.status === 401 || res.status === 403) throw new Error("Log in as an admin to add inventory");
     if (!res.ok) throw new Error("Failed to add inventory");
 
     alert("Inventory added successfully!");
@@ -101,3 +152,4 @@ document.getElementById("animal-select").addEventListener("change", (e) => {
 
 fetchAnimals();
 fetchInventory();
+listenForInventory();
@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Settings are read from the environment when each module is imported, so .env is loaded first,
+# before any app module runs
+load_dotenv()
@@ -0,0 +1,227 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+
+from app.auth import verify_token
+from app.database import env_flag
+
+ADMISSION_ENABLED = env_flag("ADMISSION_ENABLED", "true")
+# "METHOD /path=requests/seconds" rules separated by ";", each a token bucket per client holding up to
+# `requests` tokens and refilling over `seconds`. Paths match exactly.
+RATE_LIMITS = os.getenv("RATE_LIMITS", "POST /order=20/60;POST /login=10/60;POST /quote=120/60")
+# Buckets kept in memory; the least recently seen client is dropped past this
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+# Behind reverse proxies the client is taken from X-Forwarded-For instead of the socket peer. Each
+# proxy appends the address it saw, and anything to their left was written by the client, so the
+# client is the TRUSTED_PROXY_HOPS-th address from the right.
+TRUST_FORWARDED_FOR = env_flag("TRUST_FORWARDED_FOR")
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+# Write requests running at once; the rest wait in a bounded queue, admins first, and are shed with
+# a 503 when it is full or they have waited too long. 0 turns the limiter off.
+WRITE_CONCURRENCY = int(os.getenv("WRITE_CONCURRENCY", "8"))
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "64"))
+WRITE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("WRITE_QUEUE_TIMEOUT_SECONDS", "2"))
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def parse_rate_limits(spec: str):
+    # -> {(method, path): (capacity, tokens per second)}
+    rules = {}
+    for rule in filter(None, (part.strip() for part in spec.split(";"))):
+        try:
+            route, limit = rule.split("=")
+            method, path = route.split()
+            requests, seconds = limit.split("/")
+            capacity, period = int(requests), float(seconds)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit rule {rule!r}; expected 'METHOD /path=requests/seconds'")
+        if capacity <= 0 or period <= 0:
+            raise ValueError(f"Invalid rate limit rule {rule!r}; requests and seconds must be positive")
+        rules[(method.upper(), path)] = (capacity, capacity / period)
+    return rules
+
+class RateLimiter:
+    # Token buckets per (rule, client), only touched from the event loop
+    def __init__(self, rules, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.rules = rules
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        # (method, path) -> [allowed, limited]
+        self.counts = {route: [0, 0] for route in rules}
+
+    def check(self, route, client: str) -> float:
+        # 0 when the request may go ahead, otherwise the seconds until a token is available
+        rule = self.rules.get(route)
+        if rule is None:
+            return 0.0
+        capacity, refill = rule
+        now = time.monotonic()
+        key = (route, client)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(capacity), now]
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.counts[route][0] += 1
+            return 0.0
+        self.counts[route][1] += 1
+        return (1 - bucket[0]) / refill
+
+class AdmissionGate:
+    # Counting semaphore with two waiting lines. A finishing request hands its slot straight to the
+    # next waiter, admins before everyone else, so queued requests can't be overtaken by new arrivals.
+    def __init__(self, limit: int = WRITE_CONCURRENCY, queue_size: int = WRITE_QUEUE_SIZE,
+                 timeout: float = WRITE_QUEUE_TIMEOUT_SECONDS):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiters = {"admin": deque(), "public": deque()}
+        # class -> outcome -> count, and seconds spent queued per class
+        self.counts = {kind: {"admitted": 0, "queue_full": 0, "timeout": 0} for kind in self.waiters}
+        self.wait_seconds = {kind: 0.0 for kind in self.waiters}
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.waiters.values())
+
+    async def acquire(self, kind: str) -> bool:
+        # False when the request is shed
+        if self.active < self.limit and not self.queued():
+            self.active += 1
+            self.counts[kind]["admitted"] += 1
+            return True
+        queue = self.waiters[kind]
+        if len(queue) >= self.queue_size:
+            self.counts[kind]["queue_full"] += 1
+            return False
+        slot = asyncio.get_running_loop().create_future()
+        queue.append(slot)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(slot, self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if slot in queue:
+                queue.remove(slot)
+            elif slot.done() and not slot.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self.release()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.counts[kind]["timeout"] += 1
+            return False
+        finally:
+            self.wait_seconds[kind] += time.monotonic() - started
+        self.counts[kind]["admitted"] += 1
+        return True
+
+    def release(self):
+        for queue in self.waiters.values():
+            while queue:
+                slot = queue.popleft()
+                if not slot.done():
+                    slot.set_result(None)
+                    return
+        self.active -= 1
+
+rate_limiter = RateLimiter(parse_rate_limits(RATE_LIMITS))
+write_gate = AdmissionGate()
+
+def client_address(scope) -> str:
+    if TRUST_FORWARDED_FOR and TRUSTED_PROXY_HOPS > 0:
+        # Repeated headers are one comma-separated list, in order
+        forwarded = [
+            address.strip()
+            for name, value in scope["headers"] if name == b"x-forwarded-for"
+            for address in value.decode("latin-1").split(",")
+        ]
+        forwarded = [address for address in forwarded if address]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+def is_admin(scope) -> bool:
+    # Same cached check the admin dependencies do, so this costs a dict lookup for a known token
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            claims = verify_token(token) if scheme.lower() == "bearer" and token else None
+            return bool(claims and claims.get("admin"))
+    return False
+
+async def reject(send, status: int, detail: str, retry_after: float):
+    body = ('{"detail":"%s"}' % detail).encode()
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+class AdmissionMiddleware:
+    # Plain ASGI middleware in front of the routes: per-client rate limits first, then the write
+    # concurrency gate. Rejections are answered here without touching the database.
+    def __init__(self, app, limiter: RateLimiter = None, gate: AdmissionGate = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.gate = gate or write_gate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        wait = self.limiter.check((method, scope["path"]), client_address(scope))
+        if wait:
+            await reject(send, 429, "Too many requests; please slow down", wait)
+            return
+        if method not in WRITE_METHODS or self.gate.limit <= 0:
+            await self.app(scope, receive, send)
+            return
+        if not await self.gate.acquire("admin" if is_admin(scope) else "public"):
+            await reject(send, 503, "Server is busy; please retry shortly", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
+
+def render_admission_metrics() -> str:
+    lines = [
+        "# HELP admission_rate_limit_total Rate-limited routes by outcome",
+        "# TYPE admission_rate_limit_total counter",
+    ]
+    for (method, path), (allowed, limited) in sorted(rate_limiter.counts.items()):
+        labels = f'method="{method}",route="{path}"'
+        lines.append(f'admission_rate_limit_total{{{labels},outcome="allowed"}} {allowed}')
+        lines.append(f'admission_rate_limit_total{{{labels},outcome="limited"}} {limited}')
+    lines += [
+        "# HELP admission_write_requests_total Write requests at the concurrency gate by class and outcome",
+        "# TYPE admission_write_requests_total counter",
+    ]
+    for kind, outcomes in write_gate.counts.items():
+        for outcome, count in outcomes.items():
+            lines.append(f'admission_write_requests_total{{class="{kind}",outcome="{outcome}"}} {count}')
+    lines += [
+        "# HELP admission_queue_wait_seconds_total Time write requests spent queued by class",
+        "# TYPE admission_queue_wait_seconds_total counter",
+    ]
+    for kind, seconds in write_gate.wait_seconds.items():
+        lines.append(f'admission_queue_wait_seconds_total{{class="{kind}"}} {seconds}')
+    lines += [
+        "# HELP admission_write_in_flight Write requests currently running",
+        "# TYPE admission_write_in_flight gauge",
+        f"admission_write_in_flight {write_gate.active}",
+        "# HELP admission_write_queued Write requests currently waiting",
+        "# TYPE admission_write_queued gauge",
+        f"admission_write_queued {write_gate.queued()}",
+    ]
+    return "\n".join(lines) + "\n"
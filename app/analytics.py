@@ -0,0 +1,164 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Animal, MeatPart, Order, OrderItem
+
+KG_TO_LB = 2.20462
+PERIODS = ("day", "week", "month")
+
+# Per-part daily sales are streamed from the database and converted to arrays this many rows at a time
+LOAD_CHUNK_ROWS = 100_000
+
+def index_of(ids, size_hint: int = 0):
+    # Dense lookup array: id -> position, -1 for unknown ids
+    lookup = np.full(max(int(ids.max(initial=0)), size_hint) + 1, -1, dtype=np.int64)
+    lookup[ids] = np.arange(len(ids))
+    return lookup
+
+def ratio(numerator, denominator):
+    # Elementwise division with NaN (reported as null) wherever the denominator is zero
+    return np.divide(numerator, denominator, out=np.full(len(numerator), np.nan), where=denominator > 0)
+
+def load_sales(db: Session, date_from: date = None, date_to: date = None):
+    # Item count, pounds and revenue per (meat part, day) as arrays. Summing per part and day in SQL
+    # first ships a few thousand rows to Python instead of one per order item; everything coarser
+    # (animal, part, period) is aggregated from these arrays.
+    day = func.date(Order.date_ordered)
+    stmt = (
+        select(
+            OrderItem.meat_part_id, day, func.count(), func.sum(OrderItem.pounds_ordered),
+            func.sum(OrderItem.pounds_ordered * OrderItem.unit_price),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(OrderItem.meat_part_id != None)
+        .group_by(OrderItem.meat_part_id, day)
+    )
+    if date_from is not None:
+        stmt = stmt.where(Order.date_ordered >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(Order.date_ordered < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    chunks = []
+    for rows in db.execute(stmt.execution_options(yield_per=LOAD_CHUNK_ROWS)).partitions():
+        part_ids, days, items, pounds, revenue = zip(*rows)
+        chunks.append((
+            np.array(part_ids, dtype=np.int64),
+            np.array(days, dtype="datetime64[D]"),
+            np.array(items, dtype=np.int64),
+            np.array(pounds, dtype=np.float64),
+            np.array(revenue, dtype=np.float64),
+        ))
+    if not chunks:
+        return (np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=np.int64),
+                np.empty(0), np.empty(0))
+    return tuple(np.concatenate(column) for column in zip(*chunks))
+
+def period_starts(days, period: str):
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    if period == "week":
+        # datetime64 day 0 is a Thursday; weeks here start on Monday
+        ordinal = days.astype(np.int64)
+        return (ordinal - (ordinal + 3) % 7).astype("datetime64[D]")
+    return days
+
+def rounded(values, digits: int = 2):
+    return [None if np.isnan(value) else round(value, digits) for value in values.tolist()]
+
+def margins(db: Session, date_from: date = None, date_to: date = None, period: str = "month"):
+    # Carcass yield and cost per animal, then realized revenue, cost of goods sold and margin per
+    # animal, part and period. Cost is spread evenly over the carcass: every pound of an animal's
+    # parts costs purchase price / total part weight, so margin is revenue - pounds sold * that.
+    animals = db.execute(
+        select(Animal.id, Animal.name, Animal.total_weight_kg, Animal.purchase_price_jmd).order_by(Animal.id)
+    ).all()
+    parts = db.execute(
+        select(MeatPart.id, MeatPart.animal_id, MeatPart.part_name, MeatPart.weight_lb, MeatPart.price_per_lb_jmd)
+        .order_by(MeatPart.id)
+    ).all()
+
+    animal_ids = np.array([animal.id for animal in animals], dtype=np.int64)
+    live_lb = np.array([animal.total_weight_kg for animal in animals], dtype=np.float64) * KG_TO_LB
+    purchase = np.array([animal.purchase_price_jmd for animal in animals], dtype=np.float64)
+    part_ids = np.array([part.id for part in parts], dtype=np.int64)
+    part_weight = np.array([part.weight_lb for part in parts], dtype=np.float64)
+    list_price = np.array([part.price_per_lb_jmd for part in parts], dtype=np.float64)
+    part_animal = index_of(animal_ids)[np.array([part.animal_id for part in parts], dtype=np.int64)]
+
+    carcass_lb = np.bincount(part_animal, weights=part_weight, minlength=len(animals))
+    yield_pct = ratio(carcass_lb, live_lb) * 100
+    cost_per_lb = ratio(purchase, carcass_lb)
+    part_cost_per_lb = cost_per_lb[part_animal]
+
+    sale_part_ids, days, items, pounds, revenue = load_sales(db, date_from, date_to)
+    sale_part = index_of(part_ids, int(sale_part_ids.max(initial=0)))[sale_part_ids]
+    known = sale_part >= 0
+    sale_part, days, items, pounds, revenue = sale_part[known], days[known], items[known], pounds[known], revenue[known]
+
+    # Parts of an animal with no recorded carcass weight have no cost basis; they count as zero cost
+    cogs = pounds * np.nan_to_num(part_cost_per_lb[sale_part])
+    part_items = np.bincount(sale_part, weights=items, minlength=len(parts))
+    part_sold = np.bincount(sale_part, weights=pounds, minlength=len(parts))
+    part_revenue = np.bincount(sale_part, weights=revenue, minlength=len(parts))
+    part_cogs = np.bincount(sale_part, weights=cogs, minlength=len(parts))
+    animal_items = np.bincount(part_animal, weights=part_items, minlength=len(animals))
+    animal_sold = np.bincount(part_animal, weights=part_sold, minlength=len(animals))
+    animal_revenue = np.bincount(part_animal, weights=part_revenue, minlength=len(animals))
+    animal_cogs = np.bincount(part_animal, weights=part_cogs, minlength=len(animals))
+
+    starts, period_index = np.unique(period_starts(days, period), return_inverse=True)
+    period_sold = np.bincount(period_index, weights=pounds, minlength=len(starts))
+    period_revenue = np.bincount(period_index, weights=revenue, minlength=len(starts))
+    period_cogs = np.bincount(period_index, weights=cogs, minlength=len(starts))
+    period_items = np.bincount(period_index, weights=items, minlength=len(starts))
+
+    def summary(items, sold, revenue, cogs):
+        margin = revenue - cogs
+        return {
+            "items": items.astype(np.int64).tolist(),
+            "sold_lb": rounded(sold, 3),
+            "revenue_jmd": rounded(revenue),
+            "cogs_jmd": rounded(cogs),
+            "margin_jmd": rounded(margin),
+            "margin_pct": rounded(ratio(margin * 100, revenue)),
+        }
+
+    def rows(columns):
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    animal_columns = {
+        "animal_id": animal_ids.tolist(),
+        "name": [animal.name for animal in animals],
+        "live_weight_lb": rounded(live_lb, 3),
+        "carcass_lb": rounded(carcass_lb, 3),
+        "yield_pct": rounded(yield_pct),
+        "purchase_price_jmd": rounded(purchase),
+        "cost_per_lb_jmd": rounded(cost_per_lb),
+        **summary(animal_items, animal_sold, animal_revenue, animal_cogs),
+    }
+    part_columns = {
+        "meat_part_id": part_ids.tolist(),
+        "animal_id": animal_ids[part_animal].tolist(),
+        "part_name": [part.part_name for part in parts],
+        "weight_lb": rounded(part_weight, 3),
+        "list_price_per_lb_jmd": rounded(list_price),
+        "cost_per_lb_jmd": rounded(part_cost_per_lb),
+        **summary(part_items, part_sold, part_revenue, part_cogs),
+    }
+    period_columns = {
+        "period_start": [str(start) for start in starts],
+        **summary(period_items, period_sold, period_revenue, period_cogs),
+    }
+    total = summary(*(np.array([column.sum()]) for column in (items, pounds, revenue, cogs)))
+    return {
+        "from": date_from,
+        "to": date_to,
+        "period": period,
+        "totals": {key: values[0] for key, values in total.items()},
+        "animals": rows(animal_columns),
+        "parts": rows(part_columns),
+        "periods": rows(period_columns),
+    }
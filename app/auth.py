@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import User
+
+# Signs every JWT; there is no default, since a known key lets anyone mint an admin token
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY is not set; put a long random value in the environment or .env")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+
+# Verified tokens kept in memory so dashboard polling skips the signature check; 0 disables the cache
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
+# scrypt cost: 16 MiB of memory and a few tens of ms per hash
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+def hash_password(password: str) -> str:
+    # Stored as scrypt$n$r$p$salt$hash so the cost can be raised without invalidating old hashes
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return "$".join(["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+                     base64.b64encode(salt).decode(), base64.b64encode(digest).decode()])
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        scheme, n, r, p, salt, digest = password_hash.split("$")
+        expected = base64.b64decode(digest)
+        actual = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r), p=int(p),
+                                dklen=len(expected))
+    except ValueError:
+        return False
+    return scheme == "scrypt" and hmac.compare_digest(actual, expected)
+
+@lru_cache(maxsize=1)
+def dummy_hash() -> str:
+    return hash_password(secrets.token_hex(16))
+
+def authenticate_user(db: Session, username: str, password: str):
+    # Blocking: a scrypt verification per call. Unknown users still pay for one so timing doesn't leak them.
+    user = db.scalar(select(User).where(User.username == username))
+    if user is None or not user.is_active:
+        verify_password(password, dummy_hash())
+        return None
+    return user if verify_password(password, user.password_hash) else None
+
+def create_access_token(data: dict, expires_delta: timedelta = None):
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_MINUTES))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+class TokenCache:
+    # LRU of token -> claims; an entry is dropped once its exp passes and is never served after it
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, token: str):
+        entry = self.entries.get(token)
+        if entry is None:
+            return None
+        claims, expires = entry
+        if expires <= time.time():
+            del self.entries[token]
+            return None
+        self.entries.move_to_end(token)
+        return claims
+
+    def put(self, token: str, claims: dict):
+        expires = claims.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires, (int, float)):
+            return
+        self.entries[token] = (claims, expires)
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+# Only used from the async dependencies below, so it is only touched from the event loop
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+def verify_token(token: str):
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        token_cache.put(token, claims)
+    return claims
+
+# Async so token checks run inline on the event loop instead of taking a threadpool slot
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    claims = verify_token(token)
+    if not claims or not claims.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return claims["sub"]
+
+async def get_current_admin_user(token: str = Depends(oauth2_scheme)):
+    claims = verify_token(token)
+    if not claims or not claims.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if not claims.get("admin"):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return {"username": claims["sub"]}
@@ -0,0 +1,193 @@
+from collections import defaultdict
+from datetime import datetime
+import csv
+import io
+import json
+import random
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.catalog import catalog_snapshot, invalidate_inventory
+from app.events import listening, publish_inventory, publish_orders_imported
+from app.locations import location_for_city
+from app.models import Order, OrderItem, Inventory
+from app.notifications import enqueue, order_messages, wake_outbox
+from app.orders import MINIMUM_ORDER_LB, butcher_message, confirmation_message
+from app.pricing import DELIVERY_FEE_JMD, PricingError
+from app.reports import add_sales, order_sales
+from app.stock import movement, record_movements
+from app.schemas import OrderRequest
+
+BULK_IMPORT_MAX_LINES = 20000
+
+def parse_order_lines(body: bytes, content_type: str):
+    # CSV with a header row, or one JSON object per line
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # Excel on Windows saves CSV as cp1252; JSON has to be UTF-8
+        if "csv" not in content_type:
+            raise HTTPException(status_code=400, detail="Body must be UTF-8 text")
+        try:
+            text = body.decode("cp1252")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV must be UTF-8 or Windows-1252 text")
+    if "csv" in content_type:
+        rows = []
+        for row in csv.DictReader(io.StringIO(text)):
+            row = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            if "remove_items" in row:
+                row["remove_items"] = [item.strip() for item in row["remove_items"].split(";") if item.strip()]
+            rows.append(row)
+        return rows
+
+    rows = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Line {number} is not valid JSON")
+    return rows
+
+def describe_errors(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+def import_orders(db: Session, rows):
+    if len(rows) > BULK_IMPORT_MAX_LINES:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_LINES} lines per import")
+
+    snapshot = catalog_snapshot(db)
+    prices = snapshot.prices
+    results = []
+    priced = []
+    for number, row in enumerate(rows, start=1):
+        result = {"line": number, "status": "rejected"}
+        results.append(result)
+        try:
+            order = OrderRequest.model_validate(row)
+            location = location_for_city(order.city)
+            if location is None:
+                raise PricingError(f"We don't deliver to {order.city} yet.")
+            if order.pounds < MINIMUM_ORDER_LB:
+                raise PricingError(f"Minimum order for {location} is {MINIMUM_ORDER_LB} lbs.")
+            line = prices.quote_item(order.meat_type.value, order.seasoning_package.value, order.pounds)
+        except ValidationError as exc:
+            result["error"] = describe_errors(exc)
+            continue
+        except PricingError as exc:
+            result["error"] = str(exc)
+            continue
+        priced.append((result, order, line, location))
+
+    # Allocate every line against a snapshot of the candidate rows at its city's shop, the same way
+    # reserve_stock does (one row must cover the line), then apply it in one statement.
+    part_ids = {line["meat_part_id"] for _, _, line, _ in priced}
+    available = defaultdict(list)
+    for inventory_id, meat_part_id, location, stock in db.execute(
+        select(Inventory.id, Inventory.meat_part_id, Inventory.location, Inventory.current_stock_lb)
+        .where(
+            Inventory.meat_part_id.in_(part_ids),
+            Inventory.location.in_({location for _, _, _, location in priced}),
+            Inventory.is_active == True,
+        )
+        .order_by(Inventory.id)
+    ):
+        available[(meat_part_id, location)].append([inventory_id, stock])
+
+    taken = defaultdict(float)
+    accepted = []
+    for result, order, line, location in priced:
+        row = next((row for row in available[(line["meat_part_id"], location)] if row[1] >= order.pounds), None)
+        if row is None:
+            result["error"] = f"Not enough {order.meat_type.value} in stock at {location} for {order.pounds} lbs."
+            continue
+        row[1] -= order.pounds
+        taken[row[0]] += order.pounds
+        accepted.append((result, order, line, location, row[0]))
+
+    if not accepted:
+        return {"created": 0, "rejected": len(results), "results": results}
+
+    table = Inventory.__table__
+    reserved = db.execute(
+        update(table)
+        .where(table.c.id == bindparam("inventory_id"), table.c.current_stock_lb >= bindparam("pounds"))
+        .values(current_stock_lb=table.c.current_stock_lb - bindparam("pounds")),
+        [{"inventory_id": inventory_id, "pounds": pounds} for inventory_id, pounds in taken.items()],
+    ).rowcount
+    if reserved != len(taken):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Stock changed while importing; please retry the import")
+    stock_left = []
+    if listening("inventory"):
+        stock_left = db.execute(select(Inventory.id, Inventory.current_stock_lb).where(Inventory.id.in_(taken))).all()
+
+    pins = [str(random.randint(1000, 9999)) for _ in accepted]
+    now = datetime.utcnow()
+    order_ids = db.scalars(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "customer_name": order.customer_name,
+                "phone_number": order.phone_number,
+                "location": location,
+                "customer_pin": pin,
+                "is_paid": False,
+                "date_ordered": now,
+            }
+            for (_, order, _, location, _), pin in zip(accepted, pins)
+        ],
+    ).all()
+    db.execute(
+        insert(OrderItem),
+        [
+            {
+                "order_id": order_id,
+                "meat_part_id": line["meat_part_id"],
+                "pounds_ordered": order.pounds,
+                "seasoned": order.seasoning_package != "none",
+                "seasonings": order.seasoning_package.value,
+                "unit_price": line["price_per_pound"],
+                "total_price": line["line_total"],
+            }
+            for (_, order, line, _, _), order_id in zip(accepted, order_ids)
+        ],
+    )
+    record_movements(db, [
+        movement(inventory_id, "sale", -order.pounds, order_id=order_id)
+        for (_, order, _, _, inventory_id), order_id in zip(accepted, order_ids)
+    ])
+    add_sales(db, [
+        sale
+        for _, order, line, location, _ in accepted
+        for sale in order_sales(snapshot.part_meat_types, now.date(), location, False, [
+            (line["meat_part_id"], order.seasoning_package.value, order.pounds, line["line_total"])
+        ])
+    ])
+    messages = []
+    for (_, order, line, location, _), order_id, pin in zip(accepted, order_ids, pins):
+        total = line["line_total"] + DELIVERY_FEE_JMD
+        messages.extend(order_messages(order_id, order.phone_number, confirmation_message(order, total, pin, location),
+                                       butcher_message(order_id, order, total)))
+    enqueue(db, messages)
+    db.commit()
+    if messages:
+        wake_outbox()
+    invalidate_inventory({location for _, _, _, location, _ in accepted})
+    publish_inventory([{"inventory_id": inventory_id, "stock_lb": stock_lb} for inventory_id, stock_lb in stock_left])
+    publish_orders_imported(order_ids)
+
+    for (result, _, line, location, _), order_id, pin in zip(accepted, order_ids, pins):
+        result.update(
+            status="created",
+            order_id=order_id,
+            location=location,
+            total_cost_jmd=int(line["line_total"] + DELIVERY_FEE_JMD),
+            confirmation_pin=pin,
+        )
+    return {"created": len(accepted), "rejected": len(results) - len(accepted), "results": results}
@@ -0,0 +1,153 @@
+from collections import defaultdict
+import hashlib
+import json
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.models import MeatPart, Inventory, Animal, SeasoningPackage
+from app.pricing import PriceTable, meat_type_for
+
+# Upper bound on how stale a worker's snapshot can get when another worker wrote the catalog
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+# Same for /inventory rows, cached per location; 0 reads the database every time
+INVENTORY_CACHE_TTL = float(os.getenv("INVENTORY_CACHE_TTL", "5"))
+
+def _entry(data):
+    # Pre-encoded body plus a content hash ETag, so every worker agrees on the tag
+    body = json.dumps(data, separators=(",", ":")).encode()
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"', body
+
+class CatalogSnapshot:
+    def __init__(self, animals, meat_parts, seasonings):
+        self.loaded_at = time.monotonic()
+        self.prices = PriceTable(animals, meat_parts, seasonings)
+        self.animals = _entry(animals)
+        self.meat_parts = _entry(meat_parts)
+        by_animal = defaultdict(list)
+        for part in meat_parts:
+            by_animal[part["animal_id"]].append(part)
+        self.meat_parts_by_animal = {animal_id: _entry(parts) for animal_id, parts in by_animal.items()}
+        self.no_meat_parts = _entry([])
+        # meat part id -> meat type, for the sales rollups
+        animal_names = {animal["id"]: animal["name"] for animal in animals}
+        self.part_meat_types = {part["id"]: meat_type_for(animal_names.get(part["animal_id"], "")) for part in meat_parts}
+
+    def parts_for(self, animal_id: int):
+        return self.meat_parts_by_animal.get(animal_id, self.no_meat_parts)
+
+_lock = threading.Lock()
+_snapshot = None
+_generation = 0
+
+# location (None for every location) -> (loaded_at, /inventory rows), and a generation per key so a
+# load that raced an invalidation isn't stored
+_inventory = {}
+_inventory_generation = defaultdict(int)
+
+def invalidate_catalog():
+    global _snapshot, _generation
+    with _lock:
+        _generation += 1
+        _snapshot = None
+    # Inventory rows carry part and animal names, so they go too
+    invalidate_inventory()
+
+def invalidate_inventory(locations=None):
+    # An order only drops its own location's rows (and the all-locations list), so a rush at one shop
+    # leaves the other shops' cached stock alone. None drops everything.
+    with _lock:
+        keys = set(_inventory_generation) if locations is None else {*locations, None}
+        for key in keys:
+            _inventory_generation[key] += 1
+            _inventory.pop(key, None)
+
+def cached_snapshot():
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at < CATALOG_CACHE_TTL:
+        return snapshot
+    return None
+
+def catalog_snapshot(db: Session):
+    global _snapshot
+    snapshot = cached_snapshot()
+    if snapshot is not None:
+        return snapshot
+
+    generation = _generation
+    animals = [
+        {
+            "id": animal.id,
+            "name": animal.name,
+            "total_weight_kg": animal.total_weight_kg,
+            "purchase_price_jmd": animal.purchase_price_jmd,
+        }
+        for animal in db.query(Animal).order_by(Animal.id)
+    ]
+    meat_parts = [
+        {
+            "id": part.id,
+            "animal_id": part.animal_id,
+            "part_name": part.part_name,
+            "weight_lb": part.weight_lb,
+            "price_per_lb_jmd": part.price_per_lb_jmd,
+        }
+        for part in db.query(MeatPart).order_by(MeatPart.id)
+    ]
+    seasonings = [
+        {"name": seasoning.name, "fee_jmd": seasoning.fee_jmd}
+        for seasoning in db.query(SeasoningPackage).order_by(SeasoningPackage.id)
+    ]
+    snapshot = CatalogSnapshot(animals, meat_parts, seasonings)
+    with _lock:
+        # Don't publish a snapshot that a concurrent write has already invalidated
+        if generation == _generation:
+            _snapshot = snapshot
+    return snapshot
+
+async def catalog_snapshot_async(db):
+    # Only touch the database when the snapshot has been invalidated or has expired
+    return cached_snapshot() or await db.run_sync(catalog_snapshot)
+
+def list_inventory(db: Session, inventory_ids=None, location: str = None):
+    query = (
+        db.query(Inventory, MeatPart, Animal)
+        .join(MeatPart, Inventory.meat_part_id == MeatPart.id)
+        .join(Animal, MeatPart.animal_id == Animal.id)
+    )
+    if inventory_ids is not None:
+        query = query.filter(Inventory.id.in_(inventory_ids))
+    if location is not None:
+        query = query.filter(Inventory.location == location)
+    results = query.all()
+    inventory_data = []
+    for inv, part, animal in results:
+        inventory_data.append({
+            "inventory_id": inv.id,
+            "meat_part": part.part_name,
+            "animal": animal.name,
+            "stock_lb": inv.current_stock_lb,
+            "seasoned": inv.is_seasoned,
+            "location": inv.location,
+        })
+    return inventory_data
+
+def inventory_rows(db: Session, location: str = None):
+    entry = _inventory.get(location)
+    if entry is not None and time.monotonic() - entry[0] < INVENTORY_CACHE_TTL:
+        return entry[1]
+    with _lock:
+        generation = _inventory_generation[location]
+    rows = list_inventory(db, location=location)
+    with _lock:
+        if generation == _inventory_generation[location]:
+            _inventory[location] = (time.monotonic(), rows)
+    return rows
+
+async def inventory_rows_async(db, location: str = None):
+    entry = _inventory.get(location)
+    if entry is not None and time.monotonic() - entry[0] < INVENTORY_CACHE_TTL:
+        return entry[1]
+    return await db.run_sync(inventory_rows, location)
@@ -1,24 +1,146 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+# Base class for ORM models; the schema itself is managed by the migrations in migrations/
+from app.models import Base
+
+def env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
 # Replace with your actual database path or URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./meatapp.db"  # Example: SQLite local file
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./meatapp.db")  # Example: SQLite local file
+
+# Serve the order and catalog endpoints from an async engine instead of the threadpool
+ASYNC_DB = env_flag("ASYNC_DB")
+
+# Connection pool sizing; ignored for in-memory SQLite, which uses a single connection per thread
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", "true")
+
+# SQLite profile: WAL lets readers run alongside the single writer, NORMAL sync is safe under WAL
+SQLITE_WAL = env_flag("SQLITE_WAL", "true")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+
+def to_async_url(url: str) -> str:
+    # sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://... -> postgresql+asyncpg://...
+    scheme, rest = url.split(":", 1)
+    if scheme == "sqlite":
+        return "sqlite+aiosqlite:" + rest
+    if scheme in ("postgres", "postgresql"):
+        return "postgresql+asyncpg:" + rest
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+
+# GET routes read through their own engine and pool. For SQLite that is the same file opened read-only,
+# so admin reads never take the write lock and, under WAL, never wait on order writes. For Postgres
+# point it at a streaming replica; reads there may trail the primary by the replication lag.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL", to_async_url(READ_DATABASE_URL))
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def is_memory(url: str) -> bool:
+    return ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:")
+
+def read_only_url(url: str) -> str:
+    # sqlite:///x.db -> sqlite:///file:x.db?mode=ro&uri=true, which the driver opens with SQLITE_OPEN_READONLY
+    scheme, sep, path = url.partition(":///")
+    if not is_sqlite(url) or not sep or path.startswith("file:"):
+        return url
+    path, _, query = path.partition("?")
+    return f"{scheme}:///file:{path}?{query + '&' if query else ''}mode=ro&uri=true"
+
+def engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if not is_memory(url):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+def apply_sqlite_profile(engine, wal: bool = SQLITE_WAL):
+    # Runs once per new DBAPI connection; engine may be sync or async
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    event.listen(getattr(engine, "sync_engine", engine), "connect", set_pragmas)
+    return engine
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URL, wal: bool = SQLITE_WAL):
+    engine = create_engine(url, **engine_options(url))
+    return apply_sqlite_profile(engine, wal) if is_sqlite(url) else engine
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, wal: bool = SQLITE_WAL):
+    engine = create_async_engine(url, **engine_options(url))
+    return apply_sqlite_profile(engine, wal) if is_sqlite(url) else engine
+
+def read_engine_options(url: str) -> dict:
+    # Postgres sessions are also marked read only, so a write sent here by mistake fails even on the primary
+    return {} if is_sqlite(url) else {"execution_options": {"postgresql_readonly": True}}
+
+def make_read_engine(url: str = READ_DATABASE_URL):
+    # journal_mode can't be switched on a read-only connection; the primary engine sets WAL on the file
+    engine = create_engine(read_only_url(url), **engine_options(url), **read_engine_options(url))
+    return apply_sqlite_profile(engine, wal=False) if is_sqlite(url) else engine
+
+def make_async_read_engine(url: str = ASYNC_READ_DATABASE_URL):
+    engine = create_async_engine(read_only_url(url), **engine_options(url), **read_engine_options(url))
+    return apply_sqlite_profile(engine, wal=False) if is_sqlite(url) else engine
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+engine = make_engine()
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Base class for ORM models
-Base = declarative_base()
+# The async driver is only imported when the async path is enabled
+async_engine = make_async_engine() if ASYNC_DB else None
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False) if ASYNC_DB else None
+
+# An in-memory database exists only on the primary's connection, so reads share it
+read_engine = engine if is_memory(READ_DATABASE_URL) else make_read_engine()
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+async_read_engine = None
+if ASYNC_DB:
+    async_read_engine = async_engine if is_memory(ASYNC_READ_DATABASE_URL) else make_async_read_engine()
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False) if ASYNC_DB else None
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
 
-# Import models so they register with Base
-from app import models
+def get_read_db():
+    # For GET routes only: every write goes through get_db
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
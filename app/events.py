@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+
+# Per-subscriber backlog; a client that falls this far behind is told to reload instead
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_MAX_SUBSCRIBERS = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "1000"))
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+TOPICS = {"inventory", "orders"}
+
+RESYNC = 'event: resync\ndata: {"type": "resync"}\n\n'
+
+def sse_message(event_type: str, payload: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+class Subscriber:
+    __slots__ = ("topics", "queue")
+
+    def __init__(self, topics, queue_size: int):
+        self.topics = topics
+        self.queue = asyncio.Queue(queue_size)
+
+class Broadcaster:
+    # Fans events out to SSE subscribers. Subscribers live on the event loop; publishers may be
+    # sync endpoints in the threadpool, so delivery is handed to the loop with call_soon_threadsafe.
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.loop = None
+
+    def subscribe(self, topics) -> Subscriber:
+        self.loop = asyncio.get_running_loop()
+        subscriber = Subscriber(frozenset(topics), self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, topic: str, event_type: str, payload: dict):
+        # Cheap no-op until someone listens; the message is encoded once, in the caller's thread
+        if not self.subscribers or self.loop is None:
+            return
+        message = sse_message(event_type, payload)
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.fanout(topic, message)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.fanout, topic, message)
+        except RuntimeError:
+            # Loop already closed (shutdown); nobody is left to deliver to
+            pass
+
+    def fanout(self, topic: str, message: str):
+        for subscriber in list(self.subscribers):
+            if topic not in subscriber.topics:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Backpressure: never block writers or buffer without bound. Drop the slow
+                # client's backlog and have it reload once it catches up.
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(RESYNC)
+
+broadcaster = Broadcaster()
+
+async def stream(subscriber: Subscriber):
+    # Starlette cancels this generator when the client disconnects; the finally unsubscribes
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(subscriber.queue.get(), EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+# Publishers, called after the write has committed
+
+def listening(topic: str) -> bool:
+    # Lets publishers skip building a payload that needs an extra query
+    return any(topic in subscriber.topics for subscriber in list(broadcaster.subscribers))
+
+def publish_inventory(items):
+    # Each item carries inventory_id plus whichever /inventory fields changed
+    if items:
+        broadcaster.publish("inventory", "inventory", {"type": "inventory", "items": items})
+
+def publish_order_created(order_id: int, customer_name: str, location: str, total_cost_jmd: int, date_ordered):
+    broadcaster.publish("orders", "order_created", {
+        "type": "order_created", "order_id": order_id, "customer_name": customer_name, "location": location,
+        "total_cost_jmd": total_cost_jmd, "date_ordered": date_ordered.isoformat(), "is_paid": False,
+    })
+
+def publish_orders_imported(order_ids):
+    if order_ids:
+        broadcaster.publish("orders", "orders_imported", {
+            "type": "orders_imported", "count": len(order_ids), "first_id": min(order_ids), "last_id": max(order_ids),
+        })
+
+def publish_order_paid(order_id: int, is_paid: bool):
+    broadcaster.publish("orders", "order_paid", {"type": "order_paid", "order_id": order_id, "is_paid": is_paid})
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app.database import ReadSessionLocal
+from app.models import Order, OrderItem, MeatPart
+
+EXPORT_BATCH_SIZE = 1000
+
+# One row per order item; orders without items export a single row with empty item fields
+EXPORT_COLUMNS = [
+    "order_id", "date_ordered", "customer_name", "phone_number", "location", "status", "is_paid",
+    "meat_part", "pounds_ordered", "seasonings", "unit_price", "total_price",
+]
+
+# Spreadsheets run a cell starting with one of these as a formula. Names and phone numbers come from
+# the public order form, so such cells get a leading ' and open as plain text.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def spreadsheet_safe(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def export_query(date_from=None, date_to=None):
+    query = (
+        select(
+            Order.id, Order.date_ordered, Order.customer_name, Order.phone_number, Order.location,
+            Order.status, Order.is_paid, MeatPart.part_name, OrderItem.pounds_ordered,
+            OrderItem.seasonings, OrderItem.unit_price, OrderItem.total_price,
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MeatPart, OrderItem.meat_part_id == MeatPart.id)
+        .order_by(Order.date_ordered, Order.id, OrderItem.id)
+    )
+    if date_from:
+        query = query.where(Order.date_ordered >= date_from)
+    if date_to:
+        query = query.where(Order.date_ordered < date_to)
+    # yield_per streams through a server-side cursor where the driver supports one
+    return query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+def stream_orders(fmt: str, date_from=None, date_to=None):
+    # Owns its session: the response body is produced after the request dependencies have exited
+    db = ReadSessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+
+        result = db.execute(export_query(date_from, date_to))
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                values = list(row)
+                values[1] = values[1].isoformat() if values[1] else None
+                if fmt == "csv":
+                    writer.writerow([spreadsheet_safe(value) for value in values])
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+    finally:
+        db.close()
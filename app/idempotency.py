@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import IdempotencyKey
+
+# How long a key's response is replayed
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# Responses kept in memory per app worker; older ones are still replayed from the database
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# A key still running after this long (its worker died) is taken over by the next retry
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "30"))
+# How long a duplicate waits on the original running in another worker before getting a 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_POLL_SECONDS = 0.05
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "300"))
+IDEMPOTENCY_PURGE_BATCH = 10000
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+def fingerprint(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+def key_reused():
+    return HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+
+class ResponseCache:
+    # LRU of key -> (fingerprint, response), each entry dropped once its key expires
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        fingerprint, response, expires = entry
+        if expires <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return fingerprint, response
+
+    def put(self, key: str, fingerprint: str, response: dict, expires: float):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = (fingerprint, response, expires)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+# Key table, one short transaction per call
+
+def claim_key(db: Session, key: str, fingerprint: str):
+    # Returns (owner, None) when this request now runs the key, (None, (response, expires_at)) when it
+    # already ran, and (None, None) while another worker holds a live lease on it
+    while True:
+        now = datetime.utcnow()
+        owner = uuid.uuid4().hex
+        claim = {"fingerprint": fingerprint, "status": "running", "owner": owner, "response": None, "created_at": now,
+                 "locked_until": now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+                 "expires_at": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)}
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        inserted = db.execute(
+            dialect.insert(IdempotencyKey).values(key=key, **claim).on_conflict_do_nothing(index_elements=["key"])
+        ).rowcount
+        if inserted:
+            db.commit()
+            return owner, None
+
+        row = db.execute(
+            select(IdempotencyKey.fingerprint, IdempotencyKey.status, IdempotencyKey.owner, IdempotencyKey.response,
+                   IdempotencyKey.locked_until, IdempotencyKey.expires_at)
+            .where(IdempotencyKey.key == key)
+        ).one_or_none()
+        if row is None:
+            # Purged between the insert and the read
+            db.rollback()
+            continue
+        if row.expires_at > now and (row.status == "done" or row.locked_until > now):
+            db.rollback()
+            if row.fingerprint != fingerprint:
+                raise key_reused()
+            return None, ((json.loads(row.response), row.expires_at) if row.status == "done" else None)
+
+        # Expired, or its owner died mid-request: take it over unless another retry got there first
+        taken = db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.owner == row.owner)
+            .values(**claim)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if taken:
+            db.commit()
+            return owner, None
+        db.rollback()
+
+def store_response(db: Session, key: str, owner: str, response: dict):
+    # In the caller's transaction, so the key turns "done" exactly when the order commits. If the lease
+    # was lost to a retry, the caller must roll back instead of committing a second order.
+    stored = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.owner == owner, IdempotencyKey.status == "running")
+        .values(status="done", response=json.dumps(response, default=str))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not stored:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A retry with this Idempotency-Key took over the request")
+
+def release_key(db: Session, key: str, owner: str):
+    # The request failed without committing, so the next retry with the key runs it again
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.owner == owner, IdempotencyKey.status == "running")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def purge_expired(db: Session, limit: int = IDEMPOTENCY_PURGE_BATCH):
+    expired = select(IdempotencyKey.key).where(IdempotencyKey.expires_at <= datetime.utcnow()).limit(limit)
+    purged = db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.key.in_(expired)).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return purged
+
+class IdempotencyGuard:
+    # Per-worker front of the key table. Replays come from memory when they can, and requests arriving
+    # while the same key is running in this worker await its outcome instead of running again. Across
+    # workers the key row is the lock. Only successful responses are stored; a failed request releases
+    # its key so the client's retry runs it again.
+    def __init__(self, cache_size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.cache = ResponseCache(cache_size)
+        # key -> (fingerprint, future of the running request); only touched from the event loop
+        self.running = {}
+        self.next_purge = 0.0
+
+    async def run(self, key: str, fingerprint: str, call, fn, *args):
+        # call(f, *args) runs f(db, *args) on the request's session, in the threadpool or with run_sync.
+        # fn is called as fn(db, *args, (key, owner)) and must store_response before it commits.
+        # Returns (response, replayed).
+        while True:
+            cached = self.cache.get(key)
+            if cached is not None:
+                if cached[0] != fingerprint:
+                    raise key_reused()
+                return cached[1], True
+            running = self.running.get(key)
+            if running is None:
+                break
+            if running[0] != fingerprint:
+                raise key_reused()
+            try:
+                return (await asyncio.shield(running[1])), True
+            except asyncio.CancelledError:
+                # The original's client went away mid-request; this one takes the key over
+                if running[1].cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Marks a failure as retrieved when no duplicate was waiting on it
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.running[key] = (fingerprint, future)
+        try:
+            response, replayed = await self.execute(key, fingerprint, call, fn, args)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(response)
+        finally:
+            if not future.done():
+                future.cancel()
+            del self.running[key]
+        return response, replayed
+
+    async def execute(self, key: str, fingerprint: str, call, fn, args):
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            owner, stored = await call(claim_key, key, fingerprint)
+            if owner is not None:
+                break
+            if stored is not None:
+                response, expires_at = stored
+                self.cache.put(key, fingerprint, response, time.time() + (expires_at - datetime.utcnow()).total_seconds())
+                return response, True
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress",
+                                    headers={"Retry-After": "1"})
+            await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+        try:
+            response = await call(fn, *args, (key, owner))
+        except Exception:
+            # Not on cancellation: the threadpool may still be using the session, and if that order
+            # commits, the key is stored with it and retries replay it
+            try:
+                await call(release_key, key, owner)
+            except Exception:
+                # The lease runs out instead
+                pass
+            raise
+        self.cache.put(key, fingerprint, response, time.time() + IDEMPOTENCY_TTL_SECONDS)
+        if time.monotonic() >= self.next_purge:
+            self.next_purge = time.monotonic() + IDEMPOTENCY_PURGE_SECONDS
+            await call(purge_expired)
+        return response, False
+
+order_idempotency = IdempotencyGuard()
@@ -0,0 +1,40 @@
+import os
+import re
+
+# Shops and the towns each one delivers to. A parish name on its own routes to its shop too.
+LOCATION_CITIES = {
+    "St. Thomas": [
+        "Morant Bay", "Yallahs", "Seaforth", "Port Morant", "Bath", "Golden Grove", "Trinityville", "Easington",
+        "Llandewey", "Albion", "Cedar Valley", "Hampton Court", "Lyssons", "Pamphret", "White Horses", "Dalvey",
+    ],
+    "Kingston": [
+        "Kingston", "St. Andrew", "Half Way Tree", "New Kingston", "Cross Roads", "Downtown Kingston", "Papine",
+        "Mona", "Liguanea", "Constant Spring", "Stony Hill", "Red Hills", "Harbour View", "Bull Bay", "Gordon Town",
+        "Barbican", "Manor Park", "Meadowbrook", "Duhaney Park", "Olympic Gardens", "Port Royal", "Norbrook",
+    ],
+    "St. Catherine": [
+        "Spanish Town", "Portmore", "Old Harbour", "Old Harbour Bay", "Linstead", "Bog Walk", "Ewarton",
+        "Greater Portmore", "Gregory Park", "Waterford", "Edgewater", "Independence City", "Bridgeport",
+        "Hellshire", "Sligoville", "Riversdale", "Innswood", "Gutters", "Point Hill",
+    ],
+}
+
+LOCATIONS = list(LOCATION_CITIES)
+# Orders used to go to St. Thomas whatever the city, so towns missing from the lists above still do.
+# Set to an empty string to reject them instead.
+UNKNOWN_CITY_LOCATION = os.getenv("UNKNOWN_CITY_LOCATION", "St. Thomas")
+
+def city_key(city: str) -> str:
+    # "St Thomas", "st. thomas" and "Saint Thomas" are the same place
+    words = re.findall(r"[a-z0-9]+", city.lower())
+    return " ".join("saint" if word == "st" else word for word in words)
+
+CITY_LOCATIONS = {
+    city_key(city): location
+    for location, cities in LOCATION_CITIES.items()
+    for city in [location, *cities]
+}
+
+def location_for_city(city: str):
+    # The shop that delivers to `city`, or None when it isn't served
+    return CITY_LOCATIONS.get(city_key(city)) or UNKNOWN_CITY_LOCATION or None
@@ -0,0 +1,193 @@
+import bisect
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import env_flag
+
+METRICS_ENABLED = env_flag("METRICS_ENABLED", "true")
+# Log requests slower than this with their SQL breakdown; 0 turns the log off
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "commits", "commit_seconds", "queries")
+
+    def __init__(self, keep_queries: bool = False):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        # statement text -> [count, seconds], only kept when the slow request log is on
+        self.queries = {} if keep_queries else None
+
+# Set by the middleware for the lifetime of a request. Sync endpoints run in the threadpool
+# with a copy of the context, so they share the same RequestStats object.
+current_request: ContextVar = ContextVar("current_request", default=None)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RouteMetrics:
+    __slots__ = ("responses", "latency", "statements", "db_seconds", "commits", "commit_seconds")
+
+    def __init__(self):
+        self.responses = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.commits = 0
+        self.commit_seconds = 0.0
+
+# (method, route template) -> RouteMetrics; only touched from the event loop
+routes = {}
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    started = conn.info.pop("query_started", None)
+    if stats is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.statements += 1
+    stats.db_seconds += elapsed
+    if stats.queries is not None:
+        entry = stats.queries.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+def before_commit(session):
+    if current_request.get() is not None:
+        session.info["commit_started"] = time.perf_counter()
+
+def after_commit(session):
+    stats = current_request.get()
+    started = session.info.pop("commit_started", None)
+    if stats is not None and started is not None:
+        stats.commits += 1
+        stats.commit_seconds += time.perf_counter() - started
+
+def instrument(*engines):
+    # Accepts sync or async engines (async ones emit events on their sync_engine); None is skipped,
+    # as are engines already instrumented (the read engine is the primary for in-memory databases)
+    for engine in filter(None, engines):
+        engine = getattr(engine, "sync_engine", engine)
+        if event.contains(engine, "before_cursor_execute", before_cursor_execute):
+            continue
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    # Commit time includes the flush, which is what an endpoint actually waits on
+    if not event.contains(Session, "before_commit", before_commit):
+        event.listen(Session, "before_commit", before_commit)
+        event.listen(Session, "after_commit", after_commit)
+
+def record(method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+    metrics = routes.get((method, route))
+    if metrics is None:
+        metrics = routes[(method, route)] = RouteMetrics()
+    metrics.responses[status] = metrics.responses.get(status, 0) + 1
+    metrics.latency.observe(elapsed)
+    metrics.statements.observe(stats.statements)
+    metrics.db_seconds += stats.db_seconds
+    metrics.commits += stats.commits
+    metrics.commit_seconds += stats.commit_seconds
+
+def log_slow_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+    top = sorted(stats.queries.items(), key=lambda item: item[1][1], reverse=True)[:5]
+    breakdown = "".join(
+        f"\n  {count}x {seconds * 1000:.1f} ms  {' '.join(statement.split())[:200]}"
+        for statement, (count, seconds) in top
+    )
+    logger.warning(
+        "slow request %s %s -> %d in %.1f ms: %d statements, %.1f ms in SQL, %d commits, %.1f ms committing%s",
+        method, route, status, elapsed * 1000, stats.statements, stats.db_seconds * 1000,
+        stats.commits, stats.commit_seconds * 1000, breakdown,
+    )
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: no request/response wrapping, and the timing covers streamed bodies
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(SLOW_REQUEST_MS > 0)
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            # Label by route template so /orders/{order_id}/paid is one series, not one per order
+            route = getattr(scope.get("route"), "path", "unmatched")
+            record(scope["method"], route, status, elapsed, stats)
+            if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+                log_slow_request(scope["method"], route, status, elapsed, stats)
+
+def render_histogram(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+def render_metrics() -> str:
+    # Prometheus text exposition format 0.0.4
+    families = {
+        "http_requests_total": ("counter", "Responses by route and status code", []),
+        "http_request_duration_seconds": ("histogram", "Request latency by route", []),
+        "http_request_db_statements": ("histogram", "SQL statements issued per request", []),
+        "db_query_seconds_total": ("counter", "Time spent executing SQL by route", []),
+        "db_commits_total": ("counter", "Session commits by route", []),
+        "db_commit_seconds_total": ("counter", "Time spent in session commit (flush included) by route", []),
+    }
+    for (method, route), metrics in sorted(routes.items()):
+        labels = f'method="{method}",route="{route}"'
+        for status, count in sorted(metrics.responses.items()):
+            families["http_requests_total"][2].append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+        render_histogram(families["http_request_duration_seconds"][2], "http_request_duration_seconds", labels, metrics.latency)
+        render_histogram(families["http_request_db_statements"][2], "http_request_db_statements", labels, metrics.statements)
+        families["db_query_seconds_total"][2].append(f"db_query_seconds_total{{{labels}}} {metrics.db_seconds}")
+        families["db_commits_total"][2].append(f"db_commits_total{{{labels}}} {metrics.commits}")
+        families["db_commit_seconds_total"][2].append(f"db_commit_seconds_total{{{labels}}} {metrics.commit_seconds}")
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
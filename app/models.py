@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Date, DateTime, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -10,12 +10,13 @@ class Animal(Base):
     name = Column(String, nullable=False)
     total_weight_kg = Column(Float, nullable=False)
     purchase_price_jmd = Column(Float, nullable=False)
+    date_purchased = Column(DateTime, default=datetime.utcnow)
     meat_parts = relationship("MeatPart", back_populates="animal")
 
 class MeatPart(Base):
     __tablename__ = "meat_parts"
     id = Column(Integer, primary_key=True, index=True)
-    animal_id = Column(Integer, ForeignKey("animal.id"), nullable=False)
+    animal_id = Column(Integer, ForeignKey("animal.id"), nullable=False, index=True)
     part_name = Column(String, nullable=False)
     weight_lb = Column(Float, nullable=False)
     price_per_lb_jmd = Column(Float, nullable=False)
@@ -28,6 +29,7 @@ class SeasoningPackage(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
     ingredients = Column(String, nullable=False)
+    fee_jmd = Column(Float, nullable=False, default=0, server_default="0")
     inventory_items = relationship("Inventory", back_populates="seasoning_package")
 
 class Inventory(Base):
@@ -42,6 +44,11 @@ class Inventory(Base):
     meat_part = relationship("MeatPart", back_populates="inventory_items")
     seasoning_package = relationship("SeasoningPackage", back_populates="inventory_items")
 
+    # Stock reservation looks rows up by part, active flag and location
+    __table_args__ = (
+        Index("ix_inventory_meat_part_active_location", "meat_part_id", "is_active", "location"),
+    )
+
 class Order(Base):
     __tablename__ = "orders"
     id = Column(Integer, primary_key=True, index=True)
@@ -55,10 +62,18 @@ class Order(Base):
     is_paid = Column(Boolean, default=False)
     items = relationship("OrderItem", back_populates="order")
 
+    # Keyset pagination for the admin order list, optionally filtered by payment, status or location
+    __table_args__ = (
+        Index("ix_orders_date_ordered_id", "date_ordered", "id"),
+        Index("ix_orders_is_paid_date_ordered_id", "is_paid", "date_ordered", "id"),
+        Index("ix_orders_status_date_ordered_id", "status", "date_ordered", "id"),
+        Index("ix_orders_location_date_ordered_id", "location", "date_ordered", "id"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     meat_part_id = Column(Integer, ForeignKey("meat_parts.id"))
     pounds_ordered = Column(Float, nullable=False)
     seasoned = Column(Boolean, default=False)
@@ -67,3 +82,102 @@ class OrderItem(Base):
     total_price = Column(Float, nullable=False)
     order = relationship("Order", back_populates="items")
     meat_part = relationship("MeatPart", back_populates="order_items")
+
+# Append-only: every change to Inventory.current_stock_lb is written here in the same transaction
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    id = Column(Integer, primary_key=True)
+    inventory_id = Column(Integer, ForeignKey("inventory.id"), nullable=False)
+    kind = Column(String, nullable=False)
+    delta_lb = Column(Float, nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    note = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # One-way on purpose: inventory and orders are returned as raw ORM objects, and a back-reference
+    # would drag their whole history into the response
+    inventory = relationship("Inventory")
+    order = relationship("Order")
+
+    # Per-row history and "stock as of" range sums
+    __table_args__ = (
+        Index("ix_stock_movements_inventory_created_at", "inventory_id", "created_at"),
+    )
+
+# Ledger balance per inventory row at a point in time, so "as of" queries only sum movements since
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+    id = Column(Integer, primary_key=True)
+    inventory_id = Column(Integer, ForeignKey("inventory.id"), nullable=False)
+    as_of = Column(DateTime, nullable=False)
+    stock_lb = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_inventory_as_of", "inventory_id", "as_of"),
+    )
+
+class User(Base):
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, nullable=False)
+    password_hash = Column(String, nullable=False)
+    is_admin = Column(Boolean, nullable=False, default=False, server_default="0")
+    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Daily sales per location, meat type, seasoning and payment state, kept current by the order and
+# payment write paths and rebuilt from orders by rebuild_sales.py. Reports read only this table.
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    location = Column(String, nullable=False)
+    meat_type = Column(String, nullable=False)
+    seasoning = Column(String, nullable=False)
+    is_paid = Column(Boolean, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    pounds = Column(Float, nullable=False, default=0)
+    revenue_jmd = Column(Float, nullable=False, default=0)
+
+    # Upsert target, and day-range scans for reports
+    __table_args__ = (
+        Index("ux_sales_daily_key", "day", "location", "meat_type", "seasoning", "is_paid", unique=True),
+    )
+
+# Outbound customer and butcher notifications, written in the order's transaction and sent by the
+# outbox worker. next_attempt_at doubles as the claim lease while a message is being sent.
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    channel = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Workers claim due messages in next_attempt_at order
+    __table_args__ = (
+        Index("ix_outbox_messages_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+# Responses to POST /order by Idempotency-Key, shared by every app worker. A row is "running" while its
+# owner holds the lease and "done" once the response is stored, in the same transaction as the order.
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="running")
+    locked_until = Column(DateTime, nullable=False)
+    owner = Column(String, nullable=False)
+    response = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    # Purging expired keys
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -0,0 +1,271 @@
+import asyncio
+import importlib
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, env_flag
+from app.models import OutboxMessage
+
+NOTIFY_ENABLED = env_flag("NOTIFY_ENABLED", "true")
+NOTIFY_CHANNEL = os.getenv("NOTIFY_CHANNEL", "whatsapp")
+# The butcher gets a summary of every order; leave unset to notify customers only
+BUTCHER_PHONE = os.getenv("BUTCHER_PHONE", "")
+# "log", "webhook", "stub" or "package.module:Class"
+NOTIFY_TRANSPORT = os.getenv("NOTIFY_TRANSPORT", "log")
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL", "")
+NOTIFY_TIMEOUT_SECONDS = float(os.getenv("NOTIFY_TIMEOUT_SECONDS", "10"))
+
+# Worker loops started with the app; set to 0 when notify_worker.py runs them in a separate process
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+# Fallback poll; committed orders wake the workers directly
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+# Retry n waits about base * 2**(n-1) seconds, capped
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "10"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+# A claimed message still unsent after this long (its worker died) is claimed again
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+
+logger = logging.getLogger(__name__)
+
+# Enqueueing, inside the caller's transaction
+
+def outbox_message(order_id: int, recipient: str, body: str, channel: str = NOTIFY_CHANNEL) -> dict:
+    now = datetime.utcnow()
+    return {"order_id": order_id, "channel": channel, "recipient": recipient, "body": body, "status": "pending",
+            "attempts": 0, "next_attempt_at": now, "created_at": now}
+
+def order_messages(order_id: int, phone_number: str, confirmation: str, butcher_summary: str):
+    if not NOTIFY_ENABLED:
+        return []
+    messages = [outbox_message(order_id, phone_number, confirmation)]
+    if BUTCHER_PHONE:
+        messages.append(outbox_message(order_id, BUTCHER_PHONE, butcher_summary))
+    return messages
+
+def enqueue(db: Session, messages):
+    # Plain inserts: the request only pays for the rows, never for the send
+    if messages:
+        db.execute(insert(OutboxMessage), messages)
+
+# Claiming and recording results, one short transaction each
+
+def claim_batch(db: Session, limit: int):
+    # Due messages (or ones whose lease ran out) are flipped to "sending" with a fresh lease in one
+    # conditional UPDATE, so concurrent workers and processes never claim the same message
+    now = datetime.utcnow()
+    claimable = (OutboxMessage.status.in_(("pending", "sending")), OutboxMessage.next_attempt_at <= now)
+    due = select(OutboxMessage.id).where(*claimable).order_by(OutboxMessage.next_attempt_at).limit(limit)
+    rows = db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(due), *claimable)
+        .values(status="sending", attempts=OutboxMessage.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+        .returning(OutboxMessage.id, OutboxMessage.order_id, OutboxMessage.channel, OutboxMessage.recipient,
+                   OutboxMessage.body, OutboxMessage.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return [dict(row._mapping) for row in rows]
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+    # Jitter so a gateway outage doesn't turn into synchronized retry waves
+    return timedelta(seconds=seconds * random.uniform(0.75, 1.25))
+
+def record_results(db: Session, messages, failures):
+    # failures maps message id -> error; every other message in the batch was sent
+    now = datetime.utcnow()
+    sent = []
+    retry = []
+    failed = []
+    for message in messages:
+        error = failures.get(message["id"])
+        if error is None:
+            sent.append({"message_id": message["id"], "sent_at": now})
+        elif message["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            failed.append({"message_id": message["id"], "error": error[:500]})
+        else:
+            retry.append({"message_id": message["id"], "error": error[:500],
+                          "next_attempt_at": now + retry_delay(message["attempts"])})
+
+    table = OutboxMessage.__table__
+    claimed = (table.c.id == bindparam("message_id"), table.c.status == "sending")
+    if sent:
+        db.execute(update(table).where(*claimed).values(status="sent", sent_at=bindparam("sent_at"), last_error=None), sent)
+    if retry:
+        db.execute(update(table).where(*claimed).values(status="pending", last_error=bindparam("error"),
+                                                         next_attempt_at=bindparam("next_attempt_at")), retry)
+    if failed:
+        db.execute(update(table).where(*claimed).values(status="failed", last_error=bindparam("error")), failed)
+    db.commit()
+    for message in failed:
+        logger.error("outbox message %s gave up after %d attempts: %s", message["message_id"], OUTBOX_MAX_ATTEMPTS,
+                     message["error"])
+    return {"sent": len(sent), "retry": len(retry), "failed": len(failed)}
+
+def outbox_status(db: Session):
+    return dict(db.execute(select(OutboxMessage.status, func.count()).group_by(OutboxMessage.status)).all())
+
+# Transports: async send(messages) -> {message id: error} for the messages that failed
+
+class LogTransport:
+    # Development default: nothing leaves the server
+    async def send(self, messages):
+        for message in messages:
+            logger.info("%s to %s: %s", message["channel"], message["recipient"], message["body"])
+        return {}
+
+class WebhookTransport:
+    # One POST per batch to an SMS/WhatsApp gateway; any error fails the whole batch
+    def __init__(self, url: str = NOTIFY_WEBHOOK_URL, timeout: float = NOTIFY_TIMEOUT_SECONDS):
+        if not url:
+            raise ValueError("NOTIFY_WEBHOOK_URL is not set")
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, messages):
+        payload = {"messages": [
+            {"id": message["id"], "channel": message["channel"], "to": message["recipient"], "body": message["body"]}
+            for message in messages
+        ]}
+        try:
+            response = await self.client.post(self.url, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            return {message["id"]: error for message in messages}
+        return {}
+
+    async def close(self):
+        await self.client.aclose()
+
+class StubTransport:
+    # Local stand-in for tests and benchmarks: keeps what would have been sent, with optional
+    # per-batch latency and a failure rate
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0, seed: int = None):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.sent = []
+        self.batches = 0
+
+    async def send(self, messages):
+        self.batches += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        failures = {}
+        for message in messages:
+            if self.rng.random() < self.fail_rate:
+                failures[message["id"]] = "stub failure"
+            else:
+                self.sent.append(message)
+        return failures
+
+TRANSPORTS = {"log": LogTransport, "webhook": WebhookTransport, "stub": StubTransport}
+
+def make_transport(name: str = NOTIFY_TRANSPORT):
+    if name in TRANSPORTS:
+        return TRANSPORTS[name]()
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute)()
+
+class OutboxWorker:
+    # A pool of asyncio loops on one event loop. Each claims a batch in a worker thread, hands it to
+    # the transport and records the outcome; several loops keep slow sends from serializing.
+    def __init__(self, transport=None, workers: int = OUTBOX_WORKERS, batch_size: int = OUTBOX_BATCH_SIZE,
+                 poll_seconds: float = OUTBOX_POLL_SECONDS, session_factory=SessionLocal):
+        self.transport = transport
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self.loop = None
+        self.wakeup = None
+        self.tasks = []
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.transport = self.transport or make_transport()
+        self.tasks = [asyncio.create_task(self.run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.loop = None
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            await close()
+
+    def wake(self):
+        # Safe from any thread; a no-op when no worker runs in this process
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.wakeup.set)
+        except RuntimeError:
+            pass
+
+    def claim(self):
+        with self.session_factory() as db:
+            return claim_batch(db, self.batch_size)
+
+    def record(self, messages, failures):
+        with self.session_factory() as db:
+            return record_results(db, messages, failures)
+
+    async def process_batch(self):
+        messages = await asyncio.to_thread(self.claim)
+        if not messages:
+            return 0
+        try:
+            failures = await self.transport.send(messages)
+        except Exception as exc:
+            logger.exception("outbox transport failed")
+            failures = {message["id"]: f"{type(exc).__name__}: {exc}" for message in messages}
+        await asyncio.to_thread(self.record, messages, failures)
+        return len(messages)
+
+    async def drain(self):
+        # Sends whatever is due without the background loops (notify_worker.py --once, tests); messages
+        # that failed and are waiting out their backoff are left for later. Returns messages processed.
+        self.transport = self.transport or make_transport()
+        total = 0
+        while True:
+            processed = sum(await asyncio.gather(*(self.process_batch() for _ in range(max(self.workers, 1)))))
+            if not processed:
+                return total
+            total += processed
+
+    async def run(self):
+        while True:
+            # Cleared before looking, so a wake that lands during the claim isn't lost
+            self.wakeup.clear()
+            try:
+                if await self.process_batch():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox worker error")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+outbox_worker = OutboxWorker()
+
+def wake_outbox():
+    # Called after the order commits, so the first send attempt starts right away
+    outbox_worker.wake()
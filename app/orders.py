@@ -0,0 +1,171 @@
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+import urllib.parse
+import random
+
+from app.catalog import catalog_snapshot, invalidate_inventory
+from app.events import publish_inventory, publish_order_created
+from app.idempotency import store_response
+from app.locations import location_for_city
+from app.models import Order, OrderItem, Inventory, StockMovement
+from app.notifications import enqueue, order_messages, wake_outbox
+from app.pricing import DELIVERY_FEE_JMD, PricingError
+from app.reports import add_sales, move_order_sales, order_sales
+from app.schemas import OrderRequest
+
+MINIMUM_ORDER_LB = 5
+
+def reserve_stock(db: Session, meat_part_id: int, pounds: float, location: str):
+    # Pick a row that can cover the order and decrement it in the same statement,
+    # so concurrent orders can never drive stock below zero.
+    candidate = (
+        select(Inventory.id)
+        .where(
+            Inventory.meat_part_id == meat_part_id,
+            Inventory.location == location,
+            Inventory.is_active == True,
+            Inventory.current_stock_lb >= pounds,
+        )
+        .order_by(Inventory.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Inventory)
+        .where(Inventory.id == candidate, Inventory.current_stock_lb >= pounds)
+        .values(current_stock_lb=Inventory.current_stock_lb - pounds)
+        .returning(Inventory.id, Inventory.current_stock_lb)
+        .execution_options(synchronize_session=False)
+    )
+    # (inventory_id, stock left) or None
+    return db.execute(stmt).one_or_none()
+
+def confirmation_message(order: OrderRequest, total: float, customer_pin: str, location: str) -> str:
+    removed = f" (removed: {', '.join(order.remove_items)})" if order.remove_items else ""
+    return f"""Thank you, {order.customer_name}!
+Your order for {order.pounds} lbs of {order.meat_type.value} 
+with {order.seasoning_package.value.replace('_', ' ')} seasoning{removed} 
+and pepper: {order.pepper_level.value} to {order.city}, {location} was received.
+🗾 Total: JMD {int(total)}
+🔒 PIN: {customer_pin}
+📞 We’ll call you shortly at {order.phone_number} to confirm."""
+
+def butcher_message(order_id: int, order: OrderRequest, total: float) -> str:
+    removed = f", remove {', '.join(order.remove_items)}" if order.remove_items else ""
+    return (f"New order #{order_id}: {order.pounds} lbs {order.meat_type.value}, "
+            f"{order.seasoning_package.value.replace('_', ' ')} seasoning, pepper {order.pepper_level.value}{removed}. "
+            f"{order.customer_name} {order.phone_number}, {order.city}. Total JMD {int(total)}.")
+
+def create_order(db: Session, order: OrderRequest, idempotency=None):
+    # idempotency is (key, owner) when the request carried an Idempotency-Key
+    # Each order is filled from the shop serving its city, and only touches that shop's stock rows
+    location = location_for_city(order.city)
+    if location is None:
+        raise HTTPException(status_code=400, detail=f"We don't deliver to {order.city} yet.")
+    if order.pounds < MINIMUM_ORDER_LB:
+        raise HTTPException(status_code=400, detail=f"Minimum order for {location} is {MINIMUM_ORDER_LB} lbs.")
+
+    snapshot = catalog_snapshot(db)
+    try:
+        line = snapshot.prices.quote_item(order.meat_type.value, order.seasoning_package.value, order.pounds)
+    except PricingError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    price_per_pound = line["price_per_pound"]
+    seasoning_fee = line["seasoning_cost"]
+    delivery_fee = DELIVERY_FEE_JMD
+    base = line["base_cost"]
+    total = base + seasoning_fee + delivery_fee
+    customer_pin = str(random.randint(1000, 9999))
+
+    # Reservation, order, item, ledger entry, sales rollup, outbound messages and the idempotency key's
+    # response are written in one transaction with a single commit; the messages are sent by the outbox
+    # worker afterwards
+    reserved = reserve_stock(db, line["meat_part_id"], order.pounds, location)
+    if reserved is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Not enough {order.meat_type.value} in stock at {location} for {order.pounds} lbs.")
+
+    new_order = Order(
+        customer_name=order.customer_name,
+        phone_number=order.phone_number,
+        location=location,
+        customer_pin=customer_pin,
+        is_paid=False
+    )
+    new_order.items.append(OrderItem(
+        meat_part_id=line["meat_part_id"],
+        pounds_ordered=order.pounds,
+        seasoned=order.seasoning_package != "none",
+        seasonings=order.seasoning_package.value,
+        unit_price=price_per_pound,
+        total_price=base + seasoning_fee
+    ))
+    db.add(new_order)
+    db.add(StockMovement(inventory_id=reserved.id, kind="sale", delta_lb=-order.pounds, order=new_order))
+    # Flush first so the id and timestamp can be read without a refresh query after the commit
+    db.flush()
+    order_id, date_ordered = new_order.id, new_order.date_ordered
+    add_sales(db, order_sales(snapshot.part_meat_types, date_ordered.date(), location, False, [
+        (line["meat_part_id"], order.seasoning_package.value, order.pounds, base + seasoning_fee)
+    ]))
+    msg = confirmation_message(order, total, customer_pin, location)
+    messages = order_messages(order_id, order.phone_number, msg, butcher_message(order_id, order, total))
+    enqueue(db, messages)
+    link = f"https://wa.me/{order.phone_number}?text={urllib.parse.quote(msg)}"
+
+    result = {
+        "message": "Order placed successfully!",
+        "order_summary": {
+            "customer_name": order.customer_name,
+            "phone_number": order.phone_number,
+            "meat_type": order.meat_type.value,
+            "seasoning_package": order.seasoning_package.value,
+            "pepper_level": order.pepper_level.value,
+            "removed_items": order.remove_items,
+            "pounds": order.pounds,
+            "city": order.city,
+            "location": location,
+            "price_per_pound": price_per_pound,
+            "base_cost": base,
+            "seasoning_cost": seasoning_fee,
+            "delivery_fee": delivery_fee,
+            "total_cost_jmd": int(total),
+            "confirmation_pin": customer_pin
+        },
+        "whatsapp_link": link
+    }
+    if idempotency:
+        store_response(db, *idempotency, result)
+    db.commit()
+    if messages:
+        wake_outbox()
+    publish_inventory([{"inventory_id": reserved.id, "stock_lb": reserved.current_stock_lb}])
+    invalidate_inventory([location])
+    publish_order_created(order_id, order.customer_name, location, int(total), date_ordered)
+
+    return result
+
+def set_payment_status(db: Session, order_id: int, is_paid: bool):
+    # Flips is_paid only if nobody else changed it since the read, so the order's sales move between
+    # the paid and unpaid rollups exactly once. Returns False when the order doesn't exist.
+    while True:
+        order = db.execute(
+            select(Order.id, Order.location, Order.date_ordered, Order.is_paid).where(Order.id == order_id)
+        ).one_or_none()
+        if order is None:
+            return False
+        if bool(order.is_paid) == is_paid:
+            return True
+        changed = db.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.is_paid == order.is_paid)
+            .values(is_paid=is_paid)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if changed:
+            move_order_sales(db, catalog_snapshot(db).part_meat_types, order, is_paid)
+            db.commit()
+            return True
+        db.rollback()
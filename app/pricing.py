@@ -0,0 +1,76 @@
+from collections import defaultdict
+
+DELIVERY_FEE_JMD = 300
+
+# Seeded animal backing each orderable meat type
+MEAT_TYPE_ANIMALS = {"goat": "Goat", "pork": "Pig", "beef": "Cow", "chicken": "Chicken"}
+ANIMAL_MEAT_TYPES = {animal_name: meat_type for meat_type, animal_name in MEAT_TYPE_ANIMALS.items()}
+
+class PricingError(ValueError):
+    pass
+
+def meat_type_for(animal_name: str) -> str:
+    # Sales are reported by meat type; numbered animals ("Goat #12") count as their species
+    return ANIMAL_MEAT_TYPES.get(animal_name.split(" #")[0], "other")
+
+def seasoning_key(name: str) -> str:
+    # "Brown Stew" -> "brown_stew", matching SeasoningType values
+    return name.strip().lower().replace(" ", "_")
+
+class PriceTable:
+    # Flat lookups built once per catalog snapshot, so quoting never touches the database
+    def __init__(self, animals, meat_parts, seasonings):
+        parts_by_animal = defaultdict(list)
+        for part in sorted(meat_parts, key=lambda part: part["id"]):
+            parts_by_animal[part["animal_id"]].append(part)
+        # The oldest animal of each name with parts sets the price. Animals added later with the same
+        # name (every new goat is "Goat") must not reprice the meat type or move orders to their parts.
+        animal_ids = {}
+        for animal in sorted(animals, key=lambda animal: animal["id"]):
+            if parts_by_animal.get(animal["id"]):
+                animal_ids.setdefault(animal["name"], animal["id"])
+
+        # meat type -> (meat part id, price per lb) of the animal's standard cut
+        self.meat_types = {}
+        for meat_type, animal_name in MEAT_TYPE_ANIMALS.items():
+            parts = parts_by_animal.get(animal_ids.get(animal_name), [])
+            if parts:
+                standard = next((p for p in parts if p["part_name"].startswith("Standard")), parts[0])
+                self.meat_types[meat_type] = (standard["id"], standard["price_per_lb_jmd"])
+
+        self.seasoning_fees = {"none": 0}
+        for seasoning in seasonings:
+            self.seasoning_fees[seasoning_key(seasoning["name"])] = seasoning["fee_jmd"]
+
+    def quote_item(self, meat_type: str, seasoning_package: str, pounds: float):
+        if meat_type not in self.meat_types:
+            raise PricingError(f"{meat_type} is not currently priced")
+        if seasoning_package not in self.seasoning_fees:
+            raise PricingError(f"{seasoning_package.replace('_', ' ')} seasoning is not currently offered")
+        meat_part_id, price_per_pound = self.meat_types[meat_type]
+        base = price_per_pound * pounds
+        seasoning_fee = self.seasoning_fees[seasoning_package]
+        return {
+            "meat_type": meat_type,
+            "meat_part_id": meat_part_id,
+            "seasoning_package": seasoning_package,
+            "pounds": pounds,
+            "price_per_pound": price_per_pound,
+            "base_cost": base,
+            "seasoning_cost": seasoning_fee,
+            "line_total": base + seasoning_fee,
+        }
+
+    def quote_cart(self, items):
+        lines = [self.quote_item(meat_type, seasoning_package, pounds) for meat_type, seasoning_package, pounds in items]
+        total = sum(line["line_total"] for line in lines) + DELIVERY_FEE_JMD
+        return {"items": lines, "delivery_fee": DELIVERY_FEE_JMD, "total_cost_jmd": int(total)}
+
+    def quote_carts(self, carts):
+        quotes = []
+        for items in carts:
+            try:
+                quotes.append(self.quote_cart(items))
+            except PricingError as exc:
+                quotes.append({"error": str(exc)})
+        return quotes
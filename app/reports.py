@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, delete, false, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Animal, MeatPart, Order, OrderItem, SalesDaily
+from app.pricing import ANIMAL_MEAT_TYPES
+
+ROLLUP_KEY = ("day", "location", "meat_type", "seasoning", "is_paid")
+GROUP_BY_FIELDS = ROLLUP_KEY
+REPORT_MAX_DAYS = 3660
+
+def order_sales(part_meat_types, day: date, location: str, is_paid: bool, items, sign: int = 1):
+    # Rollup deltas for one order; items are (meat_part_id, seasonings, pounds, revenue). The order is
+    # counted once in each meat type and seasoning it contains, and sign=-1 takes it back out.
+    groups = defaultdict(lambda: [0.0, 0.0])
+    for meat_part_id, seasonings, pounds, revenue in items:
+        group = groups[(part_meat_types.get(meat_part_id, "other"), seasonings or "none")]
+        group[0] += pounds
+        group[1] += revenue
+    return [
+        {"day": day, "location": location, "meat_type": meat_type, "seasoning": seasoning, "is_paid": bool(is_paid),
+         "order_count": sign, "pounds": sign * pounds, "revenue_jmd": sign * revenue}
+        for (meat_type, seasoning), (pounds, revenue) in groups.items()
+    ]
+
+def add_sales(db: Session, rows):
+    # Upsert-increment in the caller's transaction. Rows for the same key are merged first so the
+    # executemany never touches one rollup row twice.
+    merged = {}
+    for row in rows:
+        key = tuple(row[field] for field in ROLLUP_KEY)
+        if key in merged:
+            for field in ("order_count", "pounds", "revenue_jmd"):
+                merged[key][field] += row[field]
+        else:
+            merged[key] = dict(row)
+    if not merged:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(SalesDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "order_count": SalesDaily.order_count + stmt.excluded.order_count,
+            "pounds": SalesDaily.pounds + stmt.excluded.pounds,
+            "revenue_jmd": SalesDaily.revenue_jmd + stmt.excluded.revenue_jmd,
+        },
+    )
+    db.execute(stmt, list(merged.values()))
+
+def move_order_sales(db: Session, part_meat_types, order, is_paid: bool):
+    # Payment changes move the order's sales from one is_paid bucket to the other
+    items = db.execute(
+        select(OrderItem.meat_part_id, OrderItem.seasonings, OrderItem.pounds_ordered, OrderItem.total_price)
+        .where(OrderItem.order_id == order.id)
+    ).all()
+    day = order.date_ordered.date()
+    add_sales(db, order_sales(part_meat_types, day, order.location, order.is_paid, items, -1)
+              + order_sales(part_meat_types, day, order.location, is_paid, items))
+
+def meat_type_column(animal_name):
+    # SQL twin of pricing.meat_type_for
+    return case(
+        *[
+            (or_(animal_name == name, animal_name.like(f"{name} #%")), meat_type)
+            for name, meat_type in ANIMAL_MEAT_TYPES.items()
+        ],
+        else_="other",
+    ).label("meat_type")
+
+def rebuild_sales(db: Session, date_from: date = None, date_to: date = None):
+    # Recomputes the rollups for [date_from, date_to] (inclusive, default everything) from the order
+    # tables with a single INSERT ... SELECT, replacing what was there
+    day = func.date(Order.date_ordered).label("day")
+    meat_type = meat_type_column(Animal.name)
+    seasoning = func.coalesce(OrderItem.seasonings, "none").label("seasoning")
+    is_paid = func.coalesce(Order.is_paid, false()).label("is_paid")
+    query = (
+        select(
+            day, Order.location, meat_type, seasoning, is_paid,
+            func.count(func.distinct(Order.id)), func.sum(OrderItem.pounds_ordered), func.sum(OrderItem.total_price),
+        )
+        .select_from(OrderItem)
+        .join(Order, Order.id == OrderItem.order_id)
+        .outerjoin(MeatPart, MeatPart.id == OrderItem.meat_part_id)
+        .outerjoin(Animal, Animal.id == MeatPart.animal_id)
+        .group_by(day, Order.location, meat_type, seasoning, is_paid)
+    )
+    clear = delete(SalesDaily)
+    if date_from is not None:
+        query = query.where(Order.date_ordered >= datetime.combine(date_from, time.min))
+        clear = clear.where(SalesDaily.day >= date_from)
+    if date_to is not None:
+        query = query.where(Order.date_ordered < datetime.combine(date_to + timedelta(days=1), time.min))
+        clear = clear.where(SalesDaily.day <= date_to)
+
+    db.execute(clear)
+    rows = db.execute(
+        insert(SalesDaily).from_select(
+            ["day", "location", "meat_type", "seasoning", "is_paid", "order_count", "pounds", "revenue_jmd"], query
+        )
+    ).rowcount
+    db.commit()
+    return rows
+
+def sales_report(db: Session, date_from: date, date_to: date, group_by):
+    # Reads only the rollups: at most a few hundred rows per day, whatever the order history.
+    # An order with several meat types or seasonings counts once in each, so order_count is
+    # only additive across days, locations and payment state.
+    keys = [getattr(SalesDaily, field) for field in group_by]
+    rows = db.execute(
+        select(
+            *keys,
+            func.sum(SalesDaily.order_count),
+            func.sum(SalesDaily.pounds),
+            func.sum(SalesDaily.revenue_jmd),
+            func.sum(case((SalesDaily.is_paid == True, SalesDaily.revenue_jmd), else_=0.0)),
+        )
+        .where(SalesDaily.day >= date_from, SalesDaily.day <= date_to)
+        .group_by(*keys)
+        .having(func.sum(SalesDaily.order_count) > 0)
+        .order_by(*keys)
+    ).all()
+
+    results = []
+    for row in rows:
+        order_count, pounds, revenue, paid_revenue = row[len(keys):]
+        results.append({
+            **dict(zip(group_by, row[:len(keys)])),
+            "order_count": order_count,
+            "pounds": round(pounds, 3),
+            "revenue_jmd": round(revenue, 2),
+            "paid_revenue_jmd": round(paid_revenue, 2),
+        })
+    return {
+        "from": date_from,
+        "to": date_to,
+        "group_by": list(group_by),
+        "rows": results,
+        "totals": {
+            "pounds": round(sum(row["pounds"] for row in results), 3),
+            "revenue_jmd": round(sum(row["revenue_jmd"] for row in results), 2),
+            "paid_revenue_jmd": round(sum(row["paid_revenue_jmd"] for row in results), 2),
+        },
+    }
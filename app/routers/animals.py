@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from app.auth import get_current_admin_user
 from app.database import SessionLocal
 from app.models import Animal, MeatPart
-from pydantic import BaseModel
+from app.catalog import invalidate_catalog
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 import datetime
 
@@ -21,16 +23,23 @@ class AnimalCreate(BaseModel):
     date_purchased: Optional[datetime.datetime] = None
     meat_parts: List[MeatPartCreate] = []
 
+class MeatPartOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    part_name: str
+    weight_lb: float
+    price_per_lb_jmd: float
+
 class AnimalOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     total_weight_kg: float
     purchase_price_jmd: float
-    date_purchased: datetime.datetime
-    meat_parts: List[dict]
-
-    class Config:
-        orm_mode = True
+    date_purchased: Optional[datetime.datetime] = None
+    meat_parts: List[MeatPartOut]
 
 # DB session dependency
 def get_db():
@@ -41,7 +50,7 @@ def get_db():
         db.close()
 
 # Create animal with meat parts
-@router.post("/animals", response_model=AnimalOut)
+@router.post("/animals", response_model=AnimalOut, dependencies=[Depends(get_current_admin_user)])
 def create_animal(data: AnimalCreate, db: Session = Depends(get_db)):
     animal = Animal(
         name=data.name,
@@ -63,24 +72,5 @@ def create_animal(data: AnimalCreate, db: Session = Depends(get_db)):
         db.add(meat_part)
 
     db.commit()
+    invalidate_catalog()
     return animal
-
-# List animals
-@router.get("/animals", response_model=List[AnimalOut])
-def list_animals(db: Session = Depends(get_db)):
-    animals = db.query(Animal).all()
-    return [
-        {
-            **animal.__dict__,
-            "meat_parts": [
-                {
-                    "id": part.id,
-                    "part_name": part.part_name,
-                    "weight_lb": part.weight_lb,
-                    "price_per_lb_jmd": part.price_per_lb_jmd
-                }
-                for part in animal.meat_parts
-            ]
-        }
-        for animal in animals
-    ]
@@ -0,0 +1,81 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_async_read_db, get_read_db
+from app import catalog
+from app.locations import LOCATION_CITIES, LOCATIONS
+from app.responses import FastJSONResponse
+from app.schemas import CatalogAnimal, CatalogMeatPart, InventoryRow, LocationOut
+
+router = APIRouter()
+
+# Same endpoints on the async engine
+async_router = APIRouter()
+
+
+# Catalog bodies are pre-encoded in the snapshot; the response models document their shape
+def catalog_response(request: Request, entry):
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def known_location(location: Optional[str] = None):
+    if location is not None and location not in LOCATIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown location; expected one of {', '.join(LOCATIONS)}")
+    return location
+
+
+@router.get("/locations", response_model=List[LocationOut])
+@async_router.get("/locations", response_model=List[LocationOut])
+async def get_locations():
+    return [{"location": location, "cities": cities} for location, cities in LOCATION_CITIES.items()]
+
+
+@router.get("/animals", response_model=List[CatalogAnimal])
+def get_animals(request: Request, db: Session = Depends(get_read_db)):
+    return catalog_response(request, catalog.catalog_snapshot(db).animals)
+
+
+@router.get("/meat_parts", response_model=List[CatalogMeatPart])
+def get_all_meat_parts(request: Request, db: Session = Depends(get_read_db)):
+    return catalog_response(request, catalog.catalog_snapshot(db).meat_parts)
+
+
+@router.get("/meat_parts/{animal_id}", response_model=List[CatalogMeatPart])
+def get_meat_parts(animal_id: int, request: Request, db: Session = Depends(get_read_db)):
+    return catalog_response(request, catalog.catalog_snapshot(db).parts_for(animal_id))
+
+
+# One shop's stock, or every shop's with no location; each is cached on its own
+@router.get("/inventory", response_model=List[InventoryRow])
+def get_inventory(location: Optional[str] = Depends(known_location), db: Session = Depends(get_read_db)):
+    return FastJSONResponse(catalog.inventory_rows(db, location))
+
+
+@async_router.get("/animals", response_model=List[CatalogAnimal])
+async def get_animals_async(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return catalog_response(request, (await catalog.catalog_snapshot_async(db)).animals)
+
+
+@async_router.get("/meat_parts", response_model=List[CatalogMeatPart])
+async def get_all_meat_parts_async(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return catalog_response(request, (await catalog.catalog_snapshot_async(db)).meat_parts)
+
+
+@async_router.get("/meat_parts/{animal_id}", response_model=List[CatalogMeatPart])
+async def get_meat_parts_async(animal_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return catalog_response(request, (await catalog.catalog_snapshot_async(db)).parts_for(animal_id))
+
+
+@async_router.get("/inventory", response_model=List[InventoryRow])
+async def get_inventory_async(location: Optional[str] = Depends(known_location), db: AsyncSession = Depends(get_async_read_db)):
+    return FastJSONResponse(await catalog.inventory_rows_async(db, location))
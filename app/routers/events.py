@@ -0,0 +1,35 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.auth import verify_token
+from app.events import EVENT_MAX_SUBSCRIBERS, TOPICS, broadcaster, stream
+
+router = APIRouter(tags=["Events"])
+
+
+@router.get("/events")
+async def events(request: Request, topics: str = "inventory", access_token: Optional[str] = None):
+    # Server-sent events. EventSource can't set headers, so the admin token for the
+    # orders topic may also come as ?access_token=
+    wanted = {topic.strip() for topic in topics.split(",") if topic.strip()}
+    if not wanted or wanted - TOPICS:
+        raise HTTPException(status_code=400, detail=f"topics must be a comma-separated subset of {', '.join(sorted(TOPICS))}")
+    if "orders" in wanted:
+        header = request.headers.get("authorization", "")
+        token = access_token or (header[7:] if header.lower().startswith("bearer ") else None)
+        claims = verify_token(token) if token else None
+        if not claims:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        if not claims.get("admin"):
+            raise HTTPException(status_code=403, detail="Admin privileges required")
+    if len(broadcaster.subscribers) >= EVENT_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "5"})
+
+    subscriber = broadcaster.subscribe(wanted)
+    return StreamingResponse(
+        stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
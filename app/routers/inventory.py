@@ -1,13 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.auth import get_current_admin_user
+from app.database import get_db, get_read_db
 from app import models
+from app.catalog import invalidate_catalog, list_inventory
+from app.events import listening, publish_inventory
+from app.locations import LOCATIONS
+from app.schemas import (
+    InventoryBulkResult, InventoryBulkUpdate, InventoryOut, InventoryUpdate, Message, MovementApplied, MovementKind, StockLevel,
+    StockMovementOut, StockMovementRequest,
+)
+from app.stock import apply_movement, bulk_adjust, movement, record_movements, set_stock, stock_as_of
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
 
-@router.post("/")
+def inventory_changed(db: Session, inventory_ids):
+    # After every committed write: drop the cached catalog and push the rows in /inventory shape
+    invalidate_catalog()
+    if listening("inventory"):
+        publish_inventory(list_inventory(db, inventory_ids))
+
+
+@router.post("/", response_model=InventoryOut, dependencies=[Depends(get_current_admin_user)])
 def create_inventory(item: dict, db: Session = Depends(get_db)):
+    if item["location"] not in LOCATIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown location; expected one of {', '.join(LOCATIONS)}")
     new_item = models.Inventory(
         meat_part_id=item["meat_part_id"],
         current_stock_lb=item["current_stock_lb"],
@@ -16,39 +37,69 @@ def create_inventory(item: dict, db: Session = Depends(get_db)):
         is_active=True
     )
     db.add(new_item)
+    if new_item.current_stock_lb:
+        db.flush()
+        record_movements(db, [movement(new_item.id, "receipt", new_item.current_stock_lb)])
     db.commit()
     db.refresh(new_item)
+    inventory_changed(db, [new_item.id])
     return new_item
 
 
-@router.get("/")
-def get_all_inventory(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[InventoryOut])
+def get_all_inventory(db: Session = Depends(get_read_db)):
     return db.query(models.Inventory).filter(models.Inventory.is_active == True).all()
 
 
-@router.get("/{inventory_id}")
-def get_inventory(inventory_id: int, db: Session = Depends(get_db)):
+# Declared before /{inventory_id} so "stock" isn't parsed as an id
+@router.get("/stock", response_model=List[StockLevel], dependencies=[Depends(get_current_admin_user)])
+def get_stock_as_of(at: datetime, ids: Optional[str] = Query(None, description="comma-separated inventory ids"), db: Session = Depends(get_read_db)):
+    try:
+        inventory_ids = [int(part) for part in ids.split(",")] if ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    stock = stock_as_of(db, at, inventory_ids)
+    return [{"inventory_id": inventory_id, "stock_lb": stock_lb} for inventory_id, stock_lb in sorted(stock.items())]
+
+
+@router.get("/{inventory_id}", response_model=InventoryOut)
+def get_inventory(inventory_id: int, db: Session = Depends(get_read_db)):
     item = db.query(models.Inventory).filter(models.Inventory.id == inventory_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Inventory not found")
     return item
 
 
-@router.put("/{inventory_id}")
-def update_inventory(inventory_id: int, update_data: dict, db: Session = Depends(get_db)):
+@router.put("/{inventory_id}", response_model=InventoryOut, dependencies=[Depends(get_current_admin_user)])
+def update_inventory(inventory_id: int, update: InventoryUpdate, db: Session = Depends(get_db)):
     item = db.query(models.Inventory).filter(models.Inventory.id == inventory_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Inventory not found")
 
+    # Stock goes through the ledger; everything else is a plain column update
+    update_data = update.model_dump(exclude_unset=True)
+    stock_lb = update_data.pop("current_stock_lb", None)
     for key, value in update_data.items():
         setattr(item, key, value)
+    if stock_lb is not None:
+        db.flush()
+        set_stock(db, inventory_id, stock_lb, note="PUT /inventory")
 
     db.commit()
     db.refresh(item)
+    inventory_changed(db, [inventory_id])
     return item
 
 
-@router.delete("/{inventory_id}")
+# End-of-day restock in one request: every row is validated up front and applied in one transaction
+@router.patch("/bulk", response_model=InventoryBulkResult, response_model_exclude_unset=True, dependencies=[Depends(get_current_admin_user)])
+def bulk_update_inventory(request: InventoryBulkUpdate, db: Session = Depends(get_db)):
+    result = bulk_adjust(db, request.adjustments, request.note)
+    inventory_changed(db, [item["inventory_id"] for item in result["items"]])
+    return result
+
+
+@router.delete("/{inventory_id}", response_model=Message, dependencies=[Depends(get_current_admin_user)])
 def soft_delete_inventory(inventory_id: int, db: Session = Depends(get_db)):
     item = db.query(models.Inventory).filter(models.Inventory.id == inventory_id).first()
     if not item:
@@ -56,10 +107,12 @@ def soft_delete_inventory(inventory_id: int, db: Session = Depends(get_db)):
 
     item.is_active = False
     db.commit()
+    invalidate_catalog()
+    publish_inventory([{"inventory_id": inventory_id, "is_active": False}])
     return {"message": "Inventory soft deleted"}
 
 
-@router.put("/restore/{inventory_id}")
+@router.put("/restore/{inventory_id}", response_model=Message, dependencies=[Depends(get_current_admin_user)])
 def restore_inventory(inventory_id: int, db: Session = Depends(get_db)):
     item = db.query(models.Inventory).filter(models.Inventory.id == inventory_id).first()
     if not item:
@@ -67,4 +120,37 @@ def restore_inventory(inventory_id: int, db: Session = Depends(get_db)):
 
     item.is_active = True
     db.commit()
+    inventory_changed(db, [inventory_id])
     return {"message": "Inventory restored"}
+
+
+@router.post("/{inventory_id}/movements", response_model=MovementApplied, dependencies=[Depends(get_current_admin_user)])
+def add_movement(inventory_id: int, request: StockMovementRequest, db: Session = Depends(get_db)):
+    if request.kind == MovementKind.receipt and request.delta_lb <= 0:
+        raise HTTPException(status_code=400, detail="A receipt must add stock (delta_lb > 0)")
+    if request.kind == MovementKind.spoilage and request.delta_lb >= 0:
+        raise HTTPException(status_code=400, detail="Spoilage must remove stock (delta_lb < 0)")
+    if request.delta_lb == 0:
+        raise HTTPException(status_code=400, detail="delta_lb must not be zero")
+
+    stock_lb = apply_movement(db, inventory_id, request.kind.value, request.delta_lb, request.note)
+    if stock_lb is None:
+        db.rollback()
+        if not db.get(models.Inventory, inventory_id):
+            raise HTTPException(status_code=404, detail="Inventory not found")
+        raise HTTPException(status_code=409, detail="Not enough stock for this movement")
+    db.commit()
+    invalidate_catalog()
+    publish_inventory([{"inventory_id": inventory_id, "stock_lb": stock_lb}])
+    return {"inventory_id": inventory_id, "current_stock_lb": stock_lb}
+
+
+@router.get("/{inventory_id}/movements", response_model=List[StockMovementOut], dependencies=[Depends(get_current_admin_user)])
+def list_movements(inventory_id: int, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_read_db)):
+    return (
+        db.query(models.StockMovement)
+        .filter(models.StockMovement.inventory_id == inventory_id)
+        .order_by(models.StockMovement.created_at.desc(), models.StockMovement.id.desc())
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.admission import render_admission_metrics
+from app.metrics import render_metrics
+
+router = APIRouter()
+
+
+# Prometheus scrape target; async so it reads the counters on the event loop that writes them
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics() + render_admission_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
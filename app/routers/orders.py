@@ -0,0 +1,66 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.catalog import catalog_snapshot, catalog_snapshot_async
+from app.database import get_db, get_async_db
+from app.idempotency import IDEMPOTENCY_KEY_MAX_LENGTH, fingerprint, order_idempotency
+from app.orders import create_order
+from app.schemas import OrderPlaced, OrderRequest, QuoteRequest, QuoteResponse
+
+router = APIRouter()
+
+# Same endpoint on the async engine; the order logic runs on the session's greenlet
+async_router = APIRouter()
+
+
+def cart_items(request: QuoteRequest):
+    return [
+        [(item.meat_type.value, item.seasoning_package.value, item.pounds) for item in cart.items]
+        for cart in request.carts
+    ]
+
+
+async def idempotent_order(order: OrderRequest, key: str, response: Response, call):
+    # Retries with the same key get the first response back without placing another order
+    result, replayed = await order_idempotency.run(key, fingerprint(order.model_dump(mode="json")), call, create_order, order)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+@router.post("/order", response_model=OrderPlaced)
+async def place_order(
+    order: OrderRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: Session = Depends(get_db),
+):
+    if idempotency_key is None:
+        return await run_in_threadpool(create_order, db, order)
+    return await idempotent_order(order, idempotency_key, response, lambda fn, *args: run_in_threadpool(fn, db, *args))
+
+
+@router.post("/quote", response_model=QuoteResponse, response_model_exclude_unset=True)
+def quote(request: QuoteRequest, db: Session = Depends(get_db)):
+    return {"quotes": catalog_snapshot(db).prices.quote_carts(cart_items(request))}
+
+
+@async_router.post("/order", response_model=OrderPlaced)
+async def place_order_async(
+    order: OrderRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if idempotency_key is None:
+        return await db.run_sync(create_order, order)
+    return await idempotent_order(order, idempotency_key, response, db.run_sync)
+
+
+@async_router.post("/quote", response_model=QuoteResponse, response_model_exclude_unset=True)
+async def quote_async(request: QuoteRequest, db: AsyncSession = Depends(get_async_db)):
+    return {"quotes": (await catalog_snapshot_async(db)).prices.quote_carts(cart_items(request))}
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.analytics import PERIODS, margins
+from app.auth import get_current_admin_user
+from app.database import get_read_db
+from app.reports import GROUP_BY_FIELDS, REPORT_MAX_DAYS, sales_report
+from app.schemas import MarginReport, SalesReport
+
+router = APIRouter(prefix="/admin/reports", tags=["Reports"], dependencies=[Depends(get_current_admin_user)])
+
+
+@router.get("/sales", response_model=SalesReport, response_model_exclude_unset=True)
+def get_sales_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    group_by: str = Query("day", description=f"comma-separated, any of {', '.join(GROUP_BY_FIELDS)}"),
+    db: Session = Depends(get_read_db),
+):
+    # Both ends inclusive; defaults to the last 30 days
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if (date_to - date_from).days >= REPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Reports cover at most {REPORT_MAX_DAYS} days")
+    fields = [field.strip() for field in group_by.split(",") if field.strip()]
+    if set(fields) - set(GROUP_BY_FIELDS) or len(set(fields)) != len(fields):
+        raise HTTPException(status_code=400, detail=f"group_by must be distinct fields from {', '.join(GROUP_BY_FIELDS)}")
+    return sales_report(db, date_from, date_to, fields)
+
+
+@router.get("/margins", response_model=MarginReport)
+def get_margin_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    period: str = Query("month", pattern=f"^({'|'.join(PERIODS)})$"),
+    db: Session = Depends(get_read_db),
+):
+    # Yield, cost and realized margin per animal, part and period; sync so the NumPy work runs in the threadpool
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    return margins(db, date_from, date_to, period)
@@ -0,0 +1,338 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional
+
+from app.locations import LOCATIONS
+
+class MeatType(str, Enum):
+    goat = "goat"
+    pork = "pork"
+    beef = "beef"
+    chicken = "chicken"
+
+class SeasoningType(str, Enum):
+    none = "none"
+    basic = "basic"
+    curry = "curry"
+    brown_stew = "brown_stew"
+
+class SpiceLevel(str, Enum):
+    none = "none"
+    mild = "mild"
+    medium = "medium"
+    hot = "hot"
+
+class OrderRequest(BaseModel):
+    customer_name: str = Field(..., min_length=1)
+    phone_number: str = Field(..., min_length=10, max_length=10, pattern="^[0-9]{10}$")
+    meat_type: MeatType
+    seasoning_package: SeasoningType
+    pepper_level: SpiceLevel
+    remove_items: Optional[List[str]] = []
+    pounds: float = Field(..., gt=0)
+    city: str = Field(..., min_length=1)
+
+class QuoteItem(BaseModel):
+    meat_type: MeatType
+    seasoning_package: SeasoningType = SeasoningType.none
+    pounds: float = Field(..., gt=0)
+
+class QuoteCart(BaseModel):
+    items: List[QuoteItem] = Field(..., min_length=1)
+
+class QuoteRequest(BaseModel):
+    carts: List[QuoteCart] = Field(..., min_length=1, max_length=1000)
+
+# Sales are recorded by the order endpoints; these are the manual movements
+class MovementKind(str, Enum):
+    receipt = "receipt"
+    adjustment = "adjustment"
+    spoilage = "spoilage"
+
+class StockMovementRequest(BaseModel):
+    kind: MovementKind
+    delta_lb: float
+    note: Optional[str] = None
+
+def known_location(location: Optional[str]):
+    # Stock is looked up by exact location name, so a typo would hide the row from every order
+    if location is not None and location not in LOCATIONS:
+        raise ValueError(f"unknown location; expected one of {', '.join(LOCATIONS)}")
+    return location
+
+class InventoryAdjustment(BaseModel):
+    inventory_id: int
+    # Either an absolute count or a change; a change is logged under `kind`
+    set_stock_lb: Optional[float] = Field(None, ge=0)
+    delta_lb: Optional[float] = None
+    kind: MovementKind = MovementKind.adjustment
+    is_active: Optional[bool] = None
+    is_seasoned: Optional[bool] = None
+    location: Optional[str] = None
+    note: Optional[str] = None
+
+    @field_validator("location")
+    @classmethod
+    def check_location(cls, location):
+        return known_location(location)
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if self.set_stock_lb is not None and self.delta_lb is not None:
+            raise ValueError("give set_stock_lb or delta_lb, not both")
+        if self.delta_lb is not None:
+            if self.delta_lb == 0:
+                raise ValueError("delta_lb must not be zero")
+            if self.kind == MovementKind.receipt and self.delta_lb < 0:
+                raise ValueError("a receipt must add stock")
+            if self.kind == MovementKind.spoilage and self.delta_lb > 0:
+                raise ValueError("spoilage must remove stock")
+        if all(value is None for value in (self.set_stock_lb, self.delta_lb, self.is_active, self.is_seasoned, self.location)):
+            raise ValueError("nothing to change")
+        return self
+
+# PUT /inventory/{id}: only these columns can change; stock goes through the ledger
+class InventoryUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    current_stock_lb: Optional[float] = Field(None, ge=0)
+    is_seasoned: Optional[bool] = None
+    location: Optional[str] = None
+    seasoning_package_id: Optional[int] = None
+
+    @field_validator("location")
+    @classmethod
+    def check_location(cls, location):
+        return known_location(location)
+
+class InventoryBulkUpdate(BaseModel):
+    adjustments: List[InventoryAdjustment] = Field(..., min_length=1, max_length=1000)
+    note: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_unique(self):
+        ids = [adjustment.inventory_id for adjustment in self.adjustments]
+        if len(set(ids)) != len(ids):
+            raise ValueError("each inventory_id may appear only once")
+        return self
+
+# Response models. FastAPI validates the endpoint's return value against these and serializes it
+# straight to JSON bytes in pydantic-core, without a jsonable_encoder pass.
+
+class Message(BaseModel):
+    message: str
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+
+class PaymentUpdated(BaseModel):
+    message: str
+    paid: bool
+
+class OrderSummary(BaseModel):
+    customer_name: str
+    phone_number: str
+    meat_type: str
+    seasoning_package: str
+    pepper_level: str
+    removed_items: Optional[List[str]] = None
+    pounds: float
+    city: str
+    location: str
+    price_per_pound: float
+    base_cost: float
+    seasoning_cost: float
+    delivery_fee: int
+    total_cost_jmd: int
+    confirmation_pin: str
+
+class OrderPlaced(BaseModel):
+    message: str
+    order_summary: OrderSummary
+    whatsapp_link: str
+
+class QuoteLine(BaseModel):
+    meat_type: str
+    meat_part_id: int
+    seasoning_package: str
+    pounds: float
+    price_per_pound: float
+    base_cost: float
+    seasoning_cost: float
+    line_total: float
+
+class CartQuote(BaseModel):
+    # Either a priced cart or an error; unset fields are left out of the response
+    items: Optional[List[QuoteLine]] = None
+    delivery_fee: Optional[int] = None
+    total_cost_jmd: Optional[int] = None
+    error: Optional[str] = None
+
+class QuoteResponse(BaseModel):
+    quotes: List[CartQuote]
+
+class AdminOrderItem(BaseModel):
+    meat_part: str
+    pounds_ordered: float
+    seasoned: Optional[bool] = None
+    seasonings: Optional[str] = None
+    unit_price: float
+    total_price: float
+
+class AdminOrder(BaseModel):
+    id: int
+    customer_name: str
+    phone_number: str
+    location: str
+    customer_pin: Optional[str] = None
+    is_paid: Optional[bool] = None
+    status: Optional[str] = None
+    date_ordered: Optional[datetime] = None
+    items: List[AdminOrderItem]
+
+class ImportLineResult(BaseModel):
+    line: int
+    status: str
+    error: Optional[str] = None
+    order_id: Optional[int] = None
+    location: Optional[str] = None
+    total_cost_jmd: Optional[int] = None
+    confirmation_pin: Optional[str] = None
+
+class BulkImportResult(BaseModel):
+    created: int
+    rejected: int
+    results: List[ImportLineResult]
+
+class CatalogAnimal(BaseModel):
+    id: int
+    name: str
+    total_weight_kg: float
+    purchase_price_jmd: float
+
+class CatalogMeatPart(BaseModel):
+    id: int
+    animal_id: int
+    part_name: str
+    weight_lb: float
+    price_per_lb_jmd: float
+
+class InventoryRow(BaseModel):
+    inventory_id: int
+    meat_part: str
+    animal: str
+    stock_lb: float
+    seasoned: Optional[bool] = None
+    location: str
+
+class LocationOut(BaseModel):
+    location: str
+    cities: List[str]
+
+class InventoryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    meat_part_id: int
+    current_stock_lb: float
+    is_seasoned: Optional[bool] = None
+    location: str
+    is_active: Optional[bool] = None
+    seasoning_package_id: Optional[int] = None
+
+class StockLevel(BaseModel):
+    inventory_id: int
+    stock_lb: float
+
+class MovementApplied(BaseModel):
+    inventory_id: int
+    current_stock_lb: float
+
+class AdjustedInventory(BaseModel):
+    inventory_id: int
+    current_stock_lb: float
+    is_active: Optional[bool] = None
+    is_seasoned: Optional[bool] = None
+    location: Optional[str] = None
+
+class InventoryBulkResult(BaseModel):
+    updated: int
+    items: List[AdjustedInventory]
+
+class StockMovementOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    inventory_id: int
+    kind: str
+    delta_lb: float
+    order_id: Optional[int] = None
+    note: Optional[str] = None
+    created_at: datetime
+
+class SalesRow(BaseModel):
+    # Only the group_by fields are present
+    day: Optional[date] = None
+    location: Optional[str] = None
+    meat_type: Optional[str] = None
+    seasoning: Optional[str] = None
+    is_paid: Optional[bool] = None
+    order_count: int
+    pounds: float
+    revenue_jmd: float
+    paid_revenue_jmd: float
+
+class SalesTotals(BaseModel):
+    pounds: float
+    revenue_jmd: float
+    paid_revenue_jmd: float
+
+class SalesReport(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    date_from: date = Field(alias="from")
+    date_to: date = Field(alias="to")
+    group_by: List[str]
+    rows: List[SalesRow]
+    totals: SalesTotals
+
+class MarginFigures(BaseModel):
+    items: int
+    sold_lb: float
+    revenue_jmd: float
+    cogs_jmd: float
+    margin_jmd: float
+    margin_pct: Optional[float] = None
+
+class AnimalMargin(MarginFigures):
+    animal_id: int
+    name: str
+    live_weight_lb: float
+    carcass_lb: float
+    yield_pct: Optional[float] = None
+    purchase_price_jmd: float
+    cost_per_lb_jmd: Optional[float] = None
+
+class PartMargin(MarginFigures):
+    meat_part_id: int
+    animal_id: int
+    part_name: str
+    weight_lb: float
+    list_price_per_lb_jmd: float
+    cost_per_lb_jmd: Optional[float] = None
+
+class PeriodMargin(MarginFigures):
+    period_start: date
+
+class MarginReport(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    period: str
+    totals: MarginFigures
+    animals: List[AnimalMargin]
+    parts: List[PartMargin]
+    periods: List[PeriodMargin]
@@ -0,0 +1,81 @@
+import os
+import re
+
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Order
+
+# Broad prefixes ("a", "876") match a large share of all orders; only the newest this many matches
+# are ranked or paged through, which keeps every search to a bounded amount of work. The endpoint
+# refuses cursors past the cap and flags a search that hit it.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "2000"))
+
+FTS_SEARCH = text("""
+    SELECT rowid FROM (
+        SELECT rowid, rank FROM orders_fts WHERE orders_fts MATCH :match ORDER BY rowid DESC LIMIT :candidates
+    ) ORDER BY rank, rowid DESC LIMIT :limit OFFSET :offset
+""")
+
+FTS_BEYOND_CAP = text(
+    "SELECT rowid FROM orders_fts WHERE orders_fts MATCH :match ORDER BY rowid DESC LIMIT 1 OFFSET :candidates"
+)
+
+# Whether each database has the orders_fts index, by URL. Migration 0009 skips it on databases
+# without FTS5: Postgres, and SQLite builds compiled without it.
+_fts_tables = {}
+
+def has_fts(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fts_tables:
+        _fts_tables[key] = bind.dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orders_fts'")
+        ).first() is not None
+    return _fts_tables[key]
+
+def fts_match(terms) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+def like_query(terms):
+    # Prefix LIKE matching, newest first. On Postgres the trigram indexes from 0011 serve these
+    # patterns; on SQLite without FTS5 it is a scan of orders.
+    name = func.lower(Order.customer_name)
+    query = select(Order.id)
+    for term in terms:
+        query = query.where(or_(
+            name.like(f"{term}%"), name.like(f"% {term}%"),
+            Order.phone_number.like(f"{term}%"), Order.customer_pin.like(f"{term}%"),
+        ))
+    return query.order_by(Order.id.desc())
+
+def search_terms(q: str):
+    # Words split the way the FTS5 tokenizer splits them. A query that is only a phone number, however
+    # it is punctuated, is one term: "(876) 555-0101" and "+1 876 555 0101" both find 8765550101.
+    digits = re.sub(r"[\s()+.\-]", "", q)
+    if digits.isdigit():
+        return [digits[1:] if len(digits) == 11 and digits.startswith("1") else digits]
+    return re.findall(r"\w+", q.lower())
+
+def search_order_ids(db: Session, q: str, limit: int, offset: int = 0):
+    # Ids of the orders matching every term as a prefix of the customer's name, phone or PIN, best first
+    terms = search_terms(q)
+    if not terms:
+        return []
+    if has_fts(db):
+        return db.scalars(FTS_SEARCH, {"match": fts_match(terms), "candidates": SEARCH_MAX_CANDIDATES,
+                                       "limit": limit, "offset": offset}).all()
+    limit = min(limit, SEARCH_MAX_CANDIDATES - offset)
+    if limit <= 0:
+        return []
+    return db.scalars(like_query(terms).limit(limit).offset(offset)).all()
+
+def search_truncated(db: Session, q: str, shown: int) -> bool:
+    # True when paging stopped at SEARCH_MAX_CANDIDATES, after `shown` results, and more orders match
+    terms = search_terms(q)
+    if not terms or shown < SEARCH_MAX_CANDIDATES:
+        return False
+    if has_fts(db):
+        params = {"match": fts_match(terms), "candidates": SEARCH_MAX_CANDIDATES}
+        return db.execute(FTS_BEYOND_CAP, params).first() is not None
+    return db.execute(like_query(terms).limit(1).offset(SEARCH_MAX_CANDIDATES)).first() is not None
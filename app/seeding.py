@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta
+from itertools import accumulate
+import random
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.locations import LOCATIONS
+from app.models import Animal, MeatPart, Inventory, SeasoningPackage, Order, OrderItem
+from app.pricing import seasoning_key
+from app.stock import movement, record_movements
+
+REFERENCE_ANIMALS = [
+    ("Goat", 22.0, 22000),
+    ("Chicken", 10.0, 6000),
+    ("Pig", 80.0, 42000),
+    ("Cow", 300.0, 280000),
+]
+
+REFERENCE_MEAT_PARTS = {
+    "Goat": [
+        ("Standard Goat Meat", 5.0, 1500),
+        ("Goat Head", 3.0, 900),
+        ("Goat Liver", 1.5, 800)
+    ],
+    "Chicken": [
+        ("Standard Chicken Meat", 4.0, 700),
+        ("Chicken Neck", 1.0, 300),
+        ("Chicken Liver", 1.0, 400)
+    ],
+    "Pig": [
+        ("Standard Pork Meat", 6.0, 1200),
+        ("Pig Tail", 2.5, 950),
+        ("Pork Belly", 4.0, 1400),
+        ("Pork Shoulder", 5.0, 1300)
+    ],
+    "Cow": [
+        ("Standard Beef Meat", 6.0, 1800),
+        ("Cow Head", 5.0, 1000),
+        ("Cow Tail", 4.0, 1500),
+        ("Cow Skin", 3.0, 1100),
+        ("Ribeye", 2.5, 2000),
+        ("Sirloin", 2.0, 1900),
+        ("Steak", 3.0, 1950),
+        ("Oxtail", 3.5, 2200)
+    ]
+}
+
+REFERENCE_SEASONINGS = [
+    ("Basic", "Salt, Pepper, Garlic, Thyme", 200),
+    ("Curry", "Curry Powder, Onion, Pimento, Garlic, Thyme", 250),
+    ("Brown Stew", "Browning, Onion, Tomato, Garlic, Thyme", 250),
+    ("Jerk", "Jerk Seasoning, Scallion, Scotch Bonnet, Thyme", 250)
+]
+
+REFERENCE_STOCK_LB = 20.0
+
+# Synthetic data distributions
+LOCATION_WEIGHTS = [0.5, 0.3, 0.2]  # in LOCATIONS order
+SPECIES_WEIGHTS = {"Chicken": 0.4, "Goat": 0.25, "Pig": 0.2, "Cow": 0.15}
+SEASONINGS = ["none", "basic", "curry", "brown_stew"]
+SEASONING_WEIGHTS = [0.35, 0.25, 0.25, 0.15]
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.4, 1.6, 1.1]  # Monday first; Friday/Saturday cook-ups
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 1, 2, 4, 6, 8, 8, 9, 8, 7, 7, 8, 7, 5, 3, 2, 1, 0, 0]
+FIRST_NAMES = ["Andre", "Shanna", "Kemar", "Tanisha", "Marlon", "Kadian", "Omar", "Latoya", "Dwayne", "Nadine",
+               "Ricardo", "Sashana", "Garfield", "Monique", "Damion", "Alicia", "Courtney", "Kerry-Ann"]
+LAST_NAMES = ["Brown", "Williams", "Campbell", "Thompson", "Clarke", "Reid", "Francis", "Grant", "Morgan",
+              "Bailey", "Stewart", "Gordon", "Walker", "Henry", "Lewis", "Powell"]
+
+def seed_reference(db: Session):
+    # Insert whatever part of the reference catalog is missing, one statement per table
+    counts = {}
+    animal_ids = dict(db.execute(select(Animal.name, func.min(Animal.id)).group_by(Animal.name)).all())
+    missing = [
+        {"name": name, "total_weight_kg": weight, "purchase_price_jmd": price, "date_purchased": datetime.utcnow()}
+        for name, weight, price in REFERENCE_ANIMALS if name not in animal_ids
+    ]
+    if missing:
+        db.execute(insert(Animal), missing)
+        animal_ids = dict(db.execute(select(Animal.name, func.min(Animal.id)).group_by(Animal.name)).all())
+    counts["animals"] = len(missing)
+
+    existing_parts = set(db.execute(select(MeatPart.animal_id, MeatPart.part_name)).all())
+    missing = [
+        {"animal_id": animal_ids[animal_name], "part_name": part_name, "weight_lb": weight, "price_per_lb_jmd": price}
+        for animal_name, parts in REFERENCE_MEAT_PARTS.items()
+        for part_name, weight, price in parts
+        if (animal_ids[animal_name], part_name) not in existing_parts
+    ]
+    if missing:
+        db.execute(insert(MeatPart), missing)
+    counts["meat_parts"] = len(missing)
+
+    reference_keys = {
+        (animal_ids[animal_name], part_name)
+        for animal_name, parts in REFERENCE_MEAT_PARTS.items()
+        for part_name, _, _ in parts
+    }
+    reference_parts = [
+        part_id for part_id, animal_id, part_name in db.execute(select(MeatPart.id, MeatPart.animal_id, MeatPart.part_name))
+        if (animal_id, part_name) in reference_keys
+    ]
+    # Every shop carries the reference cuts
+    stocked = set(db.execute(select(Inventory.meat_part_id, Inventory.location).distinct()).all())
+    missing = [
+        {"meat_part_id": part_id, "current_stock_lb": REFERENCE_STOCK_LB, "is_seasoned": False,
+         "location": location, "is_active": True}
+        for part_id in reference_parts
+        for location in LOCATIONS
+        if (part_id, location) not in stocked
+    ]
+    if missing:
+        inventory_ids = db.scalars(insert(Inventory).returning(Inventory.id, sort_by_parameter_order=True), missing).all()
+        record_movements(db, [
+            movement(inventory_id, "receipt", row["current_stock_lb"], note="seed")
+            for inventory_id, row in zip(inventory_ids, missing)
+        ])
+    counts["inventory"] = len(missing)
+
+    existing_seasonings = set(db.scalars(select(SeasoningPackage.name)).all())
+    missing = [
+        {"name": name, "ingredients": ingredients, "fee_jmd": fee}
+        for name, ingredients, fee in REFERENCE_SEASONINGS if name not in existing_seasonings
+    ]
+    if missing:
+        db.execute(insert(SeasoningPackage), missing)
+    counts["seasoning_packages"] = len(missing)
+
+    db.commit()
+    return counts
+
+def generate_animals(db: Session, count: int, rng: random.Random):
+    # Each animal is a copy of its species' cut list with jittered weights and prices,
+    # stocked at every location.
+    species = rng.choices(list(SPECIES_WEIGHTS), weights=list(SPECIES_WEIGHTS.values()), k=count)
+    start = db.scalar(select(func.count(Animal.id))) or 0
+    reference = {name: (weight, price) for name, weight, price in REFERENCE_ANIMALS}
+    animals = []
+    for i, name in enumerate(species):
+        weight, price = reference[name]
+        animals.append({
+            "name": f"{name} #{start + i + 1}",
+            "total_weight_kg": round(weight * rng.uniform(0.8, 1.2), 1),
+            "purchase_price_jmd": round(price * rng.uniform(0.85, 1.15), -1),
+            "date_purchased": datetime.utcnow() - timedelta(days=rng.randint(0, 365)),
+        })
+    animal_ids = db.scalars(insert(Animal).returning(Animal.id, sort_by_parameter_order=True), animals).all()
+
+    parts = [
+        {"animal_id": animal_id, "part_name": part_name, "weight_lb": round(weight * rng.uniform(0.8, 1.2), 2),
+         "price_per_lb_jmd": round(price * rng.uniform(0.9, 1.1), -1)}
+        for animal_id, name in zip(animal_ids, species)
+        for part_name, weight, price in REFERENCE_MEAT_PARTS[name]
+    ]
+    part_ids = db.scalars(insert(MeatPart).returning(MeatPart.id, sort_by_parameter_order=True), parts).all()
+
+    stock = [
+        {"meat_part_id": part_id, "current_stock_lb": round(rng.uniform(0, 200), 1), "is_seasoned": False,
+         "location": location, "is_active": True}
+        for part_id in part_ids
+        for location in LOCATIONS
+    ]
+    inventory_ids = db.scalars(insert(Inventory).returning(Inventory.id, sort_by_parameter_order=True), stock).all()
+    record_movements(db, [
+        movement(inventory_id, "receipt", row["current_stock_lb"], note="seed")
+        for inventory_id, row in zip(inventory_ids, stock) if row["current_stock_lb"]
+    ])
+    db.commit()
+    return {"animals": len(animal_ids), "meat_parts": len(part_ids), "inventory": len(part_ids) * len(LOCATIONS)}
+
+def generate_orders(db: Session, count: int, rng: random.Random, days: int = 365, customers: int = 5000, batch_size: int = 10000):
+    # Orders for the standard cut of each species, priced from the current catalog
+    standard = {}
+    for part_id, part_name, price in db.execute(select(MeatPart.id, MeatPart.part_name, MeatPart.price_per_lb_jmd).order_by(MeatPart.id)):
+        for name in SPECIES_WEIGHTS:
+            if part_name == REFERENCE_MEAT_PARTS[name][0][0]:
+                standard.setdefault(name, (part_id, price))
+    if not standard:
+        raise ValueError("Seed the reference catalog before generating orders")
+    species = list(standard)
+    species_weights = [SPECIES_WEIGHTS[name] for name in species]
+    fees = {"none": 0, **{seasoning_key(name): fee for name, _, fee in REFERENCE_SEASONINGS}}
+
+    # Repeat customers follow a long tail: a few regulars place most of the orders
+    people = [
+        (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "876" + "".join(rng.choices("0123456789", k=7)))
+        for _ in range(customers)
+    ]
+    people_weights = list(accumulate(1 / (rank + 1) for rank in range(customers)))
+
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = now - timedelta(days=days)
+    day_weights = list(accumulate(
+        WEEKDAY_WEIGHTS[day.weekday()] * (1.5 if day.month == 12 else 1.0)
+        for day in (start + timedelta(days=offset) for offset in range(days))
+    ))
+    hour_weights = list(accumulate(HOUR_WEIGHTS))
+    # Timestamps are drawn for the whole run and sorted so ids follow date order and index inserts append
+    seconds = sorted(
+        day * 86400 + hour * 3600 + int(rng.random() * 3600)
+        for day, hour in zip(
+            rng.choices(range(days), cum_weights=day_weights, k=count),
+            rng.choices(range(24), cum_weights=hour_weights, k=count),
+        )
+    )
+    location_weights = list(accumulate(LOCATION_WEIGHTS))
+    species_weights = list(accumulate(species_weights))
+    seasoning_weights = list(accumulate(SEASONING_WEIGHTS))
+    item_count_weights = list(accumulate([85, 12, 3]))
+
+    next_order_id = (db.scalar(select(func.max(Order.id))) or 0) + 1
+    next_item_id = (db.scalar(select(func.max(OrderItem.id))) or 0) + 1
+    orders_total = items_total = 0
+    while orders_total < count:
+        # Draw every random column for the batch up front; cumulative weights avoid re-summing per draw
+        n = min(batch_size, count - orders_total)
+        buyers = rng.choices(people, cum_weights=people_weights, k=n)
+        locations = rng.choices(LOCATIONS, cum_weights=location_weights, k=n)
+        item_counts = rng.choices([1, 2, 3], cum_weights=item_count_weights, k=n)
+        items = sum(item_counts)
+        item_species = iter(rng.choices(species, cum_weights=species_weights, k=items))
+        item_seasonings = iter(rng.choices(SEASONINGS, cum_weights=seasoning_weights, k=items))
+        order_rows = []
+        item_rows = []
+        for i in range(n):
+            ordered = start + timedelta(seconds=seconds[orders_total + i])
+            age_days = (now - ordered).days
+            is_paid = rng.random() < (0.97 if age_days > 7 else 0.6)
+            status = "cancelled" if rng.random() < 0.03 else ("delivered" if age_days > 2 else rng.choice(["pending", "confirmed"]))
+            order_rows.append({
+                "id": next_order_id, "customer_name": buyers[i][0], "phone_number": buyers[i][1],
+                "customer_pin": str(1000 + int(rng.random() * 9000)), "location": locations[i], "status": status,
+                "payment_status": "paid" if is_paid else "unpaid", "date_ordered": ordered, "is_paid": is_paid,
+            })
+            for _ in range(item_counts[i]):
+                part_id, price = standard[next(item_species)]
+                seasoning = next(item_seasonings)
+                pounds = round(min(60.0, max(5.0, rng.lognormvariate(2.2, 0.5))), 1)
+                item_rows.append({
+                    "id": next_item_id, "order_id": next_order_id, "meat_part_id": part_id, "pounds_ordered": pounds,
+                    "seasoned": seasoning != "none", "seasonings": seasoning, "unit_price": price,
+                    "total_price": price * pounds + fees[seasoning],
+                })
+                next_item_id += 1
+            next_order_id += 1
+        db.execute(insert(Order.__table__), order_rows)
+        db.execute(insert(OrderItem.__table__), item_rows)
+        db.commit()
+        orders_total += n
+        items_total += len(item_rows)
+
+    # Explicit ids bypass the Postgres sequences; move them past the generated rows
+    if db.bind.dialect.name == "postgresql":
+        for table in ("orders", "order_items"):
+            db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+        db.commit()
+    return {"orders": orders_total, "order_items": items_total}
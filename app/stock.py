@@ -0,0 +1,224 @@
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Inventory, StockMovement, StockSnapshot
+
+MOVEMENT_KINDS = ("receipt", "sale", "adjustment", "spoilage")
+
+# Snapshots stop short of "now" so a transaction that stamped its movement just before the
+# snapshot but commits just after it is still counted on the far side of the boundary
+SNAPSHOT_LAG = timedelta(minutes=1)
+
+# Ledger and inventory are compared with a small tolerance for float rounding
+DRIFT_TOLERANCE_LB = 1e-6
+
+def movement(inventory_id: int, kind: str, delta_lb: float, order_id: int = None, note: str = None) -> dict:
+    return {"inventory_id": inventory_id, "kind": kind, "delta_lb": delta_lb, "order_id": order_id, "note": note,
+            "created_at": datetime.utcnow()}
+
+def record_movements(db: Session, rows):
+    # Plain inserts, no read-modify-write, so ledger writes never conflict with each other
+    if rows:
+        db.execute(insert(StockMovement), rows)
+
+def apply_movement(db: Session, inventory_id: int, kind: str, delta_lb: float, note: str = None):
+    # Moves stock and logs it in one transaction; returns the new level, or None when the row is
+    # missing or the movement would take it below zero
+    new_stock = db.execute(
+        update(Inventory)
+        .where(Inventory.id == inventory_id, Inventory.current_stock_lb + delta_lb >= 0)
+        .values(current_stock_lb=Inventory.current_stock_lb + delta_lb)
+        .returning(Inventory.current_stock_lb)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if new_stock is not None:
+        record_movements(db, [movement(inventory_id, kind, delta_lb, note=note)])
+    return new_stock
+
+def set_stock(db: Session, inventory_id: int, stock_lb: float, note: str = None):
+    # Overwrite with an absolute count, logged as an adjustment. Compare-and-set on the old value
+    # so an order landing between the read and the write is never silently undone.
+    while True:
+        current = db.scalar(select(Inventory.current_stock_lb).where(Inventory.id == inventory_id))
+        if current is None:
+            return None
+        changed = db.execute(
+            update(Inventory)
+            .where(Inventory.id == inventory_id, Inventory.current_stock_lb == current)
+            .values(current_stock_lb=stock_lb)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if changed:
+            if stock_lb != current:
+                record_movements(db, [movement(inventory_id, "adjustment", stock_lb - current, note=note)])
+            return stock_lb
+
+def bulk_adjust(db: Session, adjustments, note: str = None):
+    # One read, one executemany per statement shape and a single commit, however many rows change.
+    # Absolute counts are compare-and-set against the value read, deltas are guarded against going
+    # negative; if either guard trips, nothing is applied.
+    ids = [adjustment.inventory_id for adjustment in adjustments]
+    current = dict(db.execute(select(Inventory.id, Inventory.current_stock_lb).where(Inventory.id.in_(ids))).all())
+    missing = [inventory_id for inventory_id in ids if inventory_id not in current]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Inventory not found: {', '.join(map(str, missing))}")
+
+    absolute = []
+    relative = []
+    fields = []
+    movements = []
+    short = []
+    results = []
+    for adjustment in adjustments:
+        inventory_id = adjustment.inventory_id
+        old = new = current[inventory_id]
+        if adjustment.set_stock_lb is not None and adjustment.set_stock_lb != old:
+            new = adjustment.set_stock_lb
+            absolute.append({"inventory_id": inventory_id, "expected": old, "stock": new})
+            movements.append(movement(inventory_id, "adjustment", new - old, note=adjustment.note or note))
+        elif adjustment.delta_lb is not None:
+            new = old + adjustment.delta_lb
+            if new < 0:
+                short.append(inventory_id)
+            relative.append({"inventory_id": inventory_id, "delta": adjustment.delta_lb})
+            movements.append(movement(inventory_id, adjustment.kind.value, adjustment.delta_lb, note=adjustment.note or note))
+        changes = {
+            key: value for key, value in
+            (("is_active", adjustment.is_active), ("is_seasoned", adjustment.is_seasoned), ("location", adjustment.location))
+            if value is not None
+        }
+        if changes:
+            fields.append({"id": inventory_id, **changes})
+        results.append({"inventory_id": inventory_id, "current_stock_lb": new, **changes})
+    if short:
+        raise HTTPException(status_code=409, detail=f"Not enough stock on inventory {', '.join(map(str, short))}")
+
+    table = Inventory.__table__
+    applied = 0
+    if absolute:
+        applied += db.execute(
+            update(table)
+            .where(table.c.id == bindparam("inventory_id"), table.c.current_stock_lb == bindparam("expected"))
+            .values(current_stock_lb=bindparam("stock")),
+            absolute,
+        ).rowcount
+    if relative:
+        applied += db.execute(
+            update(table)
+            .where(table.c.id == bindparam("inventory_id"), table.c.current_stock_lb + bindparam("delta") >= 0)
+            .values(current_stock_lb=table.c.current_stock_lb + bindparam("delta")),
+            relative,
+        ).rowcount
+    if applied != len(absolute) + len(relative):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Stock changed while adjusting; please retry")
+    if relative:
+        # A delta lands on whatever the row holds at write time, which an order may have moved since
+        # the read above, so report the level actually written
+        written = dict(db.execute(
+            select(Inventory.id, Inventory.current_stock_lb).where(Inventory.id.in_([row["inventory_id"] for row in relative]))
+        ).all())
+        for result in results:
+            result["current_stock_lb"] = written.get(result["inventory_id"], result["current_stock_lb"])
+    if fields:
+        # ORM bulk UPDATE by primary key; rows changing the same columns share one executemany
+        db.execute(update(Inventory), fields)
+    record_movements(db, movements)
+    db.commit()
+    return {"updated": len(results), "items": results}
+
+def stock_as_of(db: Session, at: datetime, inventory_ids=None):
+    # Latest snapshot at or before `at`, plus the movements between it and `at`
+    latest = (
+        select(StockSnapshot.inventory_id, func.max(StockSnapshot.as_of).label("as_of"))
+        .where(StockSnapshot.as_of <= at)
+        .group_by(StockSnapshot.inventory_id)
+        .subquery()
+    )
+    snapshots = select(StockSnapshot.inventory_id, StockSnapshot.as_of, StockSnapshot.stock_lb).join(
+        latest, (latest.c.inventory_id == StockSnapshot.inventory_id) & (latest.c.as_of == StockSnapshot.as_of)
+    )
+    movements = (
+        select(StockMovement.inventory_id, func.sum(StockMovement.delta_lb))
+        .outerjoin(latest, latest.c.inventory_id == StockMovement.inventory_id)
+        .where(StockMovement.created_at <= at, or_(latest.c.as_of == None, StockMovement.created_at > latest.c.as_of))
+        .group_by(StockMovement.inventory_id)
+    )
+    if inventory_ids is not None:
+        snapshots = snapshots.where(StockSnapshot.inventory_id.in_(inventory_ids))
+        movements = movements.where(StockMovement.inventory_id.in_(inventory_ids))
+
+    stock = {inventory_id: stock_lb for inventory_id, _, stock_lb in db.execute(snapshots)}
+    for inventory_id, delta in db.execute(movements):
+        stock[inventory_id] = stock.get(inventory_id, 0.0) + delta
+    return stock
+
+def write_snapshots(db: Session, as_of: datetime = None):
+    # Snapshot every row with ledger history, rolled forward from its previous snapshot
+    as_of = as_of or datetime.utcnow() - SNAPSHOT_LAG
+    balances = stock_as_of(db, as_of)
+    if balances:
+        db.execute(insert(StockSnapshot), [
+            {"inventory_id": inventory_id, "as_of": as_of, "stock_lb": stock_lb}
+            for inventory_id, stock_lb in balances.items()
+        ])
+        db.commit()
+    return len(balances)
+
+def reconcile(db: Session, fix: bool = False):
+    # Compares the live stock on each inventory row with its ledger total, and each row's latest
+    # snapshot with a full recount of the ledger up to that point. Returns one dict per mismatch.
+    problems = []
+    ledger = (
+        select(StockMovement.inventory_id, func.sum(StockMovement.delta_lb).label("total"))
+        .group_by(StockMovement.inventory_id)
+        .subquery()
+    )
+    # One statement, so both sides come from the same consistent read
+    rows = db.execute(
+        select(Inventory.id, Inventory.current_stock_lb, func.coalesce(ledger.c.total, 0.0))
+        .outerjoin(ledger, ledger.c.inventory_id == Inventory.id)
+        .order_by(Inventory.id)
+    ).all()
+    for inventory_id, stock_lb, ledger_lb in rows:
+        if abs(stock_lb - ledger_lb) > DRIFT_TOLERANCE_LB:
+            problems.append({"check": "inventory", "inventory_id": inventory_id, "stored_lb": stock_lb,
+                             "ledger_lb": ledger_lb})
+
+    latest = (
+        select(StockSnapshot.inventory_id, func.max(StockSnapshot.as_of).label("as_of"))
+        .group_by(StockSnapshot.inventory_id)
+        .subquery()
+    )
+    for inventory_id, as_of, stock_lb, ledger_lb in db.execute(
+        select(
+            StockSnapshot.inventory_id, StockSnapshot.as_of, StockSnapshot.stock_lb,
+            select(func.coalesce(func.sum(StockMovement.delta_lb), 0.0))
+            .where(StockMovement.inventory_id == StockSnapshot.inventory_id, StockMovement.created_at <= StockSnapshot.as_of)
+            .scalar_subquery(),
+        ).join(latest, (latest.c.inventory_id == StockSnapshot.inventory_id) & (latest.c.as_of == StockSnapshot.as_of))
+    ):
+        if abs(stock_lb - ledger_lb) > DRIFT_TOLERANCE_LB:
+            problems.append({"check": "snapshot", "inventory_id": inventory_id, "as_of": as_of.isoformat(),
+                             "stored_lb": stock_lb, "ledger_lb": ledger_lb})
+
+    if fix and problems:
+        # The ledger is the source of truth: inventory rows are reset to it, bad snapshots are dropped
+        for problem in problems:
+            if problem["check"] == "inventory":
+                # Only if nothing moved since the check; otherwise the next run picks it up
+                db.execute(
+                    update(Inventory)
+                    .where(Inventory.id == problem["inventory_id"], Inventory.current_stock_lb == problem["stored_lb"])
+                    .values(current_stock_lb=problem["ledger_lb"])
+                )
+            else:
+                db.query(StockSnapshot).filter(
+                    StockSnapshot.inventory_id == problem["inventory_id"],
+                    StockSnapshot.as_of == datetime.fromisoformat(problem["as_of"]),
+                ).delete(synchronize_session=False)
+        db.commit()
+    return problems
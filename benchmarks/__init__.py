@@ -0,0 +1,4 @@
+import os
+
+# Tokens minted and checked inside one benchmark process; a real deployment sets its own in .env
+os.environ.setdefault("SECRET_KEY", "benchmark-only-secret")
@@ -0,0 +1,124 @@
+"""Replay a promo burst of /order traffic with admission control off and on.
+
+Many customers (one address each) place orders at once while an admin keeps updating payment
+status. With the write gate on, public writes beyond the queue are shed with 503s and the admin's
+requests go to the front of the queue. A last run has one address send more orders than its rate
+limit allows.
+
+Usage: python -m benchmarks.admission [--burst 600] [--admin-requests 30] [--concurrency 8] [--queue 64]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from app import admission
+from app.auth import create_access_token
+from benchmarks.order_concurrency import build_database
+import main
+
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "basic",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+
+def summary(samples):
+    if not samples:
+        return "-"
+    cuts = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return f"p50 {statistics.median(samples) * 1000:7.1f} ms  p99 {cuts[98] * 1000:7.1f} ms"
+
+
+async def burst(args):
+    public = {"latency": [], "statuses": []}
+    admin = []
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench', 'admin': True})}"}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        r = await client.post("/order", json=ORDER, headers={"X-Forwarded-For": "10.0.0.0"})
+        r.raise_for_status()
+        order_id = 1
+
+        async def customer(number):
+            started = time.perf_counter()
+            r = await client.post("/order", json=ORDER, headers={"X-Forwarded-For": f"10.1.{number // 250}.{number % 250}"})
+            public["statuses"].append(r.status_code)
+            if r.status_code == 200:
+                public["latency"].append(time.perf_counter() - started)
+
+        async def operator():
+            await asyncio.sleep(0.05)
+            for number in range(args.admin_requests):
+                started = time.perf_counter()
+                r = await client.put(f"/admin/orders/{order_id}/payment-status", json={"is_paid": number % 2 == 0},
+                                     headers=headers)
+                r.raise_for_status()
+                admin.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(operator(), *(customer(number) for number in range(args.burst)))
+    return public, admin
+
+
+async def flood(count):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        statuses = []
+        for _ in range(count):
+            r = await client.post("/order", json=ORDER, headers={"X-Forwarded-For": "10.2.0.1"})
+            statuses.append(r.status_code)
+        return statuses
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=600, help="customers ordering at the same moment")
+    parser.add_argument("--admin-requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=admission.WRITE_CONCURRENCY or 8)
+    parser.add_argument("--queue", type=int, default=admission.WRITE_QUEUE_SIZE)
+    parser.add_argument("--flood", type=int, default=100, help="orders sent by a single address")
+    args = parser.parse_args()
+
+    # Each simulated customer gets its own address through X-Forwarded-For
+    admission.TRUST_FORWARDED_FOR = True
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session = build_database(os.path.join(tmp, "bench.db"), (args.burst * 2 + args.flood + 2) * ORDER["pounds"])
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[main.get_db] = get_bench_db
+        for label, limit in (("gate off", 0), ("gate on", args.concurrency)):
+            admission.write_gate.limit = limit
+            admission.write_gate.queue_size = args.queue
+            started = time.perf_counter()
+            public, admin = asyncio.run(burst(args))
+            elapsed = time.perf_counter() - started
+            statuses = public["statuses"]
+            print(f"{label}: {args.burst} orders in {elapsed:.2f}s, {statuses.count(200)} placed, "
+                  f"{statuses.count(503)} shed (503), {len(statuses) - statuses.count(200) - statuses.count(503)} other")
+            print(f"  customers placed: {summary(public['latency'])}")
+            print(f"  admin updates:    {summary(admin)}")
+
+        statuses = asyncio.run(flood(args.flood))
+        main.app.dependency_overrides.clear()
+        engine.dispose()
+    print(f"one address, {args.flood} orders: {statuses.count(200)} placed, {statuses.count(429)} rate limited (429)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,225 @@
+"""Benchmark the API hot paths in-process and check them against a stored baseline.
+
+Drives main.app over an ASGI transport against a freshly migrated and seeded
+SQLite database, then reports throughput, p50/p95/p99 latency and SQL
+statements per request for each endpoint.
+
+Usage: python -m benchmarks.api_hot_paths [--orders 100000] [--requests 1000]
+       [--concurrency 10] [--baseline benchmarks/results/baseline.json]
+       [--tolerance 10] [--save-baseline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import event, update
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "curry",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+ADMIN = ("bench-admin", "bench-password")
+
+# name, method, path, JSON body, needs admin token
+ENDPOINTS = [
+    ("POST /order", "POST", "/order", ORDER, False),
+    ("GET /admin/orders", "GET", "/admin/orders?limit=50", None, True),
+    ("GET /admin/orders unpaid", "GET", "/admin/orders?limit=50&is_paid=false", None, True),
+    ("GET /inventory", "GET", "/inventory", None, False),
+]
+
+# Higher is better for throughput; lower is better for everything else
+HIGHER_IS_BETTER = {"requests_per_s"}
+COMPARED = ("requests_per_s", "p95_ms", "statements_per_request")
+
+
+def prepare_database(url, animals, orders, seed):
+    # Must run before main is imported: app.database builds its engines from the environment
+    os.environ["DATABASE_URL"] = url
+    # One load generator address would trip the per-client rate limits
+    os.environ["ADMISSION_ENABLED"] = "false"
+    from alembic import command
+    from alembic.config import Config
+
+    from app.auth import hash_password
+    from app.database import SessionLocal
+    from app.models import Inventory, User
+    from app.seeding import generate_animals, generate_orders, seed_reference
+
+    command.upgrade(Config("alembic.ini"), "head")
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        seed_reference(db)
+        if animals:
+            generate_animals(db, animals, rng)
+        if orders:
+            generate_orders(db, orders, rng)
+        # Enough stock that /order never runs out mid-run
+        db.execute(update(Inventory).values(current_stock_lb=1e9))
+        db.add(User(username=ADMIN[0], password_hash=hash_password(ADMIN[1]), is_admin=True))
+        db.commit()
+    finally:
+        db.close()
+
+
+class StatementCounter:
+    def __init__(self, engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, *args):
+        self.count += 1
+
+
+async def run_endpoint(client, method, path, body, headers, total, concurrency):
+    latencies = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            r = await client.request(method, path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            errors += r.status_code >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, time.perf_counter() - started, errors
+
+
+async def run_suite(app, counter, total, concurrency, warmup):
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post("/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+        r.raise_for_status()
+        admin = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        for name, method, path, body, needs_admin in ENDPOINTS:
+            headers = admin if needs_admin else None
+            await run_endpoint(client, method, path, body, headers, warmup, concurrency)
+            counter.count = 0
+            latencies, elapsed, errors = await run_endpoint(client, method, path, body, headers, total, concurrency)
+            cuts = statistics.quantiles(latencies, n=100)
+            results[name] = {
+                "requests": total,
+                "errors": errors,
+                "requests_per_s": round(total / elapsed, 1),
+                "p50_ms": round(statistics.median(latencies) * 1000, 2),
+                "p95_ms": round(cuts[94] * 1000, 2),
+                "p99_ms": round(cuts[98] * 1000, 2),
+                "statements_per_request": round(counter.count / total, 2),
+            }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Returns one line per metric that moved more than tolerance percent the wrong way
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        for metric in COMPARED:
+            before, after = previous[metric], current[metric]
+            if metric in HIGHER_IS_BETTER:
+                worse = after < before * (1 - tolerance / 100)
+            else:
+                worse = after > before * (1 + tolerance / 100)
+            if worse:
+                regressions.append(f"{name}: {metric} {before} -> {after}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--animals", type=int, default=50, help="synthetic animals to seed")
+    parser.add_argument("--orders", type=int, default=100000, help="synthetic historical orders to seed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed regression in percent")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        prepare_database(url, args.animals, args.orders, args.seed)
+
+        from app import database
+        from main import app
+
+        # GET routes run on the read engines
+        engines = {database.engine, database.read_engine}
+        if database.ASYNC_DB:
+            engines |= {database.async_engine.sync_engine, database.async_read_engine.sync_engine}
+        counter = StatementCounter(engines)
+        results = asyncio.run(run_suite(app, counter, args.requests, args.concurrency, args.warmup))
+        if database.ASYNC_DB:
+            asyncio.run(database.async_engine.dispose())
+            asyncio.run(database.async_read_engine.dispose())
+        database.read_engine.dispose()
+        database.engine.dispose()
+
+    for name, r in results.items():
+        print(f"{name:>26}: {r['requests_per_s']:8.1f} req/s  p50 {r['p50_ms']:7.2f} ms  p95 {r['p95_ms']:7.2f} ms"
+              f"  p99 {r['p99_ms']:7.2f} ms  {r['statements_per_request']:5.2f} stmt/req  errors {r['errors']}")
+
+    run = {
+        "created": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "async_db": database.ASYNC_DB,
+        "config": {"animals": args.animals, "orders": args.orders, "requests": args.requests,
+                   "concurrency": args.concurrency},
+        "endpoints": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; rerun with --save-baseline to store one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    failed = regressions or any(r["errors"] for r in results.values())
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{'FAIL' if failed else 'OK'}: compared against {args.baseline} with {args.tolerance:g}% tolerance")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
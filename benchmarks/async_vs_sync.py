@@ -0,0 +1,128 @@
+"""Compare requests/s and p99 latency of the sync and async database paths.
+
+Usage: python -m benchmarks.async_vs_sync [--requests 2000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.catalog import invalidate_catalog
+from app.database import (
+    get_async_db, get_async_read_db, get_db, get_read_db, make_async_engine, make_engine, to_async_url,
+)
+from app.models import Base, Animal, MeatPart, Inventory
+from app.routers import catalog, orders
+
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "none",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+
+def seed(url):
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    goat = Animal(name="Goat", total_weight_kg=22.0, purchase_price_jmd=22000)
+    for name in ("Standard Goat Meat", "Goat Head", "Goat Liver"):
+        part = MeatPart(animal=goat, part_name=name, weight_lb=5.0, price_per_lb_jmd=1500)
+        db.add(Inventory(meat_part=part, current_stock_lb=1e9, is_seasoned=False, location="St. Thomas", is_active=True))
+    db.commit()
+    db.close()
+    invalidate_catalog()
+    return engine
+
+
+def build_app(mode, url):
+    app = FastAPI()
+    if mode == "async":
+        engine = make_async_engine(to_async_url(url))
+        Session = async_sessionmaker(engine, class_=AsyncSession, autoflush=False)
+
+        async def override():
+            async with Session() as db:
+                yield db
+
+        app.include_router(orders.async_router)
+        app.include_router(catalog.async_router)
+        # Reads and writes share one engine here, so the two paths differ only in sync vs async
+        app.dependency_overrides[get_async_db] = app.dependency_overrides[get_async_read_db] = override
+    else:
+        engine = make_engine(url)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.include_router(orders.router)
+        app.include_router(catalog.router)
+        app.dependency_overrides[get_db] = app.dependency_overrides[get_read_db] = override
+    return app, engine
+
+
+async def run(app, total, concurrency):
+    latencies = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(client, i):
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            if i % 4 == 0:
+                r = await client.post("/order", json=ORDER)
+            elif i % 4 == 1:
+                r = await client.get("/animals")
+            else:
+                r = await client.get("/inventory")
+            latencies.append(time.perf_counter() - started)
+            errors += r.status_code != 200
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed, errors
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    for mode in ("sync", "async"):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(url).dispose()
+            app, engine = build_app(mode, url)
+            latencies, elapsed, errors = asyncio.run(run(app, args.requests, args.concurrency))
+            if mode == "async":
+                asyncio.run(engine.dispose())
+            else:
+                engine.dispose()
+        p50 = statistics.median(latencies) * 1000
+        p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+        print(f"{mode:>5}: {args.requests / elapsed:8.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  errors {errors}")
+
+
+if __name__ == "__main__":
+    main_cli()
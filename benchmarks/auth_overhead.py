@@ -0,0 +1,62 @@
+"""Measure the per-request cost of admin token checks with the verified-token cache on and off.
+
+Usage: python -m benchmarks.auth_overhead [--requests 5000]
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app import auth
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/open")
+    async def open_endpoint():
+        return {"ok": True}
+
+    @app.get("/admin", dependencies=[Depends(auth.get_current_admin_user)])
+    async def admin_endpoint():
+        return {"ok": True}
+
+    return app
+
+
+async def per_request_us(app, path, headers, total):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get(path, headers=headers)
+        started = time.perf_counter()
+        for _ in range(total):
+            r = await client.get(path, headers=headers)
+            r.raise_for_status()
+        return (time.perf_counter() - started) / total * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "bench", "admin": True})
+    headers = {"Authorization": f"Bearer {token}"}
+    app = build_app()
+
+    baseline = asyncio.run(per_request_us(app, "/open", None, args.requests))
+    print(f"   no auth: {baseline:7.1f} us/request")
+    for label, size in (("cache off", 0), ("cache on", auth.TOKEN_CACHE_SIZE or 1024)):
+        auth.token_cache = auth.TokenCache(size)
+        verify = min(timeit.repeat(lambda: auth.verify_token(token), number=2000, repeat=5)) / 2000 * 1e6
+        request = asyncio.run(per_request_us(app, "/admin", headers, args.requests))
+        print(f"{label:>10}: {request:7.1f} us/request  (+{request - baseline:5.1f} us over no auth)"
+              f"  verify_token {verify:6.2f} us")
+
+
+if __name__ == "__main__":
+    main_cli()
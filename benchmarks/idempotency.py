@@ -0,0 +1,115 @@
+"""Simulate clients retrying POST /order with an Idempotency-Key and count the orders that result.
+
+Each client sends one order and then --retries duplicates of it, some overlapping the original and
+some after it finished. Reports how many orders and how much stock were actually taken, then times
+single requests without a key, with a new key, and replayed from memory and from the database.
+
+Usage: python -m benchmarks.idempotency [--clients 200] [--retries 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.idempotency import order_idempotency
+from app.models import Inventory, Order
+from benchmarks.order_concurrency import build_database, without_admission
+import main
+
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "basic",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+
+async def timed(client, count, key=None):
+    samples = []
+    for number in range(count):
+        headers = {"Idempotency-Key": f"{key}-{number}"} if key else {}
+        started = time.perf_counter()
+        r = await client.post("/order", json=ORDER, headers=headers)
+        r.raise_for_status()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def post(key):
+            r = await client.post("/order", json=ORDER, headers={"Idempotency-Key": key})
+            r.raise_for_status()
+            return r.json()["order_summary"]["confirmation_pin"]
+
+        async def customer(number):
+            key = f"burst-{number}"
+            # Half the retries race the original, the rest arrive after it answered
+            racing = args.retries // 2
+            pins = await asyncio.gather(*(post(key) for _ in range(1 + racing)))
+            for _ in range(args.retries - racing):
+                pins.append(await post(key))
+            return len(set(pins))
+
+        started = time.perf_counter()
+        distinct = await asyncio.gather(*(customer(number) for number in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+        # One request at a time, so the latencies compare the paths rather than queueing
+        timings = {
+            "no key": await timed(client, args.samples),
+            "new key": await timed(client, args.samples, "seq"),
+            "replay, memory": await timed(client, args.samples, "seq"),
+        }
+        # What another app worker would see: nothing in this process's memory
+        order_idempotency.cache.clear()
+        timings["replay, database"] = await timed(client, args.samples, "seq")
+    return timings, distinct, elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=100, help="sequential requests per latency figure")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stock = (args.clients + 2 * args.samples) * ORDER["pounds"]
+        engine, Session = build_database(os.path.join(tmp, "bench.db"), stock)
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[main.get_db] = get_bench_db
+        without_admission()
+        timings, distinct, elapsed = asyncio.run(run(args))
+        main.app.dependency_overrides.clear()
+        with Session() as db:
+            orders = db.scalar(select(func.count()).select_from(Order))
+            taken = stock - db.scalar(select(Inventory.current_stock_lb))
+        engine.dispose()
+
+    expected = args.clients + 2 * args.samples
+    print(f"burst:            {args.clients * (args.retries + 1)} requests from {args.clients} clients in {elapsed:.2f}s")
+    print(f"orders created:   {orders}, expected {expected}; "
+          f"clients that saw two different PINs: {sum(1 for count in distinct if count > 1)}")
+    print(f"stock taken:      {taken:.0f} lb, expected {expected * ORDER['pounds']} lb")
+    for label, samples in timings.items():
+        print(f"{label + ':':<18}p50 {statistics.median(samples) * 1000:.1f} ms, max {max(samples) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main_cli()
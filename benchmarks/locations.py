@@ -0,0 +1,135 @@
+"""Run an order rush at one shop and time stock reads at the others while it lasts.
+
+Every location stocks the same goat cut. --orders concurrent orders go to Kingston while readers poll
+GET /inventory for each location; Kingston's orders only invalidate Kingston's (and the all-locations)
+cached rows, so St. Thomas and St. Catherine keep answering from memory; reads on the sync routes
+still queue for the threadpool behind the orders. Also checks that the orders took stock from
+Kingston alone.
+
+Usage: python -m benchmarks.locations [--orders 300] [--readers 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import catalog
+from app.database import make_read_engine
+from app.locations import LOCATIONS
+from app.models import Inventory, Order, StockMovement
+from benchmarks.order_concurrency import build_database, without_admission
+import main
+
+RUSH_LOCATION = "Kingston"
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "basic",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Half Way Tree",
+}
+
+
+loads = {location: 0 for location in LOCATIONS}
+list_inventory = catalog.list_inventory
+
+
+def counted_list_inventory(db, inventory_ids=None, location=None):
+    # Cache misses that went to the database
+    if location is not None:
+        loads[location] += 1
+    return list_inventory(db, inventory_ids, location)
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        rushing = True
+        timings = {location: [] for location in LOCATIONS}
+
+        async def reader(location):
+            while rushing:
+                started = time.perf_counter()
+                r = await client.get("/inventory", params={"location": location})
+                r.raise_for_status()
+                timings[location].append(time.perf_counter() - started)
+                await asyncio.sleep(0)
+
+        readers = [asyncio.create_task(reader(location)) for location in LOCATIONS for _ in range(args.readers)]
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(client.post("/order", json=ORDER) for _ in range(args.orders)))
+        elapsed = time.perf_counter() - started
+        rushing = False
+        await asyncio.gather(*readers)
+    return [r.status_code for r in statuses], timings, elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--readers", type=int, default=4, help="concurrent /inventory pollers per location")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stock = args.orders * ORDER["pounds"]
+        engine, Session = build_database(os.path.join(tmp, "bench.db"), stock)
+        with Session() as db:
+            seed = db.scalars(select(Inventory)).one()
+            for location in LOCATIONS:
+                if location != seed.location:
+                    item = Inventory(meat_part_id=seed.meat_part_id, current_stock_lb=stock, is_seasoned=False,
+                                     location=location, is_active=True)
+                    db.add(StockMovement(inventory=item, kind="receipt", delta_lb=stock))
+            db.commit()
+
+        read_engine = make_read_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        ReadSession = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+        def bench_db(session_factory):
+            def get_bench_db():
+                db = session_factory()
+                try:
+                    yield db
+                finally:
+                    db.close()
+            return get_bench_db
+
+        main.app.dependency_overrides[main.get_db] = bench_db(Session)
+        main.app.dependency_overrides[main.get_read_db] = bench_db(ReadSession)
+        without_admission()
+        catalog.list_inventory = counted_list_inventory
+        statuses, timings, elapsed = asyncio.run(run(args))
+        catalog.list_inventory = list_inventory
+        main.app.dependency_overrides.clear()
+        with Session() as db:
+            left = dict(db.execute(select(Inventory.location, Inventory.current_stock_lb)).all())
+            routed = dict(db.execute(select(Order.location, func.count()).group_by(Order.location)).all())
+        read_engine.dispose()
+        engine.dispose()
+
+    print(f"rush:             {statuses.count(200)}/{args.orders} orders to {RUSH_LOCATION} "
+          f"in {elapsed:.2f}s ({args.orders / elapsed:.1f} orders/s)")
+    print(f"orders by shop:   {routed}")
+    for location in LOCATIONS:
+        samples = sorted(timings[location])
+        p99 = samples[int(len(samples) * 0.99)] if samples else 0
+        print(f"{location + ':':<18}{left[location]:.0f} lb left; /inventory x{len(samples)}, "
+              f"{loads[location]} from the database, p50 {statistics.median(samples) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+    isolated = routed == {RUSH_LOCATION: statuses.count(200)} and all(
+        left[location] == stock for location in LOCATIONS if location != RUSH_LOCATION
+    )
+    print("other shops untouched: " + ("yes" if isolated else "NO"))
+    raise SystemExit(0 if isolated else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,115 @@
+"""Fire parallel /order calls at a single inventory row and check stock is conserved.
+
+Usage: python -m benchmarks.order_concurrency [--orders 400] [--stock 1000] [--pounds 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from app import admission
+from app.database import make_engine
+from app.models import Base, Animal, MeatPart, Inventory, Order, OrderItem, SeasoningPackage, StockMovement
+from app.stock import reconcile
+import main
+
+
+def without_admission():
+    # Load generators send everything from one address, far past the per-client limits and the
+    # write queue; these benchmarks measure the write path behind them (see benchmarks.admission)
+    admission.rate_limiter.rules = {}
+    admission.write_gate.limit = 0
+
+
+def build_database(path, stock):
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    goat = Animal(name="Goat", total_weight_kg=22.0, purchase_price_jmd=22000)
+    part = MeatPart(animal=goat, part_name="Standard Goat Meat", weight_lb=5.0, price_per_lb_jmd=1500)
+    item = Inventory(meat_part=part, current_stock_lb=stock, is_seasoned=False, location="St. Thomas", is_active=True)
+    db.add(StockMovement(inventory=item, kind="receipt", delta_lb=stock))
+    db.add(SeasoningPackage(name="Basic", ingredients="Salt, Pepper, Garlic, Thyme", fee_jmd=200))
+    db.commit()
+    db.close()
+    return engine, Session
+
+
+async def fire_orders(count, pounds):
+    payload = {
+        "customer_name": "Load Test",
+        "phone_number": "8765550000",
+        "meat_type": "goat",
+        "seasoning_package": "basic",
+        "pepper_level": "mild",
+        "pounds": pounds,
+        "city": "Morant Bay",
+    }
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = await asyncio.gather(*(client.post("/order", json=payload) for _ in range(count)))
+    return [r.status_code for r in responses]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=400)
+    parser.add_argument("--stock", type=float, default=1000.0)
+    parser.add_argument("--pounds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session = build_database(os.path.join(tmp, "bench.db"), args.stock)
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[main.get_db] = get_bench_db
+        without_admission()
+        started = time.perf_counter()
+        statuses = asyncio.run(fire_orders(args.orders, args.pounds))
+        elapsed = time.perf_counter() - started
+        main.app.dependency_overrides.clear()
+
+        db = Session()
+        remaining = db.query(func.sum(Inventory.current_stock_lb)).scalar()
+        orders = db.query(func.count(Order.id)).scalar()
+        sold = db.query(func.coalesce(func.sum(OrderItem.pounds_ordered), 0)).scalar()
+        sales = db.query(func.count(StockMovement.id)).filter(StockMovement.kind == "sale").scalar()
+        drift = reconcile(db)
+        db.close()
+        engine.dispose()
+
+    accepted = statuses.count(200)
+    rejected = statuses.count(409)
+    print(f"orders sent:      {args.orders}")
+    print(f"accepted / 409:   {accepted} / {rejected} (other: {args.orders - accepted - rejected})")
+    print(f"throughput:       {args.orders / elapsed:.1f} orders/s over {elapsed:.2f}s")
+    print(f"stock remaining:  {remaining} lb, sold: {sold} lb, order rows: {orders}")
+    print(f"ledger:           {sales} sale movements, {len(drift)} mismatches")
+
+    expected_accepted = min(args.orders, int(args.stock // args.pounds))
+    conserved = (
+        remaining >= 0
+        and abs(remaining + sold - args.stock) < 1e-6
+        and orders == accepted
+        and accepted == expected_accepted
+        and sales == accepted
+        and not drift
+    )
+    print("stock conserved:  " + ("yes" if conserved else "NO"))
+    raise SystemExit(0 if conserved else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
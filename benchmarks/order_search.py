@@ -0,0 +1,98 @@
+"""Time customer searches over orders: the FTS5 index against a LIKE scan of the orders table.
+
+Seeds a freshly migrated SQLite database, then runs each query shape a few times through
+app.search and through GET /admin/orders/search, and once as the substring scan it replaces.
+
+Usage: python -m benchmarks.order_search [--orders 1000000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import func, or_, select
+
+from benchmarks.api_hot_paths import ADMIN, prepare_database
+
+
+def best_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return min(samples) * 1000, statistics.median(samples) * 1000
+
+
+async def endpoint_ms(app, queries, repeat):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post("/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        medians = {}
+        for label, q in queries:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                r = await client.get("/admin/orders/search", params={"q": q}, headers=headers)
+                r.raise_for_status()
+                samples.append(time.perf_counter() - started)
+            medians[label] = statistics.median(samples) * 1000
+        return medians
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        prepare_database(f"sqlite:///{os.path.join(tmp, 'bench.db')}", 0, args.orders, args.seed)
+        print(f"seeded {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        from app import database
+        from app.models import Order
+        from app.search import search_order_ids
+        from main import app
+
+        db = database.SessionLocal()
+        name, phone, pin = db.execute(
+            select(Order.customer_name, Order.phone_number, Order.customer_pin).where(Order.id == args.orders // 2)
+        ).one()
+        first, last = name.split()[0], name.split()[-1]
+        queries = [
+            ("full phone", phone),
+            ("punctuated phone", f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"),
+            ("phone prefix", phone[:6]),
+            ("full name", name),
+            ("name prefixes", f"{first[:3]} {last[:2]}"),
+            ("PIN", pin),
+            ("one letter", first[0]),
+        ]
+
+        print(f"{'query':>18} {'index best':>11} {'index p50':>10} {'endpoint p50':>13} {'LIKE scan':>10}")
+        endpoint = asyncio.run(endpoint_ms(app, queries, args.repeat))
+        for label, q in queries:
+            best, median = best_ms(lambda: search_order_ids(db, q, 21), args.repeat)
+            pattern = f"%{q}%"
+            scan, _ = best_ms(lambda: db.scalars(
+                select(Order.id)
+                .where(or_(func.lower(Order.customer_name).like(pattern.lower()), Order.phone_number.like(pattern),
+                           Order.customer_pin.like(pattern)))
+                .order_by(Order.id.desc())
+                .limit(21)
+            ).all(), 1)
+            print(f"{label:>18} {best:8.2f} ms {median:7.2f} ms {endpoint[label]:10.2f} ms {scan:7.1f} ms")
+        db.close()
+        database.engine.dispose()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,111 @@
+"""Check that /order latency is independent of the notification gateway, and time outbox delivery.
+
+Places orders through main.app while an in-process outbox worker pool sends
+their customer and butcher messages through a StubTransport that waits
+--send-delay seconds per batch and fails --fail-rate of the messages. Reports
+order latency, how long the outbox took to deliver everything, and the
+final status counts.
+
+Usage: python -m benchmarks.outbox [--orders 300] [--concurrency 10] [--workers 4]
+       [--batch-size 50] [--send-delay 1.0] [--fail-rate 0.1] [--backoff 0.2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from app import notifications
+from app.notifications import OutboxWorker, StubTransport, outbox_status
+from benchmarks.order_concurrency import build_database, without_admission
+import main
+
+ORDER = {
+    "customer_name": "Load Test",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "basic",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+
+async def run(args, Session):
+    stub = StubTransport(delay=args.send_delay, fail_rate=args.fail_rate, seed=1)
+    worker = OutboxWorker(transport=stub, workers=args.workers, batch_size=args.batch_size, poll_seconds=0.5,
+                          session_factory=Session)
+    # wake_outbox() after each commit goes to this pool
+    notifications.outbox_worker = worker
+    await worker.start()
+
+    latencies = []
+    gate = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with gate:
+                started = time.perf_counter()
+                r = await client.post("/order", json=ORDER)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.orders)))
+        ordering = time.perf_counter() - started
+
+    while True:
+        with Session() as db:
+            counts = outbox_status(db)
+        if not counts.get("pending") and not counts.get("sending"):
+            break
+        await asyncio.sleep(0.05)
+    delivered = time.perf_counter() - started
+    await worker.stop()
+    return latencies, ordering, delivered, counts, stub
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--send-delay", type=float, default=1.0, help="simulated gateway time per batch")
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--backoff", type=float, default=0.2, help="base retry delay in seconds")
+    args = parser.parse_args()
+
+    notifications.OUTBOX_BACKOFF_SECONDS = args.backoff
+    notifications.BUTCHER_PHONE = notifications.BUTCHER_PHONE or "8765559999"
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, Session = build_database(os.path.join(tmp, "bench.db"), args.orders * ORDER["pounds"])
+
+        def get_bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[main.get_db] = get_bench_db
+        without_admission()
+        latencies, ordering, delivered, counts, stub = asyncio.run(run(args, Session))
+        main.app.dependency_overrides.clear()
+        engine.dispose()
+
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"gateway:          {args.send_delay * 1000:.0f} ms per batch, {args.fail_rate:.0%} of messages fail")
+    print(f"orders:           {args.orders} in {ordering:.2f}s ({args.orders / ordering:.1f}/s)")
+    print(f"order latency:    p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {cuts[94] * 1000:.1f} ms, "
+          f"max {max(latencies) * 1000:.1f} ms")
+    print(f"outbox drained:   {delivered:.2f}s after the first order, {stub.batches} batches")
+    print(f"outbox status:    {', '.join(f'{status} {count}' for status, count in sorted(counts.items()))}")
+    print(f"unique delivered: {len({message['id'] for message in stub.sent})} of {len(stub.sent)} sends")
+
+
+if __name__ == "__main__":
+    main_cli()
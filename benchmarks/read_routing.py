@@ -0,0 +1,98 @@
+"""Time order placement while admin reads run, with GET routes on the primary engine and on the read engine.
+
+Seeds a migrated SQLite database, then runs the same load twice: --writers clients placing orders
+back to back while --readers admins page through /admin/orders and pull the sales report. "shared"
+sends the reads through the primary session and its connection pool, as before read routing;
+"split" uses get_read_db, a read-only connection from its own pool. Also checks that a write sent
+through the read session is refused.
+
+Usage: python -m benchmarks.read_routing [--orders 200000] [--writers 16] [--readers 16] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.api_hot_paths import ADMIN, ORDER, prepare_database
+
+READS = ["/admin/orders?limit=500", "/admin/orders?limit=500&is_paid=false", "/admin/reports/sales?group_by=day,location"]
+
+
+async def run(app, args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        r = await client.post("/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        deadline = time.perf_counter() + args.seconds
+        orders, reads, errors = [], [], []
+
+        async def writer():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                r = await client.post("/order", json=ORDER)
+                (orders if r.status_code == 200 else errors).append(time.perf_counter() - started)
+
+        async def reader(number):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                r = await client.get(READS[(number + len(reads)) % len(READS)], headers=headers)
+                (reads if r.status_code == 200 else errors).append(time.perf_counter() - started)
+
+        await asyncio.gather(*(writer() for _ in range(args.writers)), *(reader(n) for n in range(args.readers)))
+    return orders, reads, errors
+
+
+def summary(samples):
+    samples = sorted(samples)
+    if not samples:
+        return "none"
+    p99 = samples[int(len(samples) * 0.99)]
+    return f"{len(samples):>5}, p50 {statistics.median(samples) * 1000:7.1f} ms, p99 {p99 * 1000:7.1f} ms"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200000, help="order history to seed")
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        prepare_database(f"sqlite:///{os.path.join(tmp, 'bench.db')}", 0, args.orders, args.seed)
+        print(f"seeded {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        from app import database
+        from main import app
+
+        with database.ReadSessionLocal() as db:
+            try:
+                db.execute(text("UPDATE orders SET is_paid = 1 WHERE id = 1"))
+                refused = False
+            except Exception:
+                refused = True
+        print(f"write through the read session refused: {'yes' if refused else 'NO'}")
+
+        for mode in ("shared", "split"):
+            if mode == "shared":
+                app.dependency_overrides[database.get_read_db] = database.get_db
+            orders, reads, errors = asyncio.run(run(app, args))
+            app.dependency_overrides.clear()
+            print(f"\n{mode}: {len(errors)} errors")
+            print(f"  POST /order   {summary(orders)}")
+            print(f"  admin reads   {summary(reads)}")
+        database.read_engine.dispose()
+        database.engine.dispose()
+    raise SystemExit(0 if refused else 1)
+
+
+if __name__ == "__main__":
+    main_cli()
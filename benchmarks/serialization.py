@@ -0,0 +1,116 @@
+"""Compare JSON encoding paths on large admin order lists.
+
+Encodes the same synthetic GET /admin/orders rows three ways: the old
+jsonable_encoder + JSONResponse path, validation against the AdminOrder
+response model followed by pydantic-core's dump_json (what FastAPI does
+for a route with a response model), and FastJSONResponse (orjson). With
+--end-to-end it also times GET /admin/orders?limit=500 and GET /inventory
+through main.app against a seeded temporary database.
+
+Usage: python -m benchmarks.serialization [--sizes 500,5000,50000] [--repeat 5]
+       [--end-to-end] [--orders 20000] [--requests 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.responses import FastJSONResponse
+from app.schemas import AdminOrder
+
+
+def synthetic_orders(count, rng):
+    started = datetime(2026, 1, 1)
+    orders = []
+    for order_id in range(count, 0, -1):
+        items = [
+            {"meat_part": rng.choice(["Standard Goat Meat", "Standard Chicken", "Pork Chops"]),
+             "pounds_ordered": round(rng.uniform(5, 20), 1), "seasoned": True, "seasonings": "curry",
+             "unit_price": 1500.0, "total_price": round(rng.uniform(7000, 30000), 2)}
+            for _ in range(rng.randint(1, 3))
+        ]
+        orders.append({
+            "id": order_id, "customer_name": f"Customer {order_id % 5000}", "phone_number": "8765550000",
+            "location": "St. Thomas", "customer_pin": f"{rng.randint(1000, 9999)}", "is_paid": rng.random() < 0.8,
+            "status": "pending", "date_ordered": started + timedelta(minutes=order_id), "items": items,
+        })
+    return orders
+
+
+def encoders():
+    adapter = TypeAdapter(List[AdminOrder])
+    return {
+        "jsonable_encoder + json": lambda rows: JSONResponse(jsonable_encoder(rows)).body,
+        "response model (pydantic-core)": lambda rows: adapter.dump_json(adapter.validate_python(rows)),
+        "FastJSONResponse (orjson)": lambda rows: FastJSONResponse(rows).body,
+    }
+
+
+def run_micro(sizes, repeat):
+    rng = random.Random(1)
+    for size in sizes:
+        rows = synthetic_orders(size, rng)
+        print(f"\n{size} orders")
+        baseline = None
+        for name, encode in encoders().items():
+            body = encode(rows)
+            seconds = min(timeit.repeat(lambda: encode(rows), number=1, repeat=repeat))
+            baseline = baseline or seconds
+            print(f"  {name:<32}{seconds * 1000:9.1f} ms  {len(body) / 1e6:6.2f} MB  {baseline / seconds:5.1f}x")
+
+
+async def time_endpoint(client, path, headers, total):
+    await client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(total):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+    return (time.perf_counter() - started) / total * 1000, len(response.content)
+
+
+def run_end_to_end(orders, total):
+    from benchmarks.api_hot_paths import ADMIN, prepare_database
+
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_database(f"sqlite:///{os.path.join(directory, 'bench.db')}", 50, orders, 1)
+        import httpx
+        from main import app
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                login = await client.post("/login", data={"username": ADMIN[0], "password": ADMIN[1]})
+                headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+                print()
+                for path in ("/admin/orders?limit=500", "/inventory"):
+                    ms, size = await time_endpoint(client, path, headers, total)
+                    print(f"  GET {path:<28}{ms:9.1f} ms/request  {size / 1e3:8.1f} kB")
+
+        asyncio.run(run())
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="500,5000,50000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--end-to-end", action="store_true")
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    run_micro([int(size) for size in args.sizes.split(",")], args.repeat)
+    if args.end_to_end:
+        run_end_to_end(args.orders, args.requests)
+
+
+if __name__ == "__main__":
+    main_cli()
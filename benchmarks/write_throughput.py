@@ -0,0 +1,91 @@
+"""Local SQLite load test: order writes with and without the WAL profile.
+
+Writer threads place orders through create_order while reader threads list
+inventory, for a fixed duration per profile.
+
+Usage: python -m benchmarks.write_throughput [--writers 8] [--readers 8] [--seconds 5]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.catalog import invalidate_catalog, list_inventory
+from app.database import make_engine
+from app.models import Base, Animal, MeatPart, Inventory
+from app.orders import create_order
+from app.schemas import OrderRequest
+
+ORDER = OrderRequest(
+    customer_name="Load Test",
+    phone_number="8765550000",
+    meat_type="goat",
+    seasoning_package="none",
+    pepper_level="mild",
+    pounds=5,
+    city="Morant Bay",
+)
+
+
+def run_profile(wal, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", wal=wal)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = Session()
+        goat = Animal(name="Goat", total_weight_kg=22.0, purchase_price_jmd=22000)
+        part = MeatPart(animal=goat, part_name="Standard Goat Meat", weight_lb=5.0, price_per_lb_jmd=1500)
+        db.add(Inventory(meat_part=part, current_stock_lb=1e9, is_seasoned=False, location="St. Thomas", is_active=True))
+        db.commit()
+        db.close()
+        invalidate_catalog()
+
+        counts = {"writes": 0, "reads": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def loop(work, key):
+            while time.perf_counter() < deadline:
+                session = Session()
+                try:
+                    work(session)
+                    outcome = key
+                except OperationalError:
+                    session.rollback()
+                    outcome = "locked"
+                finally:
+                    session.close()
+                with lock:
+                    counts[outcome] += 1
+
+        threads = [threading.Thread(target=loop, args=(lambda s: create_order(s, ORDER), "writes")) for _ in range(writers)]
+        threads += [threading.Thread(target=loop, args=(list_inventory, "reads")) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return counts
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for label, wal in (("rollback journal", False), ("WAL profile", True)):
+        counts = run_profile(wal, args.writers, args.readers, args.seconds)
+        print(
+            f"{label:>16}: {counts['writes'] / args.seconds:8.1f} writes/s  "
+            f"{counts['reads'] / args.seconds:8.1f} reads/s  locked errors {counts['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,6 +1,6 @@
-from app.database import Base, engine
-from app.models import Animal, MeatPart, Inventory, Seasoning, Order, OrderItem
+from alembic import command
+from alembic.config import Config
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Create or upgrade all tables through the migrations
+command.upgrade(Config("alembic.ini"), "head")
 print("✅ Tables created successfully.")
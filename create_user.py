@@ -0,0 +1,36 @@
+import argparse
+import getpass
+
+from sqlalchemy import select
+
+from app.auth import hash_password
+from app.database import SessionLocal
+from app.models import User
+
+parser = argparse.ArgumentParser(description="Create a dashboard user, or reset the password of an existing one.")
+parser.add_argument("username")
+parser.add_argument("--password", help="prompted for when omitted")
+parser.add_argument("--admin", action=argparse.BooleanOptionalAction, default=None,
+                    help="grant (or with --no-admin revoke) access to the /admin endpoints; unchanged when omitted")
+parser.add_argument("--deactivate", action="store_true", help="block further logins for this user")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    user = db.scalar(select(User).where(User.username == args.username))
+    if user is None:
+        if args.deactivate:
+            raise SystemExit(f"No such user: {args.username}")
+        user = User(username=args.username, is_admin=bool(args.admin))
+        db.add(user)
+    if args.deactivate:
+        user.is_active = False
+    else:
+        user.password_hash = hash_password(args.password or getpass.getpass(f"Password for {args.username}: "))
+        user.is_active = True
+    if args.admin is not None:
+        user.is_admin = args.admin
+    db.commit()
+    print(f"User {user.username}: admin={user.is_admin} active={user.is_active}")
+finally:
+    db.close()
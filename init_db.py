@@ -1,6 +1,6 @@
-from app.database import engine
-from app.models import Base
+from alembic import command
+from alembic.config import Config
 
-print("Creating all tables...")
-Base.metadata.create_all(bind=engine)
-print("Tables created successfully.")
+print("Applying database migrations...")
+command.upgrade(Config("alembic.ini"), "head")
+print("Database is up to date.")
@@ -1,21 +1,46 @@
-from fastapi import FastAPI, Depends, HTTPException, Body
+from fastapi import FastAPI, Depends, HTTPException, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session, joinedload
-from pydantic import BaseModel, Field
-from enum import Enum
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
+from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
-import urllib.parse
-import random
-
-from app.database import SessionLocal
-from app.models import Order, OrderItem, MeatPart, Inventory, Animal
-
-app = FastAPI(debug=True)
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from app.admission import ADMISSION_ENABLED, AdmissionMiddleware
+from app.auth import authenticate_user, create_access_token, get_current_admin_user
+from app.bulk_orders import import_orders, parse_order_lines
+from app.database import ASYNC_DB, async_engine, async_read_engine, engine, get_db, get_read_db, read_engine
+from app.events import publish_order_paid
+from app.exports import stream_orders
+from app.metrics import METRICS_ENABLED, MetricsMiddleware, instrument
+from app.models import Order, OrderItem
+from app.notifications import OUTBOX_WORKERS, outbox_worker
+from app.orders import set_payment_status
+from app.responses import FastJSONResponse
+from app.routers import animals as animals_router, catalog as catalog_router, inventory as inventory_router, orders as orders_router
+from app.routers import events as events_router, metrics as metrics_router, reports as reports_router
+from app.schemas import AdminOrder, BulkImportResult, Message, PaymentUpdated, Token
+from app.search import SEARCH_MAX_CANDIDATES, search_order_ids, search_truncated
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Order confirmations are sent from the outbox by background workers, never inside the request
+    if OUTBOX_WORKERS:
+        await outbox_worker.start()
+    yield
+    if OUTBOX_WORKERS:
+        await outbox_worker.stop()
+
+app = FastAPI(debug=True, lifespan=lifespan)
+
+# Per-client rate limits and a bounded write queue with load shedding. Added before CORS so
+# 429/503 responses still carry the CORS headers the browser needs to read them.
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,245 +48,168 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Truncated", "Idempotent-Replayed"],
 )
 
-@app.get("/")
+# Per-route latency, SQL statement counts and DB time, scraped from /metrics
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument(engine, async_engine, read_engine, async_read_engine)
+    app.include_router(metrics_router.router)
+
+@app.get("/", response_model=Message)
 def root():
     return {"message": "Welcome to the MeatKonnex API"}
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Order and catalog endpoints run on the async engine when ASYNC_DB is set
+app.include_router(orders_router.async_router if ASYNC_DB else orders_router.router)
+app.include_router(catalog_router.async_router if ASYNC_DB else catalog_router.router)
 
-SECRET_KEY = "your-secret-key"
-ALGORITHM = "HS256"
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# Catalog writes; GET /animals is served from the cached catalog above
+app.include_router(animals_router.router)
+app.include_router(inventory_router.router)
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+# Server-sent inventory and order updates, so screens stop polling /inventory and /admin/orders
+app.include_router(events_router.router)
 
-def verify_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
-    except JWTError:
-        return None
+# Sales reports, served from the daily rollups
+app.include_router(reports_router.router)
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    user = verify_token(token)
+# Sync on purpose: FastAPI runs it in the threadpool, keeping the scrypt check off the event loop
+@app.post("/login", response_model=Token)
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return user
-
-def get_current_admin_user(token: str = Depends(oauth2_scheme)):
-    user = verify_token(token)
-    if user != "admin":
-        raise HTTPException(status_code=403, detail="Admin privileges required")
-    return {"username": user}
-
-@app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    if form_data.username != "admin" or form_data.password != "meat123":
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token(data={"sub": form_data.username})
+    token = create_access_token(data={"sub": user.username, "admin": user.is_admin})
     return {"access_token": token, "token_type": "bearer"}
 
-class MeatType(str, Enum):
-    goat = "goat"
-    pork = "pork"
-    beef = "beef"
-    chicken = "chicken"
-
-class SeasoningType(str, Enum):
-    none = "none"
-    basic = "basic"
-    curry = "curry"
-    brown_stew = "brown_stew"
-
-class SpiceLevel(str, Enum):
-    none = "none"
-    mild = "mild"
-    medium = "medium"
-    hot = "hot"
-
-class OrderRequest(BaseModel):
-    customer_name: str = Field(..., min_length=1)
-    phone_number: str = Field(..., min_length=10, max_length=10, pattern="^[0-9]{10}$")
-    meat_type: MeatType
-    seasoning_package: SeasoningType
-    pepper_level: SpiceLevel
-    remove_items: Optional[List[str]] = []
-    pounds: float = Field(..., gt=0)
-    city: str = Field(..., min_length=1)
-
-@app.post("/order")
-def place_order(order: OrderRequest, db: Session = Depends(get_db)):
-    if order.pounds < 5:
-        raise HTTPException(status_code=400, detail="Minimum order for St. Thomas is 5 lbs.")
-
-    prices = {"goat": 1400, "pork": 500, "beef": 500, "chicken": 400}
-    seasoning_fees = {"none": 0, "basic": 200, "curry": 250, "brown_stew": 250}
-
-    price_per_pound = prices[order.meat_type.value]
-    seasoning_fee = seasoning_fees[order.seasoning_package.value]
-    delivery_fee = 300
-    base = price_per_pound * order.pounds
-    total = base + seasoning_fee + delivery_fee
-    customer_pin = str(random.randint(1000, 9999))
-
-    inventory = (
-        db.query(Inventory)
-        .join(MeatPart)
-        .filter(MeatPart.animal_id == MeatType[order.meat_type].value)
-        .first()
-    )
-
-    if inventory:
-        if inventory.current_stock_lb >= order.pounds:
-            inventory.current_stock_lb -= order.pounds
-        else:
-            inventory.current_stock_lb = max(0, inventory.current_stock_lb - order.pounds)
-        db.commit()
-
-    new_order = Order(
-        customer_name=order.customer_name,
-        phone_number=order.phone_number,
-        location="St. Thomas",
-        customer_pin=customer_pin,
-        is_paid=False
-    )
-    db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
-
-    new_item = OrderItem(
-        order_id=new_order.id,
-        pounds_ordered=order.pounds,
-        seasoned=order.seasoning_package != "none",
-        seasonings=order.seasoning_package.value,
-        unit_price=price_per_pound,
-        total_price=base + seasoning_fee
-    )
-    db.add(new_item)
-    db.commit()
-
-    removed = f" (removed: {', '.join(order.remove_items)})" if order.remove_items else ""
-    msg = f"""Thank you, {order.customer_name}!
-Your order for {order.pounds} lbs of {order.meat_type.value} 
-with {order.seasoning_package.value.replace('_', ' ')} seasoning{removed} 
-and pepper: {order.pepper_level.value} to {order.city}, St. Thomas was received.
-🗾 Total: JMD {int(total)}
-🔒 PIN: {customer_pin}
-📞 We’ll call you shortly at {order.phone_number} to confirm."""
-
-    link = f"https://wa.me/{order.phone_number}?text={urllib.parse.quote(msg)}"
-
-    return {
-        "message": "Order placed successfully!",
-        "order_summary": {
-            "customer_name": order.customer_name,
-            "phone_number": order.phone_number,
-            "meat_type": order.meat_type.value,
-            "seasoning_package": order.seasoning_package.value,
-            "pepper_level": order.pepper_level.value,
-            "removed_items": order.remove_items,
-            "pounds": order.pounds,
-            "city": order.city,
-            "location": "St. Thomas",
-            "price_per_pound": price_per_pound,
-            "base_cost": base,
-            "seasoning_cost": seasoning_fee,
-            "delivery_fee": delivery_fee,
-            "total_cost_jmd": int(total),
-            "confirmation_pin": customer_pin
-        },
-        "whatsapp_link": link
-    }
-
 class PaymentStatusUpdate(BaseModel):
     is_paid: bool
 
-@app.put("/admin/orders/{order_id}/payment-status", dependencies=[Depends(get_current_user)])
+@app.put("/admin/orders/{order_id}/payment-status", response_model=Message, dependencies=[Depends(get_current_admin_user)])
 def update_payment_status(order_id: int, payment_update: PaymentStatusUpdate, db: Session = Depends(get_db)):
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
+    if not set_payment_status(db, order_id, payment_update.is_paid):
         raise HTTPException(status_code=404, detail="Order not found")
-    order.is_paid = payment_update.is_paid
-    db.commit()
-    db.refresh(order)
-    return {"message": f"Order {order.id} payment status updated to {'paid' if order.is_paid else 'unpaid'}"}
+    publish_order_paid(order_id, payment_update.is_paid)
+    return {"message": f"Order {order_id} payment status updated to {'paid' if payment_update.is_paid else 'unpaid'}"}
+
+def encode_order_cursor(order: Order) -> str:
+    return f"{order.date_ordered.isoformat()},{order.id}"
 
-@app.get("/admin/orders", dependencies=[Depends(get_current_user)])
-def get_all_orders(db: Session = Depends(get_db)):
-    orders = db.query(Order).options(joinedload(Order.items)).all()
-    order_list = []
-    for order in orders:
-        items = []
-        for item in order.items:
-            items.append({
-                "meat_part": db.query(MeatPart).filter(MeatPart.id == item.meat_part_id).first().name if item.meat_part_id else "N/A",
+def decode_order_cursor(cursor: str):
+    try:
+        date_part, id_part = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def admin_order_row(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "customer_name": order.customer_name,
+        "phone_number": order.phone_number,
+        "location": order.location,
+        "customer_pin": order.customer_pin,
+        "is_paid": order.is_paid,
+        "status": order.status,
+        "date_ordered": order.date_ordered,
+        "items": [
+            {
+                "meat_part": item.meat_part.part_name if item.meat_part else "N/A",
                 "pounds_ordered": item.pounds_ordered,
                 "seasoned": item.seasoned,
                 "seasonings": item.seasonings,
                 "unit_price": item.unit_price,
                 "total_price": item.total_price,
-            })
-        order_list.append({
-            "id": order.id,
-            "customer_name": order.customer_name,
-            "phone_number": order.phone_number,
-            "location": order.location,
-            "customer_pin": order.customer_pin,
-            "is_paid": order.is_paid,
-            "created_at": order.created_at,
-            "items": items
-        })
-    return JSONResponse(content=jsonable_encoder(order_list))
-
-@app.post("/orders/{order_id}/paid")
-def mark_order_paid(order_id: int, paid: bool = Body(...), db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    order.is_paid = paid
-    db.commit()
-    db.refresh(order)
-    return {"message": "Payment status updated", "paid": order.is_paid}
-
-@app.get("/animals")
-def get_animals(db: Session = Depends(get_db)):
-    return db.query(Animal).all()
+            }
+            for item in order.items
+        ],
+    }
 
-@app.get("/meat_parts")
-def get_all_meat_parts(db: Session = Depends(get_db)):
-    return db.query(MeatPart).all()
+@app.get("/admin/orders", response_model=List[AdminOrder], dependencies=[Depends(get_current_admin_user)])
+def get_all_orders(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    is_paid: Optional[bool] = None,
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+):
+    # Newest first, paged by (date_ordered, id) so each page is an index range scan
+    query = (
+        db.query(Order)
+        .options(selectinload(Order.items).joinedload(OrderItem.meat_part))
+        .order_by(Order.date_ordered.desc(), Order.id.desc())
+    )
+    if is_paid is not None:
+        query = query.filter(Order.is_paid == is_paid)
+    if status:
+        query = query.filter(Order.status == status)
+    if location:
+        query = query.filter(Order.location == location)
+    if date_from:
+        query = query.filter(Order.date_ordered >= date_from)
+    if date_to:
+        query = query.filter(Order.date_ordered < date_to)
+    if cursor:
+        query = query.filter(tuple_(Order.date_ordered, Order.id) < decode_order_cursor(cursor))
+
+    orders = query.limit(limit + 1).all()
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+
+    headers = {"X-Next-Cursor": encode_order_cursor(orders[-1])} if has_more else {}
+    # Rows are built here in the AdminOrder shape, so they go straight to orjson
+    return FastJSONResponse([admin_order_row(order) for order in orders], headers=headers)
+
+@app.get("/admin/orders/search", response_model=List[AdminOrder], dependencies=[Depends(get_current_admin_user)])
+def search_orders(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = Query(None, ge=0, lt=SEARCH_MAX_CANDIDATES),
+    db: Session = Depends(get_read_db),
+):
+    # Customer lookup by name, phone or PIN prefix, best match first. The cursor is an offset here,
+    # since rank order has no key to page on. Paging ends at SEARCH_MAX_CANDIDATES results; the last
+    # page says X-Search-Truncated: true when more orders matched, so the query should be narrowed.
+    offset = cursor or 0
+    ids = search_order_ids(db, q, limit + 1, offset)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+    orders = {
+        order.id: order
+        for order in db.query(Order).options(selectinload(Order.items).joinedload(OrderItem.meat_part)).filter(Order.id.in_(ids))
+    }
+    headers = {"X-Next-Cursor": str(offset + limit)} if has_more else {}
+    if not has_more and search_truncated(db, q, offset + len(ids)):
+        headers["X-Search-Truncated"] = "true"
+    return FastJSONResponse([admin_order_row(orders[order_id]) for order_id in ids if order_id in orders], headers=headers)
+
+@app.get("/admin/orders/export", dependencies=[Depends(get_current_admin_user)])
+def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_orders(format, date_from, date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=orders.{format}"},
+    )
 
-@app.get("/meat_parts/{animal_id}")
-def get_meat_parts(animal_id: int, db: Session = Depends(get_db)):
-    return db.query(MeatPart).filter(MeatPart.animal_id == animal_id).all()
+@app.post("/admin/orders/bulk", response_model=BulkImportResult, response_model_exclude_unset=True, dependencies=[Depends(get_current_admin_user)])
+async def bulk_import_orders(request: Request, db: Session = Depends(get_db)):
+    # Body is CSV (Content-Type: text/csv) or JSON lines, one order per line
+    rows = parse_order_lines(await request.body(), request.headers.get("content-type", ""))
+    return await run_in_threadpool(import_orders, db, rows)
 
-@app.get("/inventory")
-def get_inventory(db: Session = Depends(get_db)):
-    results = (
-        db.query(Inventory, MeatPart, Animal)
-        .join(MeatPart, Inventory.meat_part_id == MeatPart.id)
-        .join(Animal, MeatPart.animal_id == Animal.id)
-        .all()
-    )
-    inventory_data = []
-    for inv, part, animal in results:
-        inventory_data.append({
-            "inventory_id": inv.id,
-            "meat_part": part.part_name,
-            "animal": animal.name,
-            "stock_lb": inv.current_stock_lb,
-            "seasoned": inv.is_seasoned,
-            "location": inv.location,
-        })
-    return inventory_data
+@app.post("/orders/{order_id}/paid", response_model=PaymentUpdated)
+def mark_order_paid(order_id: int, paid: bool = Body(...), db: Session = Depends(get_db), current_user: dict = Depends(get_current_admin_user)):
+    if not set_payment_status(db, order_id, paid):
+        raise HTTPException(status_code=404, detail="Order not found")
+    publish_order_paid(order_id, paid)
+    return {"message": "Payment status updated", "paid": paid}
@@ -0,0 +1,49 @@
+import argparse
+import json
+import time
+from datetime import date
+
+from app.analytics import PERIODS, margins
+from app.database import SessionLocal
+
+parser = argparse.ArgumentParser(description="Carcass yield, cost per pound and realized margin per animal, part and period.")
+parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None, help="first order day (YYYY-MM-DD)")
+parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None, help="last order day (YYYY-MM-DD)")
+parser.add_argument("--period", choices=PERIODS, default="month")
+parser.add_argument("--top", type=int, default=10, help="animals and parts to list, by margin")
+parser.add_argument("--json", action="store_true", help="print the full report as JSON instead of tables")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    started = time.perf_counter()
+    report = margins(db, args.date_from, args.date_to, args.period)
+    elapsed = time.perf_counter() - started
+finally:
+    db.close()
+
+if args.json:
+    print(json.dumps(report, default=str, indent=2))
+else:
+    def pct(value):
+        return "-" if value is None else f"{value:.1f}%"
+
+    print(f"{'Period':<12}{'Items':>10}{'Sold lb':>14}{'Revenue':>18}{'Margin':>18}{'Margin %':>10}")
+    for row in report["periods"]:
+        print(f"{row['period_start']:<12}{row['items']:>10}{row['sold_lb']:>14,.1f}{row['revenue_jmd']:>18,.0f}"
+              f"{row['margin_jmd']:>18,.0f}{pct(row['margin_pct']):>10}")
+    print()
+    print(f"{'Animal':<24}{'Yield':>8}{'Cost/lb':>10}{'Sold lb':>14}{'Revenue':>18}{'Margin':>18}{'Margin %':>10}")
+    for row in sorted(report["animals"], key=lambda row: row["margin_jmd"], reverse=True)[:args.top]:
+        cost = "-" if row["cost_per_lb_jmd"] is None else f"{row['cost_per_lb_jmd']:,.0f}"
+        print(f"{row['name'][:23]:<24}{pct(row['yield_pct']):>8}{cost:>10}{row['sold_lb']:>14,.1f}"
+              f"{row['revenue_jmd']:>18,.0f}{row['margin_jmd']:>18,.0f}{pct(row['margin_pct']):>10}")
+    print()
+    print(f"{'Part':<32}{'List/lb':>10}{'Cost/lb':>10}{'Sold lb':>14}{'Margin':>18}{'Margin %':>10}")
+    for row in sorted(report["parts"], key=lambda row: row["margin_jmd"], reverse=True)[:args.top]:
+        cost = "-" if row["cost_per_lb_jmd"] is None else f"{row['cost_per_lb_jmd']:,.0f}"
+        print(f"{row['part_name'][:31]:<32}{row['list_price_per_lb_jmd']:>10,.0f}{cost:>10}{row['sold_lb']:>14,.1f}"
+              f"{row['margin_jmd']:>18,.0f}{pct(row['margin_pct']):>10}")
+    totals = report["totals"]
+    print(f"\n{totals['items']:,} items, {totals['sold_lb']:,.1f} lb, revenue JMD {totals['revenue_jmd']:,.0f}, "
+          f"margin JMD {totals['margin_jmd']:,.0f} ({pct(totals['margin_pct'])}) in {elapsed:.2f}s.")
@@ -0,0 +1,56 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import SQLALCHEMY_DATABASE_URL, is_sqlite, make_engine
+from app.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# An explicit -x url=... or sqlalchemy.url wins over DATABASE_URL
+url = context.get_x_argument(as_dictionary=True).get("url") or config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The FTS5 search index (0009) and its shadow tables, and the Postgres trigram indexes (0011),
+    # are created by hand, not from the models
+    if type_ == "index" and name and name.endswith("_trgm"):
+        return False
+    return not (type_ == "table" and name.startswith("orders_fts"))
+
+
+def run_migrations_offline():
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=is_sqlite(url),
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = make_engine(url)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=is_sqlite(url),
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
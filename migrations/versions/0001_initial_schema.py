@@ -0,0 +1,101 @@
+"""initial schema
+
+Tables as originally created by Base.metadata.create_all. Databases created
+that way can be adopted with `alembic stamp 0001` before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "animal",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("total_weight_kg", sa.Float(), nullable=False),
+        sa.Column("purchase_price_jmd", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_animal_id", "animal", ["id"])
+
+    op.create_table(
+        "meat_parts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("animal_id", sa.Integer(), sa.ForeignKey("animal.id"), nullable=False),
+        sa.Column("part_name", sa.String(), nullable=False),
+        sa.Column("weight_lb", sa.Float(), nullable=False),
+        sa.Column("price_per_lb_jmd", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_meat_parts_id", "meat_parts", ["id"])
+
+    op.create_table(
+        "seasoning_packages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("ingredients", sa.String(), nullable=False),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_seasoning_packages_id", "seasoning_packages", ["id"])
+
+    op.create_table(
+        "inventory",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("meat_part_id", sa.Integer(), sa.ForeignKey("meat_parts.id"), nullable=False),
+        sa.Column("current_stock_lb", sa.Float(), nullable=False),
+        sa.Column("is_seasoned", sa.Boolean()),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("seasoning_package_id", sa.Integer(), sa.ForeignKey("seasoning_packages.id"), nullable=True),
+    )
+    op.create_index("ix_inventory_id", "inventory", ["id"])
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("customer_name", sa.String(), nullable=False),
+        sa.Column("phone_number", sa.String(), nullable=False),
+        sa.Column("customer_pin", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("payment_status", sa.String()),
+        sa.Column("date_ordered", sa.DateTime()),
+        sa.Column("is_paid", sa.Boolean()),
+    )
+    op.create_index("ix_orders_id", "orders", ["id"])
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("meat_part_id", sa.Integer(), sa.ForeignKey("meat_parts.id")),
+        sa.Column("pounds_ordered", sa.Float(), nullable=False),
+        sa.Column("seasoned", sa.Boolean()),
+        sa.Column("seasonings", sa.String()),
+        sa.Column("unit_price", sa.Float(), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_order_items_id", "order_items", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("order_items")
+    op.drop_table("orders")
+    op.drop_table("inventory")
+    op.drop_table("seasoning_packages")
+    op.drop_table("meat_parts")
+    op.drop_table("animal")
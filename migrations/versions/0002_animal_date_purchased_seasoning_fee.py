@@ -0,0 +1,34 @@
+"""animal date_purchased and seasoning fee
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("animal") as batch_op:
+        batch_op.add_column(sa.Column("date_purchased", sa.DateTime(), nullable=True))
+    with op.batch_alter_table("seasoning_packages") as batch_op:
+        batch_op.add_column(sa.Column("fee_jmd", sa.Float(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("seasoning_packages") as batch_op:
+        batch_op.drop_column("fee_jmd")
+    with op.batch_alter_table("animal") as batch_op:
+        batch_op.drop_column("date_purchased")
@@ -0,0 +1,38 @@
+"""indexes for catalog, stock reservation and admin order queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_meat_parts_animal_id", "meat_parts", ["animal_id"])
+    op.create_index("ix_inventory_meat_part_active_location", "inventory", ["meat_part_id", "is_active", "location"])
+    op.create_index("ix_orders_date_ordered_id", "orders", ["date_ordered", "id"])
+    op.create_index("ix_orders_is_paid_date_ordered_id", "orders", ["is_paid", "date_ordered", "id"])
+    op.create_index("ix_orders_status_date_ordered_id", "orders", ["status", "date_ordered", "id"])
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_order_items_order_id", table_name="order_items")
+    op.drop_index("ix_orders_status_date_ordered_id", table_name="orders")
+    op.drop_index("ix_orders_is_paid_date_ordered_id", table_name="orders")
+    op.drop_index("ix_orders_date_ordered_id", table_name="orders")
+    op.drop_index("ix_inventory_meat_part_active_location", table_name="inventory")
+    op.drop_index("ix_meat_parts_animal_id", table_name="meat_parts")
@@ -0,0 +1,64 @@
+"""stock movement ledger and snapshots
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:30:00
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("delta_lb", sa.Float(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=True),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["inventory_id"], ["inventory.id"]),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_movements_inventory_created_at", "stock_movements", ["inventory_id", "created_at"])
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("as_of", sa.DateTime(), nullable=False),
+        sa.Column("stock_lb", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["inventory_id"], ["inventory.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_snapshots_inventory_as_of", "stock_snapshots", ["inventory_id", "as_of"])
+
+    # Existing stock becomes an opening balance so the ledger agrees with inventory from the start
+    op.execute(
+        sa.text(
+            "INSERT INTO stock_movements (inventory_id, kind, delta_lb, note, created_at) "
+            "SELECT id, 'adjustment', current_stock_lb, 'opening balance', :now FROM inventory "
+            "WHERE current_stock_lb <> 0"
+        ).bindparams(sa.bindparam("now", datetime.utcnow(), type_=sa.DateTime()))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_stock_snapshots_inventory_as_of", table_name="stock_snapshots")
+    op.drop_table("stock_snapshots")
+    op.drop_index("ix_stock_movements_inventory_created_at", table_name="stock_movements")
+    op.drop_table("stock_movements")
@@ -0,0 +1,46 @@
+"""daily sales rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:10:00
+
+The table starts empty; run rebuild_sales.py once after upgrading to fill it from existing orders.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sales_daily",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("location", sa.String(), nullable=False),
+        sa.Column("meat_type", sa.String(), nullable=False),
+        sa.Column("seasoning", sa.String(), nullable=False),
+        sa.Column("is_paid", sa.Boolean(), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("pounds", sa.Float(), nullable=False),
+        sa.Column("revenue_jmd", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ux_sales_daily_key", "sales_daily", ["day", "location", "meat_type", "seasoning", "is_paid"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_sales_daily_key", table_name="sales_daily")
+    op.drop_table("sales_daily")
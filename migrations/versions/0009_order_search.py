@@ -0,0 +1,75 @@
+"""full-text search index over order customers
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 21:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# FTS5 over the customer columns of orders. External content, so the index stores only tokens and
+# reads the text back from orders; the triggers keep it in step with every insert, update and delete.
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE orders_fts USING fts5(
+        customer_name, phone_number, customer_pin,
+        content='orders', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER orders_fts_insert AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_fts(rowid, customer_name, phone_number, customer_pin)
+        VALUES (new.id, new.customer_name, new.phone_number, new.customer_pin);
+    END""",
+    """CREATE TRIGGER orders_fts_delete AFTER DELETE ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, customer_name, phone_number, customer_pin)
+        VALUES ('delete', old.id, old.customer_name, old.phone_number, old.customer_pin);
+    END""",
+    """CREATE TRIGGER orders_fts_update AFTER UPDATE OF customer_name, phone_number, customer_pin ON orders BEGIN
+        INSERT INTO orders_fts(orders_fts, rowid, customer_name, phone_number, customer_pin)
+        VALUES ('delete', old.id, old.customer_name, old.phone_number, old.customer_pin);
+        INSERT INTO orders_fts(rowid, customer_name, phone_number, customer_pin)
+        VALUES (new.id, new.customer_name, new.phone_number, new.customer_pin);
+    END""",
+    # Index the orders already there
+    "INSERT INTO orders_fts(orders_fts) VALUES ('rebuild')",
+]
+
+
+def has_fts5(bind) -> bool:
+    # FTS5 is a compile-time option of SQLite; builds without it have no fts5 module
+    try:
+        bind.exec_driver_sql("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+    except sa.exc.OperationalError:
+        return False
+    bind.exec_driver_sql("DROP TABLE temp.fts5_probe")
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Without FTS5 (Postgres, or a SQLite built without it) app.search falls back to prefix LIKE
+    # matching, which 0011 indexes on Postgres
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite" or not has_fts5(bind):
+        return
+    for statement in SQLITE_UPGRADE:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS orders_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS orders_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS orders_fts_insert")
+    op.execute("DROP TABLE IF EXISTS orders_fts")
@@ -0,0 +1,28 @@
+"""index for the admin order list filtered by location
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 23:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_orders_location_date_ordered_id", "orders", ["location", "date_ordered", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_orders_location_date_ordered_id", table_name="orders")
@@ -0,0 +1,45 @@
+"""trigram indexes for order search on Postgres
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Postgres has no FTS5, so app.search matches with LIKE 'term%' and '% term%'. GIN trigram indexes
+# serve both patterns; the name index is on lower(customer_name), the expression the search uses.
+POSTGRES_INDEXES = {
+    "ix_orders_customer_name_trgm": "lower(customer_name) gin_trgm_ops",
+    "ix_orders_phone_number_trgm": "phone_number gin_trgm_ops",
+    "ix_orders_customer_pin_trgm": "customer_pin gin_trgm_ops",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite searches through the FTS5 index from 0009
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in POSTGRES_INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON orders USING gin ({column})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name in POSTGRES_INDEXES:
+        op.execute(f"DROP INDEX {name}")
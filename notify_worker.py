@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+import logging
+
+from app.database import SessionLocal
+from app.notifications import OUTBOX_BATCH_SIZE, OUTBOX_WORKERS, OutboxWorker, outbox_status
+
+parser = argparse.ArgumentParser(description="Send queued order notifications from the outbox. Run the API with OUTBOX_WORKERS=0 when using this.")
+parser.add_argument("--workers", type=int, default=OUTBOX_WORKERS or 2, help="concurrent send loops")
+parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+parser.add_argument("--once", action="store_true", help="send everything that is due, then exit")
+parser.add_argument("--status", action="store_true", help="print message counts by status and exit")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+async def run(worker: OutboxWorker):
+    try:
+        if args.once:
+            print(f"Processed {await worker.drain()} messages.")
+        else:
+            await worker.start()
+            await asyncio.gather(*worker.tasks)
+    finally:
+        await worker.stop()
+
+if not args.status:
+    try:
+        asyncio.run(run(OutboxWorker(workers=args.workers, batch_size=args.batch_size)))
+    except KeyboardInterrupt:
+        pass
+
+db = SessionLocal()
+try:
+    counts = outbox_status(db)
+finally:
+    db.close()
+print("Outbox:", ", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "empty")
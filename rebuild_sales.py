@@ -0,0 +1,19 @@
+import argparse
+import time
+from datetime import date
+
+from app.database import SessionLocal
+from app.reports import rebuild_sales
+
+parser = argparse.ArgumentParser(description="Recompute the daily sales rollups from the orders and order_items tables.")
+parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None, help="first day to rebuild (YYYY-MM-DD)")
+parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None, help="last day to rebuild (YYYY-MM-DD)")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    started = time.perf_counter()
+    rows = rebuild_sales(db, args.date_from, args.date_to)
+    print(f"Rebuilt {rows} sales rollup rows in {time.perf_counter() - started:.1f}s.")
+finally:
+    db.close()
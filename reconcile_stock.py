@@ -0,0 +1,28 @@
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.stock import reconcile, write_snapshots
+
+parser = argparse.ArgumentParser(description="Check inventory stock and stock snapshots against the movement ledger.")
+parser.add_argument("--fix", action="store_true", help="reset drifted inventory rows to the ledger and drop bad snapshots")
+parser.add_argument("--snapshot", action="store_true", help="write a new stock snapshot for every row (run periodically)")
+args = parser.parse_args()
+
+db = SessionLocal()
+try:
+    problems = reconcile(db, fix=args.fix)
+    for problem in problems:
+        where = f" snapshot at {problem['as_of']}" if problem["check"] == "snapshot" else ""
+        print(f"Inventory {problem['inventory_id']}{where}: stored {problem['stored_lb']:.3f} lb, "
+              f"ledger {problem['ledger_lb']:.3f} lb")
+    if problems:
+        print(f"{len(problems)} mismatches {'fixed' if args.fix else 'found'}.")
+    else:
+        print("Inventory and snapshots match the ledger.")
+    if args.snapshot:
+        print(f"Wrote snapshots for {write_snapshots(db)} inventory rows.")
+finally:
+    db.close()
+
+sys.exit(1 if problems and not args.fix else 0)
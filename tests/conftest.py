@@ -0,0 +1,78 @@
+import asyncio
+import os
+import tempfile
+
+# app.database builds its engines from the environment at import; point them away from meatapp.db.
+# Each test gets its own database through the dependency overrides below.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'unused.db')}"
+os.environ["ADMISSION_ENABLED"] = "false"
+os.environ["OUTBOX_WORKERS"] = "0"
+# One confirmation per order, whatever .env says
+os.environ["BUTCHER_PHONE"] = ""
+os.environ["SECRET_KEY"] = "test-secret"
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.catalog import invalidate_catalog
+from app.database import get_db, get_read_db, make_engine
+from app.idempotency import order_idempotency
+from app.models import Animal, Base, Inventory, MeatPart, SeasoningPackage, StockMovement
+import main
+
+STOCK_LB = 100.0
+
+ORDER = {
+    "customer_name": "Test Customer",
+    "phone_number": "8765550000",
+    "meat_type": "goat",
+    "seasoning_package": "basic",
+    "pepper_level": "mild",
+    "pounds": 5,
+    "city": "Morant Bay",
+}
+
+
+@pytest.fixture
+def database(tmp_path):
+    # A fresh SQLite file with one goat cut stocked at St. Thomas; yields its session factory
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        goat = Animal(name="Goat", total_weight_kg=22.0, purchase_price_jmd=22000)
+        part = MeatPart(animal=goat, part_name="Standard Goat Meat", weight_lb=5.0, price_per_lb_jmd=1500)
+        item = Inventory(meat_part=part, current_stock_lb=STOCK_LB, is_seasoned=False, location="St. Thomas",
+                         is_active=True)
+        db.add(StockMovement(inventory=item, kind="receipt", delta_lb=STOCK_LB))
+        db.add(SeasoningPackage(name="Basic", ingredients="Salt, Pepper, Garlic, Thyme", fee_jmd=200))
+        db.commit()
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = get_test_db
+    main.app.dependency_overrides[get_read_db] = get_test_db
+    invalidate_catalog()
+    order_idempotency.cache.clear()
+    yield Session
+    main.app.dependency_overrides.clear()
+    invalidate_catalog()
+    engine.dispose()
+
+
+@pytest.fixture
+def call_api(database):
+    # call_api(fn) runs the coroutine function fn(client) against the app and returns its result
+    def call(fn):
+        async def run():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await fn(client)
+        return asyncio.run(run())
+    return call
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app import admission
+from app.admission import AdmissionGate, AdmissionMiddleware, RateLimiter, parse_rate_limits
+from app.auth import create_access_token
+
+
+def run_against(limiter, gate, fn):
+    # fn(client, release, entered): POST /write waits on `release` and logs its caller in `entered`
+    async def run():
+        release = asyncio.Event()
+        entered = []
+        app = FastAPI()
+
+        @app.post("/write")
+        async def write(who: str = "anyone"):
+            entered.append(who)
+            await release.wait()
+            return {"ok": True}
+
+        @app.get("/read")
+        async def read():
+            return {"ok": True}
+
+        transport = httpx.ASGITransport(app=AdmissionMiddleware(app, limiter, gate))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await fn(client, release, entered)
+    return asyncio.run(run())
+
+
+def test_rate_limit_answers_429_with_retry_after():
+    limiter = RateLimiter(parse_rate_limits("POST /write=3/60"))
+
+    async def burst(client, release, entered):
+        release.set()
+        writes = [await client.post("/write") for _ in range(5)]
+        reads = [await client.get("/read") for _ in range(5)]
+        return writes, reads
+
+    writes, reads = run_against(limiter, AdmissionGate(limit=0), burst)
+    assert [r.status_code for r in writes] == [200, 200, 200, 429, 429]
+    assert int(writes[-1].headers["Retry-After"]) >= 1
+    assert [r.status_code for r in reads] == [200] * 5
+    assert limiter.counts[("POST", "/write")] == [3, 2]
+
+
+def test_forwarded_for_cannot_be_spoofed_past_the_limit(monkeypatch):
+    monkeypatch.setattr(admission, "TRUST_FORWARDED_FOR", True)
+    monkeypatch.setattr(admission, "TRUSTED_PROXY_HOPS", 1)
+    limiter = RateLimiter(parse_rate_limits("POST /write=3/60"))
+
+    async def spoofed(client, release, entered):
+        release.set()
+        # The client makes up the first address each time; the proxy appends the one it saw
+        return [
+            await client.post("/write", headers={"X-Forwarded-For": f"10.9.9.{number}, 203.0.113.7"})
+            for number in range(5)
+        ]
+
+    responses = run_against(limiter, AdmissionGate(limit=0), spoofed)
+    assert [r.status_code for r in responses] == [200, 200, 200, 429, 429]
+
+
+def test_gate_sheds_writes_past_a_full_queue():
+    gate = AdmissionGate(limit=1, queue_size=1, timeout=5)
+
+    async def overload(client, release, entered):
+        tasks = [asyncio.create_task(client.post("/write")) for _ in range(3)]
+        while gate.active < 1 or gate.queued() < 1 or not any(task.done() for task in tasks):
+            await asyncio.sleep(0.01)
+        shed = [task.result() for task in tasks if task.done()]
+        release.set()
+        return shed, await asyncio.gather(*tasks)
+
+    shed, responses = run_against(RateLimiter({}), gate, overload)
+    assert [r.status_code for r in shed] == [503]
+    assert shed[0].headers["Retry-After"] == "1"
+    assert sorted(r.status_code for r in responses) == [200, 200, 503]
+    assert gate.counts["public"] == {"admitted": 2, "queue_full": 1, "timeout": 0}
+    assert gate.active == 0
+
+
+def test_queued_write_times_out_with_503():
+    gate = AdmissionGate(limit=1, queue_size=4, timeout=0.05)
+
+    async def slow(client, release, entered):
+        first = asyncio.create_task(client.post("/write"))
+        while not entered:
+            await asyncio.sleep(0.01)
+        second = await client.post("/write")
+        release.set()
+        return await first, second
+
+    first, second = run_against(RateLimiter({}), gate, slow)
+    assert (first.status_code, second.status_code) == (200, 503)
+    assert gate.counts["public"]["timeout"] == 1
+
+
+def test_admins_skip_ahead_of_queued_public_writes():
+    gate = AdmissionGate(limit=1, queue_size=4, timeout=5)
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': 'boss', 'admin': True})}"}
+
+    async def mixed(client, release, entered):
+        first = asyncio.create_task(client.post("/write", params={"who": "first"}))
+        while not entered:
+            await asyncio.sleep(0.01)
+        public = asyncio.create_task(client.post("/write", params={"who": "public"}))
+        while gate.queued() < 1:
+            await asyncio.sleep(0.01)
+        boss = asyncio.create_task(client.post("/write", params={"who": "admin"}, headers=admin))
+        while gate.queued() < 2:
+            await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, public, boss)
+        return entered
+
+    # The first write's slot goes to the admin, although the public write queued before it
+    assert run_against(RateLimiter({}), gate, mixed) == ["first", "admin", "public"]
@@ -0,0 +1,25 @@
+import csv
+import io
+import json
+
+from app import exports
+from app.exports import stream_orders
+from conftest import ORDER
+
+NAME = '=HYPERLINK("http://example.com","Invoice")'
+
+
+def test_csv_export_defuses_formulas_but_ndjson_keeps_the_text(database, call_api, monkeypatch):
+    monkeypatch.setattr(exports, "ReadSessionLocal", database)
+
+    async def order(client):
+        return await client.post("/order", json=dict(ORDER, customer_name=NAME))
+
+    assert call_api(order).status_code == 200
+    rows = list(csv.DictReader(io.StringIO("".join(stream_orders("csv")))))
+    assert rows[0]["customer_name"] == "'" + NAME
+    assert rows[0]["phone_number"] == ORDER["phone_number"]
+    assert rows[0]["pounds_ordered"] == str(float(ORDER["pounds"]))
+
+    record = json.loads("".join(stream_orders("ndjson")))
+    assert record["customer_name"] == NAME
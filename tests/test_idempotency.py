@@ -0,0 +1,68 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.idempotency import order_idempotency
+from app.models import IdempotencyKey, Inventory, Order
+from conftest import ORDER, STOCK_LB
+
+
+def count_orders(Session):
+    with Session() as db:
+        return db.scalar(select(func.count()).select_from(Order))
+
+
+def test_concurrent_retries_place_one_order(database, call_api):
+    async def retries(client):
+        return await asyncio.gather(*(
+            client.post("/order", json=ORDER, headers={"Idempotency-Key": "checkout-1"}) for _ in range(8)
+        ))
+
+    responses = call_api(retries)
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.json()["order_summary"]["confirmation_pin"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 7
+    assert count_orders(database) == 1
+    with database() as db:
+        assert db.scalar(select(Inventory.current_stock_lb)) == STOCK_LB - ORDER["pounds"]
+
+
+def test_replay_comes_from_the_database_in_another_worker(database, call_api):
+    async def first(client):
+        return await client.post("/order", json=ORDER, headers={"Idempotency-Key": "checkout-2"})
+
+    original = call_api(first)
+    # What another app worker sees: nothing in this process's memory
+    order_idempotency.cache.clear()
+    replay = call_api(first)
+    assert replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == original.json()
+    assert count_orders(database) == 1
+
+
+def test_key_reused_with_a_different_body_is_rejected(database, call_api):
+    async def orders(client):
+        headers = {"Idempotency-Key": "checkout-3"}
+        first = await client.post("/order", json=ORDER, headers=headers)
+        second = await client.post("/order", json=dict(ORDER, pounds=ORDER["pounds"] * 2), headers=headers)
+        return first, second
+
+    first, second = call_api(orders)
+    assert first.status_code == 200
+    assert second.status_code == 422
+    assert count_orders(database) == 1
+
+
+def test_failed_order_releases_its_key(database, call_api):
+    async def order(client):
+        return await client.post("/order", json=dict(ORDER, pounds=STOCK_LB + 1),
+                                 headers={"Idempotency-Key": "checkout-4"})
+
+    assert call_api(order).status_code == 409
+    with database() as db:
+        assert db.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+    # The retry runs again instead of replaying the failure
+    retry = call_api(order)
+    assert retry.status_code == 409
+    assert "Idempotent-Replayed" not in retry.headers
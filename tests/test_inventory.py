@@ -0,0 +1,48 @@
+from sqlalchemy import event, select
+
+from app.auth import create_access_token
+from app.models import Inventory
+from app.schemas import InventoryAdjustment
+from app.stock import bulk_adjust
+from conftest import STOCK_LB
+
+ADMIN = {"Authorization": f"Bearer {create_access_token({'sub': 'boss', 'admin': True})}"}
+
+
+def test_inventory_writes_only_accept_known_locations(database, call_api):
+    with database() as db:
+        inventory_id = db.scalar(select(Inventory.id))
+
+    async def moves(client):
+        put = await client.put(f"/inventory/{inventory_id}", json={"location": "Morant Bay"}, headers=ADMIN)
+        bulk = await client.patch("/inventory/bulk", headers=ADMIN, json={
+            "adjustments": [{"inventory_id": inventory_id, "location": "st. thomas"}],
+        })
+        moved = await client.put(f"/inventory/{inventory_id}", json={"location": "Kingston"}, headers=ADMIN)
+        return put, bulk, moved
+
+    put, bulk, moved = call_api(moves)
+    # A town or a miscased shop name is not a location
+    assert (put.status_code, bulk.status_code) == (422, 422)
+    assert moved.status_code == 200
+    with database() as db:
+        assert db.scalar(select(Inventory.location)) == "Kingston"
+
+
+def test_bulk_delta_reports_the_stock_it_wrote(database):
+    def order_lands(conn, cursor, statement, parameters, context, executemany):
+        # An order taking 5 lb between bulk_adjust's read and its delta UPDATE
+        if statement.startswith("UPDATE inventory SET current_stock_lb=(inventory.current_stock_lb +"):
+            cursor.connection.execute("UPDATE inventory SET current_stock_lb = current_stock_lb - 5")
+
+    with database() as db:
+        inventory_id = db.scalar(select(Inventory.id))
+        event.listen(db.get_bind(), "before_cursor_execute", order_lands)
+        try:
+            result = bulk_adjust(db, [InventoryAdjustment(inventory_id=inventory_id, delta_lb=10, kind="receipt")])
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", order_lands)
+        stock = db.scalar(select(Inventory.current_stock_lb))
+
+    assert stock == STOCK_LB - 5 + 10
+    assert result["items"] == [{"inventory_id": inventory_id, "current_stock_lb": stock}]
@@ -0,0 +1,39 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.models import Inventory, Order, OrderItem, StockMovement
+from app.stock import reconcile
+from conftest import ORDER, STOCK_LB
+
+
+def test_parallel_orders_never_oversell(database, call_api):
+    requests = 2 * int(STOCK_LB // ORDER["pounds"])
+
+    async def rush(client):
+        return await asyncio.gather(*(client.post("/order", json=ORDER) for _ in range(requests)))
+
+    statuses = [r.status_code for r in call_api(rush)]
+    accepted = statuses.count(200)
+    assert accepted == STOCK_LB // ORDER["pounds"]
+    assert statuses.count(409) == requests - accepted
+
+    with database() as db:
+        stock = db.scalar(select(Inventory.current_stock_lb))
+        sold = db.scalar(select(func.sum(OrderItem.pounds_ordered)))
+        ledger = db.scalar(select(func.sum(StockMovement.delta_lb)))
+        assert stock >= 0
+        assert accepted * ORDER["pounds"] == sold == STOCK_LB - stock
+        assert ledger == stock
+        assert db.scalar(select(func.count()).select_from(Order)) == accepted
+        assert reconcile(db) == []
+
+
+def test_order_larger_than_stock_is_rejected_untouched(database, call_api):
+    async def order(client):
+        return await client.post("/order", json=dict(ORDER, pounds=STOCK_LB + 1))
+
+    assert call_api(order).status_code == 409
+    with database() as db:
+        assert db.scalar(select(Inventory.current_stock_lb)) == STOCK_LB
+        assert db.scalar(select(func.count()).select_from(Order)) == 0
@@ -0,0 +1,62 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app import notifications
+from app.models import OutboxMessage
+from app.notifications import OutboxWorker, StubTransport
+from conftest import ORDER
+
+ORDERS = 3
+
+
+def place_orders(call_api):
+    async def place(client):
+        for _ in range(ORDERS):
+            r = await client.post("/order", json=ORDER)
+            assert r.status_code == 200
+
+    call_api(place)
+
+
+def backoff_over(Session):
+    # Stands in for waiting out the retry delay
+    with Session() as db:
+        db.execute(update(OutboxMessage).values(next_attempt_at=datetime.utcnow()))
+        db.commit()
+
+
+def messages(Session):
+    with Session() as db:
+        return db.execute(select(OutboxMessage.status, OutboxMessage.attempts, OutboxMessage.last_error)).all()
+
+
+def test_failed_sends_are_retried_and_delivered_once(database, call_api):
+    place_orders(call_api)
+    transport = StubTransport(fail_rate=1.0)
+    worker = OutboxWorker(transport=transport, workers=1, session_factory=database)
+
+    # The order placed each message; the gateway is down for the first attempt
+    assert asyncio.run(worker.drain()) == ORDERS
+    assert messages(database) == [("pending", 1, "stub failure")] * ORDERS
+    # Still backing off, so nothing is due
+    assert asyncio.run(worker.drain()) == 0
+
+    transport.fail_rate = 0.0
+    backoff_over(database)
+    assert asyncio.run(worker.drain()) == ORDERS
+    assert messages(database) == [("sent", 2, None)] * ORDERS
+    assert Counter(Counter(message["id"] for message in transport.sent).values()) == {1: ORDERS}
+
+
+def test_messages_fail_after_max_attempts(database, call_api, monkeypatch):
+    monkeypatch.setattr(notifications, "OUTBOX_MAX_ATTEMPTS", 2)
+    place_orders(call_api)
+    worker = OutboxWorker(transport=StubTransport(fail_rate=1.0), workers=1, session_factory=database)
+
+    for _ in range(3):
+        asyncio.run(worker.drain())
+        backoff_over(database)
+    assert messages(database) == [("failed", 2, "stub failure")] * ORDERS
@@ -0,0 +1,71 @@
+import runpy
+
+import pytest
+from sqlalchemy import text
+
+from app import search
+from app.auth import create_access_token
+from conftest import ORDER
+
+ADMIN = {"Authorization": f"Bearer {create_access_token({'sub': 'boss', 'admin': True})}"}
+FTS_UPGRADE = runpy.run_path("migrations/versions/0009_order_search.py")["SQLITE_UPGRADE"]
+
+
+@pytest.fixture(params=["fts5", "like"])
+def orders(request, database, call_api, monkeypatch):
+    # Five orders from Ann Brown and one from Bob Green, searched through FTS5 or the LIKE fallback
+    if request.param == "fts5":
+        with database() as db:
+            for statement in FTS_UPGRADE:
+                db.execute(text(statement))
+            db.commit()
+    monkeypatch.setattr(search, "_fts_tables", {})
+
+    async def place(client):
+        for name in ["Ann Brown"] * 5 + ["Bob Green"]:
+            r = await client.post("/order", json=dict(ORDER, customer_name=name))
+            assert r.status_code == 200
+
+    call_api(place)
+    return request.param
+
+
+def search_pages(call_api, q, limit):
+    async def pages(client):
+        responses, cursor = [], None
+        while True:
+            params = {"q": q, "limit": limit, **({"cursor": cursor} if cursor else {})}
+            r = await client.get("/admin/orders/search", params=params, headers=ADMIN)
+            assert r.status_code == 200
+            responses.append(r)
+            cursor = r.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return responses
+
+    return call_api(pages)
+
+
+def test_search_pages_through_every_match(orders, call_api):
+    pages = search_pages(call_api, "ann", limit=2)
+    assert [len(r.json()) for r in pages] == [2, 2, 1]
+    assert {row["customer_name"] for r in pages for row in r.json()} == {"Ann Brown"}
+    assert not any("X-Search-Truncated" in r.headers for r in pages)
+    assert [row["customer_name"] for row in search_pages(call_api, "gre", limit=5)[0].json()] == ["Bob Green"]
+
+
+def test_search_flags_matches_past_the_candidate_cap(orders, call_api, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 3)
+    pages = search_pages(call_api, "brown", limit=2)
+    assert [len(r.json()) for r in pages] == [2, 1]
+    assert pages[-1].headers["X-Search-Truncated"] == "true"
+    # Exactly at the cap is not truncated
+    monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 5)
+    assert "X-Search-Truncated" not in search_pages(call_api, "brown", limit=5)[-1].headers
+
+
+def test_search_cursor_stops_at_the_cap(database, call_api):
+    async def past_cap(client):
+        params = {"q": "ann", "cursor": search.SEARCH_MAX_CANDIDATES}
+        return await client.get("/admin/orders/search", params=params, headers=ADMIN)
+
+    assert call_api(past_cap).status_code == 422